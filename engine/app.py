@@ -1,16 +1,75 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from db import engine
-from models import Base
-from routers import campaigns, events, dice, memory, turns, director
+from fastapi.responses import ORJSONResponse
+from compression import CompressionMiddleware
+from config import settings
+from db import async_engine, engine, init_db, set_shard_router
+import models  # noqa: F401  (registers tables on Base.metadata)
+import versioning  # noqa: F401  (registers the campaign-version flush hook)
+from routers import campaigns, events, dice, memory, turns, director, metrics, utterances
+from sharding import ShardRouter
+from working_set import WorkingSet, set_working_set
+from write_pipeline import WritePipeline, register_write_pipeline, unregister_write_pipeline
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    pipeline = None
+    if settings.WRITE_PIPELINE_ENABLED:
+        pipeline = WritePipeline(
+            engine,
+            window_ms=settings.WRITE_PIPELINE_WINDOW_MS,
+            max_batch=settings.WRITE_PIPELINE_MAX_BATCH,
+        )
+        pipeline.start()
+        register_write_pipeline(async_engine.sync_engine, pipeline)
+
+    shard_router = None
+    if settings.SHARD_MODE == "per_campaign":
+        shard_router = ShardRouter(
+            settings.SHARD_CATALOG_URL,
+            settings.SHARD_DIR,
+            max_open=settings.SHARD_MAX_OPEN,
+            idle_seconds=settings.SHARD_IDLE_SECONDS,
+        )
+        shard_router.start()
+        set_shard_router(shard_router)
+
+    working_set = None
+    if settings.WORKING_SET_ENABLED:
+        working_set = WorkingSet(
+            max_campaigns=settings.WORKING_SET_MAX_CAMPAIGNS,
+            max_events=settings.WORKING_SET_EVENTS,
+            max_bytes=settings.WORKING_SET_MAX_BYTES,
+            ttl_seconds=settings.WORKING_SET_TTL_SECONDS,
+        )
+        set_working_set(working_set)
+    try:
+        yield
+    finally:
+        if working_set is not None:
+            set_working_set(None)
+        if shard_router is not None:
+            set_shard_router(None)
+            await shard_router.close()
+        if pipeline is not None:
+            unregister_write_pipeline(async_engine.sync_engine)
+            pipeline.stop()
+
 
 app = FastAPI(
     title="TTRPG Game Engine",
     version="0.1.0",
     docs_url="/docs",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
-# Create all tables on startup
-Base.metadata.create_all(bind=engine)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_BYTES)
+
+# Create all tables and indexes on startup
+init_db(engine)
 
 app.include_router(campaigns.router)
 app.include_router(events.router)
@@ -18,3 +77,5 @@ app.include_router(dice.router)
 app.include_router(memory.router)
 app.include_router(turns.router)
 app.include_router(director.router)
+app.include_router(metrics.router)
+app.include_router(utterances.router)
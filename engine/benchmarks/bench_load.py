@@ -0,0 +1,287 @@
+"""
+End-to-end load test: engine, stub model and runner processes on one machine.
+
+Usage (from engine/):
+    python benchmarks/bench_load.py [--runners 2] [--campaigns 8] [--seconds 20]
+
+The engine app is served in-process by uvicorn against a fresh SQLite file,
+and ``runner/stub_model.py`` answers the model calls with schema-valid JSON at
+a configurable latency and token rate. ``--runners`` runner processes then
+drive ``--campaigns`` synthetic campaigns (a DM, AI players and a human, which
+the runner also plays, so turns never wait for input). Each runner gets its
+own share of the campaigns; with ``--shared`` every runner watches every
+campaign and floor leases decide who plays.
+
+After ``--warmup`` seconds the counters are reset. The report covers the
+measured window: turns per second, p50/p95/p99 per engine endpoint (timed
+inside the engine process, from request to last response byte), model cache
+reuse and the database's growth. ``GET /version`` is the runners' parked
+long-poll, so its latency is mostly waiting. Engine settings come from the
+environment as usual, e.g. ``WRITE_PIPELINE_ENABLED=true``, and runner ones
+too, e.g. ``MAX_AUTO_TURNS_PER_TICK=4``.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import signal
+import socket
+import sqlite3
+import sys
+import tempfile
+import time
+
+ENGINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNNER_DIR = os.path.join(os.path.dirname(ENGINE_DIR), "runner")
+sys.path.insert(0, ENGINE_DIR)
+sys.path.insert(1, RUNNER_DIR)
+
+import httpx
+import uvicorn
+from metrics import Histogram
+from stub_model import StubModel, StubModelServer
+
+ENGINE_KEY = "bench-key"
+_CAMPAIGN_PATH = re.compile(r"^/v1/campaigns/[^/]+")
+
+
+class EndpointTimer:
+    """ASGI wrapper recording each request's latency per method and route."""
+
+    def __init__(self, app):
+        self.app = app
+        self.histograms: dict[str, Histogram] = {}
+        self.errors: dict[str, int] = {}
+        self.acts = 0
+
+    def reset(self):
+        self.histograms.clear()
+        self.errors.clear()
+        self.acts = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            route = _CAMPAIGN_PATH.sub("/v1/campaigns/{id}", scope["path"])
+            key = f"{scope['method']} {route}"
+            self.histograms.setdefault(key, Histogram()).record(elapsed)
+            if status >= 400:
+                self.errors[key] = self.errors.get(key, 0) + 1
+            elif route == "/v1/campaigns/{id}/act":
+                self.acts += 1
+
+
+def _load_app(db_path: str):
+    # settings and the database engine are read when the app is first imported.
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["ENGINE_KEY"] = ENGINE_KEY
+    from app import app
+    return app
+
+
+def _db_bytes(db_path: str) -> int:
+    """Logical size of the database, pages still in the WAL included."""
+    conn = sqlite3.connect(db_path)
+    try:
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        return page_count * page_size
+    finally:
+        conn.close()
+
+
+async def _seed(client: httpx.AsyncClient, campaigns: int, players: int, memories: int) -> list[str]:
+    campaign_ids = []
+    for c in range(campaigns):
+        actors = [{"id": f"dm{c}", "name": "DM", "actor_type": "dm", "is_ai": True}]
+        actors += [{"id": f"p{c}_{p}", "name": f"Player {p}", "actor_type": "player", "is_ai": True} for p in range(players)]
+        actors.append({"id": f"h{c}", "name": "Human", "actor_type": "human", "is_ai": False})
+        resp = await client.post("/v1/campaigns", json={"name": f"Load {c}", "actors": actors})
+        resp.raise_for_status()
+        campaign_id = resp.json()["id"]
+        for m in range(memories):
+            resp = await client.post(f"/v1/campaigns/{campaign_id}/memory/write", json={
+                "actor_id": f"dm{c}",
+                "scope": "world",
+                "text": f"Lore {m}: the old kingdom of Vel fell when its river changed course, and its people scattered.",
+            })
+            resp.raise_for_status()
+        campaign_ids.append(campaign_id)
+    return campaign_ids
+
+
+async def _start_runner(n: int, campaign_ids: list[str], engine_url: str, model_url: str, args, log_dir: str):
+    env = dict(
+        os.environ,
+        ENGINE_URL=engine_url,
+        ENGINE_KEY=ENGINE_KEY,
+        OPENAI_BASE_URL=model_url,
+        CAMPAIGN_ID="",
+        CAMPAIGN_IDS=",".join(campaign_ids),
+        METRICS_SUMMARY_SECONDS="0",
+    )
+    command = [
+        sys.executable, os.path.join(RUNNER_DIR, "runner.py"), "--watch",
+        "--worker-id", f"bench-{n}", "--model-concurrency", str(args.model_concurrency),
+    ]
+    if args.pipeline:
+        command.append("--pipeline")
+    log = open(os.path.join(log_dir, f"runner-{n}.log"), "w")
+    try:
+        return await asyncio.create_subprocess_exec(*command, env=env, stdout=log, stderr=asyncio.subprocess.STDOUT)
+    finally:
+        log.close()
+
+
+async def _stop_runner(process: asyncio.subprocess.Process):
+    # SIGINT lets the runner release its floors and close its connections.
+    if process.returncode is None:
+        process.send_signal(signal.SIGINT)
+    try:
+        await asyncio.wait_for(process.wait(), 10)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+
+
+async def _run(args, work_dir: str) -> dict:
+    db_path = args.db or os.path.join(work_dir, "load.db")
+    timer = EndpointTimer(_load_app(db_path))
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    engine_url = "http://127.0.0.1:%d" % sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(timer, log_level="warning", lifespan="on"))
+    serving = asyncio.create_task(server.serve(sockets=[sock]))
+    model = StubModel(args.base_ms, args.prompt_ms_per_token, args.tokens_per_second, args.slots)
+    stub = StubModelServer(model).start()
+    runners = []
+    try:
+        while not server.started:
+            await asyncio.sleep(0.05)
+        async with httpx.AsyncClient(base_url=engine_url, headers={"X-ENGINE-KEY": ENGINE_KEY}) as client:
+            campaign_ids = await _seed(client, args.campaigns, args.players, args.memories)
+
+        for n in range(args.runners):
+            share = campaign_ids if args.shared else campaign_ids[n::args.runners]
+            if share:
+                runners.append(await _start_runner(n, share, engine_url, stub.base_url, args, work_dir))
+        await asyncio.sleep(args.warmup)
+
+        timer.reset()
+        model_before = model.stats()
+        db_before = _db_bytes(db_path)
+        started = time.perf_counter()
+        await asyncio.sleep(args.seconds)
+        elapsed = time.perf_counter() - started
+        acts = timer.acts
+        endpoints = {
+            key: {**histogram.snapshot(), "errors": timer.errors.get(key, 0)}
+            for key, histogram in sorted(timer.histograms.items())
+        }
+        model_after = model.stats()
+        db_after = _db_bytes(db_path)
+        exited = [n for n, process in enumerate(runners) if process.returncode is not None]
+    finally:
+        await asyncio.gather(*(_stop_runner(process) for process in runners))
+        stub.stop()
+        server.should_exit = True
+        await serving
+
+    prompt_tokens = model_after["prompt_tokens"] - model_before["prompt_tokens"]
+    return {
+        "runners": len(runners),
+        "campaigns": args.campaigns,
+        "seconds": round(elapsed, 3),
+        "turns": acts,
+        "turns_per_sec": acts / elapsed,
+        "runners_exited": exited,
+        "model": {
+            "requests": model_after["requests"] - model_before["requests"],
+            "cache_ratio": (model_after["cached_tokens"] - model_before["cached_tokens"]) / prompt_tokens if prompt_tokens else 0.0,
+        },
+        "db_bytes": {"before": db_before, "after": db_after, "per_turn": (db_after - db_before) / acts if acts else 0.0},
+        "endpoints": endpoints,
+    }
+
+
+def _print(result: dict, log_dir: str):
+    print(f"runners {result['runners']}  campaigns {result['campaigns']}  measured {result['seconds']:.1f} s")
+    print(f"turns     {result['turns']} ({result['turns_per_sec']:.1f}/s)")
+    model = result["model"]
+    print(f"model     {model['requests']} requests, {model['cache_ratio']:.0%} of prompt tokens cached")
+    db = result["db_bytes"]
+    print(
+        f"database  {db['before'] / 1024:.0f} KiB -> {db['after'] / 1024:.0f} KiB "
+        f"(+{(db['after'] - db['before']) / 1024:.0f} KiB, {db['per_turn'] / 1024:.2f} KiB/turn)"
+    )
+    if result["runners_exited"]:
+        print(f"runners {result['runners_exited']} exited early; see {log_dir}")
+    print()
+    print(f"{'endpoint':<48} {'n':>6} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for key, snap in result["endpoints"].items():
+        print(
+            f"{key:<48} {snap['count']:>6} {snap['errors']:>7} "
+            f"{snap['p50_ms']:>8.1f} {snap['p95_ms']:>8.1f} {snap['p99_ms']:>8.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runners", type=int, default=2)
+    parser.add_argument("--campaigns", type=int, default=8)
+    parser.add_argument("--players", type=int, default=1, help="AI players per campaign, besides the DM and a human.")
+    parser.add_argument("--memories", type=int, default=5, help="World memories seeded per campaign.")
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--shared", action="store_true", help="Every runner watches every campaign.")
+    parser.add_argument("--pipeline", action="store_true", help="Run the runners with --pipeline.")
+    parser.add_argument("--model-concurrency", type=int, default=4, help="Model calls in flight per runner.")
+    parser.add_argument("--base-ms", type=float, default=20.0, help="Stub model: fixed latency per request.")
+    parser.add_argument("--prompt-ms-per-token", type=float, default=0.5, help="Stub model: cost of each uncached prompt token.")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="Stub model: output token rate.")
+    parser.add_argument(
+        "--slots", type=int,
+        help="Stub model: prompt cache slots (default: one per seat, campaigns x (players + 2)).",
+    )
+    parser.add_argument("--db", help="SQLite file to use (default: a fresh one in a temporary directory).")
+    parser.add_argument("--report", help="Also write the results as JSON to this file.")
+    args = parser.parse_args()
+    # The runner plays every seat, the DM and the human included, and each seat's
+    # prompt is its own cache prefix.
+    seats = args.campaigns * (args.players + 2)
+    if args.slots is None:
+        args.slots = seats
+    elif args.slots < seats:
+        print(
+            f"warning: {seats} seats share {args.slots} prompt cache slots; "
+            "the cache ratio will mostly measure slot thrashing",
+            file=sys.stderr,
+        )
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        result = asyncio.run(_run(args, work_dir))
+        _print(result, work_dir)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
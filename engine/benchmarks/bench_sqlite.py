@@ -0,0 +1,151 @@
+"""
+Read/write throughput of the SQLite engine, default settings vs. tuned PRAGMAs.
+
+Usage (from engine/):
+    python benchmarks/bench_sqlite.py [--seconds 5] [--writers 4] [--readers 8]
+
+Each configuration gets a fresh database file. Writer threads append events
+through ``append_event``; reader threads page through ``list_events`` for a
+rotating viewer of a separate, fixed-size campaign. Throughput is reported as completed operations per second.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from db import Base, make_engine
+from models import Actor, Campaign
+from schemas import EventCreate
+from services.event_service import append_event, list_events
+
+CAMPAIGN_ID = "bench"
+WRITE_CAMPAIGN_ID = "bench-w"
+VIEWERS = ["dm", "player1", "human1"]
+SEED_EVENTS = 500
+
+
+def _baseline_engine(url: str):
+    return create_engine(url, connect_args={"check_same_thread": False})
+
+
+def _tuned_engine(url: str):
+    return make_engine(url)
+
+
+def _seed(session_factory):
+    db = session_factory()
+    try:
+        db.add(Campaign(id=CAMPAIGN_ID, name="Bench", turn_owner="dm"))
+        db.add(Campaign(id=WRITE_CAMPAIGN_ID, name="Bench writes", turn_owner="dm"))
+        db.add(Actor(id="dm", campaign_id=CAMPAIGN_ID, name="DM", actor_type="dm", is_ai=True))
+        db.add(Actor(id="player1", campaign_id=CAMPAIGN_ID, name="P1", actor_type="player", is_ai=True))
+        db.add(Actor(id="human1", campaign_id=CAMPAIGN_ID, name="H1", actor_type="human", is_ai=False))
+        db.commit()
+        for i in range(SEED_EVENTS):
+            append_event(db, CAMPAIGN_ID, _event(i))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _event(i: int) -> EventCreate:
+    return EventCreate(
+        actor_id=VIEWERS[i % len(VIEWERS)],
+        event_type="utterance",
+        content=f"bench event {i}",
+        visibility="public" if i % 4 else "dm_only",
+    )
+
+
+def _run(label: str, engine_factory, seconds: float, writers: int, readers: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = engine_factory(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        _seed(session_factory)
+
+        counts = {"write": 0, "read": 0, "errors": 0}
+        lock = threading.Lock()
+        stop = threading.Event()
+
+        def writer():
+            db = session_factory()
+            i = 0
+            try:
+                while not stop.is_set():
+                    try:
+                        append_event(db, WRITE_CAMPAIGN_ID, _event(i))
+                        db.commit()
+                        key = "write"
+                    except Exception:
+                        db.rollback()
+                        key = "errors"
+                    i += 1
+                    with lock:
+                        counts[key] += 1
+            finally:
+                db.close()
+
+        def reader(n: int):
+            db = session_factory()
+            i = n
+            try:
+                while not stop.is_set():
+                    try:
+                        list_events(db, CAMPAIGN_ID, VIEWERS[i % len(VIEWERS)])
+                        db.rollback()  # end the read transaction, as a request would
+                        key = "read"
+                    except Exception:
+                        db.rollback()
+                        key = "errors"
+                    i += 1
+                    with lock:
+                        counts[key] += 1
+            finally:
+                db.close()
+
+        threads = [threading.Thread(target=writer) for _ in range(writers)]
+        threads += [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        engine.dispose()
+
+    return {
+        "label": label,
+        "writes_per_sec": counts["write"] / elapsed,
+        "reads_per_sec": counts["read"] / elapsed,
+        "errors": counts["errors"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'config':<10} {'writes/s':>10} {'reads/s':>10} {'errors':>8}")
+    for label, factory in (("default", _baseline_engine), ("tuned", _tuned_engine)):
+        result = _run(label, factory, args.seconds, args.writers, args.readers)
+        print(
+            f"{result['label']:<10} {result['writes_per_sec']:>10.0f} "
+            f"{result['reads_per_sec']:>10.0f} {result['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Write throughput with per-request commits vs. the group-commit write pipeline.
+
+Usage (from engine/):
+    python benchmarks/bench_write_pipeline.py [--seconds 5] [--writers 16]
+
+Writer threads append events as fast as they can. In ``direct`` mode each
+thread commits its own write, as every endpoint does without the pipeline; in
+``pipeline`` mode writes are submitted to ``WritePipeline`` and each thread
+waits for its future, as the async routes do.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.orm import sessionmaker
+from db import init_db, make_engine
+from models import Actor, Campaign
+from schemas import EventCreate
+from services.event_service import append_event
+from write_pipeline import WritePipeline
+
+CAMPAIGN_ID = "bench"
+
+
+def _event(i: int) -> EventCreate:
+    return EventCreate(actor_id="dm", event_type="utterance", content=f"bench event {i}", visibility="public")
+
+
+def _run(mode: str, seconds: float, writers: int, window_ms: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        init_db(engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        db = session_factory()
+        db.add(Campaign(id=CAMPAIGN_ID, name="Bench", turn_owner="dm"))
+        db.add(Actor(id="dm", campaign_id=CAMPAIGN_ID, name="DM", actor_type="dm", is_ai=True))
+        db.commit()
+        db.close()
+
+        pipeline = None
+        if mode == "pipeline":
+            pipeline = WritePipeline(engine, window_ms=window_ms)
+            pipeline.start()
+
+        counts = {"write": 0, "errors": 0}
+        lock = threading.Lock()
+        stop = threading.Event()
+
+        def writer():
+            db = session_factory()
+            i = 0
+            try:
+                while not stop.is_set():
+                    try:
+                        if pipeline is None:
+                            append_event(db, CAMPAIGN_ID, _event(i))
+                            db.commit()
+                        else:
+                            pipeline.submit(append_event, CAMPAIGN_ID, _event(i)).result()
+                        key = "write"
+                    except Exception:
+                        db.rollback()
+                        key = "errors"
+                    i += 1
+                    with lock:
+                        counts[key] += 1
+            finally:
+                db.close()
+
+        threads = [threading.Thread(target=writer) for _ in range(writers)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        if pipeline is not None:
+            pipeline.stop()
+        engine.dispose()
+
+    return {
+        "mode": mode,
+        "writes_per_sec": counts["write"] / elapsed,
+        "mean_batch": pipeline.mean_batch_size if pipeline else 1.0,
+        "errors": counts["errors"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--window-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    print(f"{'mode':<10} {'writes/s':>10} {'batch':>7} {'errors':>8}")
+    for mode in ("direct", "pipeline"):
+        result = _run(mode, args.seconds, args.writers, args.window_ms)
+        print(
+            f"{result['mode']:<10} {result['writes_per_sec']:>10.0f} "
+            f"{result['mean_batch']:>7.1f} {result['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
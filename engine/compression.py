@@ -0,0 +1,80 @@
+import gzip
+from typing import Optional
+import zstandard
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick zstd over gzip from an Accept-Encoding header, or None."""
+    accepted = set()
+    for item in accept_encoding.split(","):
+        token, _, params = item.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(token.strip().lower())
+    for encoding in ("zstd", "gzip"):
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+class CompressionMiddleware:
+    """Compress complete responses of at least ``minimum_size`` bytes with zstd or gzip.
+
+    Streamed responses (more than one body message) and responses that already
+    carry a Content-Encoding pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, zstd_level: int = 3):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self._zstd = zstandard.ZstdCompressor(level=zstd_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            response_start, start = start, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=response_start["headers"])
+            if message.get("more_body") or len(body) < self.minimum_size or "content-encoding" in headers:
+                await send(response_start)
+                await send(message)
+                return
+
+            body = self._compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(response_start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "zstd":
+            return self._zstd.compress(body)
+        return gzip.compress(body, compresslevel=self.gzip_level)
@@ -8,6 +8,81 @@ class Settings(BaseSettings):
     AI_PLAYER_COOLDOWN_SECONDS: int = 30
     DM_OMNISCIENT_PRIVATE: bool = True
 
+    # SQLite connection tuning, applied as PRAGMAs on every new connection.
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456  # bytes (256 MiB)
+    SQLITE_CACHE_SIZE: int = -65536  # negative values are KiB (64 MiB)
+    SQLITE_TEMP_STORE: str = "MEMORY"
+
+    # Connection pool policy. WAL lets readers run alongside the single writer,
+    # so the pool is sized for concurrent readers rather than one connection.
+    DB_POOL_SIZE: int = 16
+    DB_MAX_OVERFLOW: int = 16
+    DB_POOL_TIMEOUT: int = 30
+
+    # Optional single-writer pipeline: writes from all requests are queued to one
+    # thread and group-committed, one transaction per batch window.
+    WRITE_PIPELINE_ENABLED: bool = False
+    WRITE_PIPELINE_WINDOW_MS: float = 2.0
+    WRITE_PIPELINE_MAX_BATCH: int = 256
+
+    # "single" keeps every campaign in DATABASE_URL; "per_campaign" gives each
+    # campaign its own SQLite file under SHARD_DIR, looked up in a catalog DB.
+    SHARD_MODE: str = "single"
+    SHARD_DIR: str = "./shards"
+    SHARD_CATALOG_URL: str = "sqlite:///./ttrpg_catalog.db"
+    SHARD_MAX_OPEN: int = 64
+    SHARD_IDLE_SECONDS: int = 300
+    SHARD_POOL_SIZE: int = 4
+
+    # In-process cache of hot campaigns (turn state, roster, state KV, cursors and
+    # the last WORKING_SET_EVENTS events), kept current on commit. Single-process
+    # only: leave it off when several engine replicas share one database.
+    WORKING_SET_ENABLED: bool = False
+    WORKING_SET_MAX_CAMPAIGNS: int = 128
+    WORKING_SET_EVENTS: int = 500
+    WORKING_SET_MAX_BYTES: int = 67108864  # 64 MiB, estimated
+    WORKING_SET_TTL_SECONDS: int = 600
+
+    # Director packages cached per campaign version; 0 disables the cache.
+    DIRECTOR_CACHE_SIZE: int = 1024
+
+    # Responses of at least COMPRESSION_MIN_BYTES are compressed with zstd or
+    # gzip when the client's Accept-Encoding allows it.
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_BYTES: int = 1024
+
+    # Build the next turn owner's director package in the background after a
+    # turn advance (the route's ?precompute= overrides). At most
+    # DIRECTOR_PRECOMPUTE_WORKERS builds run at once; results are dropped after
+    # DIRECTOR_PRECOMPUTE_TTL_SECONDS or as soon as the campaign version moves.
+    DIRECTOR_PRECOMPUTE: bool = False
+    DIRECTOR_PRECOMPUTE_WORKERS: int = 4
+    DIRECTOR_PRECOMPUTE_TTL_SECONDS: float = 30.0
+
+    # Per-actor rolling summaries of events already delivered to the director.
+    # SUMMARIZER is "module:factory" for a custom summarizer; empty uses the
+    # built-in extractive one, capped at SUMMARY_MAX_LINES lines.
+    SUMMARY_ENABLED: bool = True
+    SUMMARIZER: str = ""
+    SUMMARY_MAX_LINES: int = 12
+
+    # Streamed sentences of utterances still being generated (in memory). Each
+    # campaign keeps its last PARTIAL_UTTERANCE_CHUNKS chunks; utterances never
+    # finalized by /act are forgotten after PARTIAL_UTTERANCE_TTL_SECONDS.
+    PARTIAL_UTTERANCE_CHUNKS: int = 256
+    PARTIAL_UTTERANCE_TTL_SECONDS: float = 120.0
+
+    # Long-polls on a campaign's version are woken by this process's commits;
+    # they re-read the version this often to see writes from other processes.
+    VERSION_WAIT_RECHECK_SECONDS: float = 2.0
+
+    # Runner workers claim a campaign's floor before driving it; a claim lapses
+    # this long after the holder's last claim or /act, and is then free to take.
+    FLOOR_LEASE_SECONDS: float = 30.0
+
     class Config:
         env_file = ".env"
 
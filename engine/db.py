@@ -1,23 +1,268 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+import logging
+from contextlib import asynccontextmanager, nullcontext
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Union
+from fastapi import HTTPException, Request
+from sqlalchemy import Index, Table, and_, create_engine, delete, event, exists, inspect, or_, select, text
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from config import settings
 
+logger = logging.getLogger(__name__)
+
 
 class Base(DeclarativeBase):
     pass
 
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False},
-)
+def _is_memory_sqlite(url: str) -> bool:
+    database = make_url(url).database
+    return database in (None, "", ":memory:") or "mode=memory" in url
+
+
+def normalize_url(url: str) -> str:
+    """Pick the bundled driver for bare ``postgresql://`` URLs."""
+    parsed = make_url(url)
+    if parsed.drivername in ("postgresql", "postgres"):
+        parsed = parsed.set(drivername="postgresql+psycopg")
+    return parsed.render_as_string(hide_password=False)
+
+
+def async_url(url: str) -> str:
+    """Map ``url`` onto the asyncio driver of its backend (aiosqlite / async psycopg)."""
+    parsed = make_url(normalize_url(url))
+    if parsed.get_backend_name() == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed.render_as_string(hide_password=False)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+        cursor.execute(f"PRAGMA temp_store={settings.SQLITE_TEMP_STORE}")
+    finally:
+        cursor.close()
+
+
+def _engine_kwargs(url: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    is_sqlite = make_url(url).get_backend_name() == "sqlite"
+    if is_sqlite:
+        connect_args = kwargs.pop("connect_args", {})
+        connect_args.setdefault("check_same_thread", False)
+        connect_args.setdefault("timeout", settings.SQLITE_BUSY_TIMEOUT_MS / 1000)
+        kwargs["connect_args"] = connect_args
+    else:
+        kwargs.setdefault("pool_pre_ping", True)
+    if not (is_sqlite and _is_memory_sqlite(url)) and "poolclass" not in kwargs:
+        kwargs.setdefault("pool_size", settings.DB_POOL_SIZE)
+        kwargs.setdefault("max_overflow", settings.DB_MAX_OVERFLOW)
+        kwargs.setdefault("pool_timeout", settings.DB_POOL_TIMEOUT)
+    return kwargs
+
+
+def make_engine(url: str = settings.DATABASE_URL, **kwargs) -> Engine:
+    """Create an engine for ``url``, applying the tuning that fits its dialect.
+
+    SQLite gets the configured PRAGMAs and thread-sharing connect args; server
+    databases get a pre-pinged connection pool. Pool sizing applies to both,
+    except for in-memory SQLite which must stay on a single connection.
+    """
+    url = normalize_url(url)
+    new_engine = create_engine(url, **_engine_kwargs(url, kwargs))
+    if new_engine.dialect.name == "sqlite":
+        event.listen(new_engine, "connect", _apply_sqlite_pragmas)
+    return new_engine
+
+
+def make_async_engine(url: str = settings.DATABASE_URL, **kwargs) -> AsyncEngine:
+    """Asyncio counterpart of ``make_engine`` with the same tuning and pool policy."""
+    url = async_url(url)
+    kwargs = _engine_kwargs(url, kwargs)
+    if "pool_size" in kwargs:
+        # aiosqlite would otherwise default to NullPool for file databases.
+        kwargs.setdefault("poolclass", AsyncAdaptedQueuePool)
+    new_engine = create_async_engine(url, **kwargs)
+    if new_engine.dialect.name == "sqlite":
+        event.listen(new_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    return new_engine
+
+
+# Indexes older databases may still carry, by table, dropped on startup.
+_RETIRED_INDEXES = {
+    # Partial on visibility LIKE 'private:%', which no viewer's query could use.
+    "events": ("ix_events_private",),
+}
+
+
+def init_db(bind: Union[Engine, Connection]) -> None:
+    """Create missing tables, then any indexes added to tables that already exist.
+
+    Before a unique index is added to an existing table, the rows it would
+    reject are deleted (see ``_drop_duplicates``), so startup cannot fail on
+    a database written before the index existed. Retired indexes are dropped.
+    """
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() if isinstance(bind, Engine) else nullcontext(bind) as conn:
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in existing:
+                    continue
+                if index.unique:
+                    _drop_duplicates(conn, table, index)
+                index.create(bind=conn, checkfirst=True)
+            for name in _RETIRED_INDEXES.get(table.name, ()):
+                if name in existing:
+                    conn.execute(text(f"DROP INDEX {conn.dialect.identifier_preparer.quote(name)}"))
+
+
+def _ranking(rows, table: Table) -> list:
+    """What decides which of ``table``'s duplicate rows is kept, most significant first; ``rows`` is it or an alias."""
+    if "updated_at" in table.c:
+        return [rows.c.updated_at, rows.c.id]
+    if "last_seen_event_id" in table.c:
+        # The cursor that got furthest. Event ids were random before ULIDs, so
+        # rank by the time of the event each cursor points at.
+        events = table.metadata.tables["events"]
+        seen_at = select(events.c.created_at).where(events.c.id == rows.c.last_seen_event_id)
+        return [seen_at.correlate_except(events).scalar_subquery(), rows.c.last_seen_event_id, rows.c.id]
+    return [rows.c.id]
+
+
+def _drop_duplicates(conn: Connection, table: Table, index: Index) -> None:
+    """Keep one row per key of ``index``: the highest by ``_ranking``, where NULL ranks lowest."""
+    other = table.alias("other")
+    ranked = None
+    for theirs, ours in reversed(list(zip(_ranking(other, table), _ranking(table, table)))):
+        higher = or_(theirs > ours, and_(ours.is_(None), theirs.is_not(None)))
+        ranked = higher if ranked is None else or_(higher, and_(theirs.is_not_distinct_from(ours), ranked))
+    same_key = [other.c[column.name] == column for column in index.columns]
+    deleted = conn.execute(delete(table).where(exists().where(*same_key, ranked))).rowcount
+    if deleted:
+        logger.warning("Deleted %d duplicate rows from %s before adding %s", deleted, table.name, index.name)
+
+
+def upsert_statement(
+    dialect_name: str,
+    model,
+    values: Dict[str, Any],
+    conflict_cols: Iterable[str],
+    update_cols: Optional[Iterable[str]] = None,
+    update_values: Optional[Dict[str, Any]] = None,
+):
+    """Build an ``INSERT ... ON CONFLICT`` for ``dialect_name``, or None if unsupported.
+
+    On conflict ``update_cols`` take the inserted values; ``update_values`` maps
+    further columns to explicit expressions (e.g. ``Model.counter + 1``).
+    """
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+
+    stmt = insert(model).values(**values)
+    if update_cols or update_values:
+        set_ = {col: stmt.excluded[col] for col in update_cols or []}
+        set_.update(update_values or {})
+        return stmt.on_conflict_do_update(index_elements=list(conflict_cols), set_=set_)
+    return stmt.on_conflict_do_nothing(index_elements=list(conflict_cols))
+
+
+def upsert(
+    db: Session,
+    model,
+    values: Dict[str, Any],
+    conflict_cols: Iterable[str],
+    update_cols: Optional[Iterable[str]] = None,
+) -> None:
+    """Insert ``values`` or, if a row with the same ``conflict_cols`` exists, update ``update_cols``.
+
+    Uses ``INSERT ... ON CONFLICT`` on PostgreSQL and SQLite, which needs a unique
+    index over ``conflict_cols``. With no ``update_cols`` an existing row is left alone.
+    """
+    conflict_cols = list(conflict_cols)
+    update_cols = list(update_cols or [])
+    stmt = upsert_statement(db.get_bind().dialect.name, model, values, conflict_cols, update_cols)
+    if stmt is not None:
+        db.execute(stmt)
+        return
+
+    existing = db.query(model).filter_by(**{c: values[c] for c in conflict_cols}).first()
+    if existing is None:
+        db.add(model(**values))
+    else:
+        for col in update_cols:
+            setattr(existing, col, values[col])
+    db.flush()
+
+
+# The sync engine runs schema setup, scripts and benchmarks; requests go through
+# the async engine so they never hold one of the server's worker threads.
+engine = make_engine(settings.DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = make_async_engine(settings.DATABASE_URL)
+
+# Objects outlive the commit that created them while the response is built.
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
-def get_db():
-    db = SessionLocal()
+
+# Set at startup when SHARD_MODE=per_campaign (see sharding.ShardRouter).
+_shard_router = None
+
+
+def get_shard_router():
+    return _shard_router
+
+
+def set_shard_router(router) -> None:
+    global _shard_router
+    _shard_router = router
+
+
+# Services are written against a sync Session. Their ``*_async`` wrappers run them
+# on an AsyncSession through ``run_sync``, so each query awaits the async driver
+# on the event loop instead of blocking a threadpool worker.
+#
+# Each request is one unit of work: services only flush, and the session is
+# committed once after the endpoint returns (rolled back if it raised). FastAPI
+# runs this before sending the response, so a failed commit is still a 500.
+async def get_db(request: Request):
+    campaign_id = request.path_params.get("campaign_id")
+    if _shard_router is None or campaign_id is None:
+        async with AsyncSessionLocal() as db:
+            yield db
+            await db.commit()
+        return
+
+    try:
+        shard = await _shard_router.acquire(campaign_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     try:
-        yield db
+        async with shard.session_factory() as db:
+            yield db
+            await db.commit()
     finally:
-        db.close()
+        _shard_router.release(shard)
+
+
+@asynccontextmanager
+async def campaign_session(campaign_id: str) -> AsyncIterator[AsyncSession]:
+    """A session on ``campaign_id``'s database, for work outside a request (see ``get_db``)."""
+    if _shard_router is None:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        async with _shard_router.session(campaign_id) as db:
+            yield db
@@ -0,0 +1,54 @@
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+# Crockford base32, as used by ULIDs: sorts the same as the numbers it encodes.
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_DECODE = {c: i for i, c in enumerate(_ALPHABET)}
+_RANDOM_BITS = 80
+_ID_LENGTH = 26
+
+_lock = threading.Lock()
+_last_ms = -1
+_last_random = 0
+
+
+def new_id() -> str:
+    """A 26-character ULID: 48-bit millisecond timestamp then 80 random bits.
+
+    Ids sort in creation order, so inserts land on the right edge of the primary
+    key index. Within one millisecond the random part is incremented rather than
+    redrawn, keeping ids from this process strictly increasing.
+    """
+    global _last_ms, _last_random
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms <= _last_ms:
+            now_ms = _last_ms
+            _last_random += 1
+            if _last_random >> _RANDOM_BITS:
+                # Random part exhausted within this millisecond: borrow the next one.
+                now_ms += 1
+                _last_random = int.from_bytes(os.urandom(10), "big")
+        else:
+            _last_random = int.from_bytes(os.urandom(10), "big")
+        _last_ms = now_ms
+        value = (now_ms << _RANDOM_BITS) | _last_random
+
+    chars = []
+    for _ in range(_ID_LENGTH):
+        chars.append(_ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+def id_timestamp(value: str) -> Optional[datetime]:
+    """Creation time encoded in a ULID, or None for legacy ids (8-char hex from uuid4)."""
+    if len(value) != _ID_LENGTH or any(c not in _DECODE for c in value):
+        return None
+    ms = 0
+    for c in value[:10]:
+        ms = (ms << 5) | _DECODE[c]
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
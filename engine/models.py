@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String, text
 from db import Base
 
 
@@ -27,6 +27,10 @@ class Actor(Base):
     actor_type = Column(String, nullable=False)  # dm/player/human
     is_ai = Column(Boolean, default=False)
 
+    __table_args__ = (
+        Index("ix_actors_campaign", "campaign_id"),
+    )
+
 
 class Event(Base):
     __tablename__ = "events"
@@ -39,6 +43,29 @@ class Event(Base):
     visibility = Column(String, nullable=False)  # public/party/private:<actor_id>/dm_only
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    # One partial index per shared visibility class, so a viewer's query only
+    # touches the classes it may see (see event_service.visibility_clause).
+    # Private events are looked up by their exact visibility, which no partial
+    # predicate on the class can be proven from, so they use a plain index.
+    __table_args__ = (
+        Index("ix_events_campaign_created", "campaign_id", "created_at"),
+        Index(
+            "ix_events_shared",
+            "campaign_id",
+            "created_at",
+            postgresql_where=text("visibility IN ('public', 'party')"),
+            sqlite_where=text("visibility IN ('public', 'party')"),
+        ),
+        Index(
+            "ix_events_dm_only",
+            "campaign_id",
+            "created_at",
+            postgresql_where=text("visibility = 'dm_only'"),
+            sqlite_where=text("visibility = 'dm_only'"),
+        ),
+        Index("ix_events_campaign_visibility_created", "campaign_id", "visibility", "created_at"),
+    )
+
 
 class Roll(Base):
     __tablename__ = "rolls"
@@ -64,6 +91,10 @@ class Memory(Base):
     tags = Column(String, default="[]")  # JSON list
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_memories_campaign_created", "campaign_id", "created_at"),
+    )
+
 
 class StateKV(Base):
     __tablename__ = "state_kv"
@@ -74,6 +105,11 @@ class StateKV(Base):
     value = Column(String, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow)
 
+    # Upsert target for mutation_service.set_kv.
+    __table_args__ = (
+        Index("ux_state_kv_campaign_key", "campaign_id", "key", unique=True),
+    )
+
 
 class ActorCursor(Base):
     __tablename__ = "actor_cursors"
@@ -82,3 +118,35 @@ class ActorCursor(Base):
     campaign_id = Column(String, ForeignKey("campaigns.id"), nullable=False)
     actor_id = Column(String, ForeignKey("actors.id"), nullable=False)
     last_seen_event_id = Column(String, nullable=True)
+
+    # Upsert target for the director's _move_cursor.
+    __table_args__ = (
+        Index("ux_actor_cursors_campaign_actor", "campaign_id", "actor_id", unique=True),
+    )
+
+
+class ActorSummary(Base):
+    __tablename__ = "actor_summaries"
+
+    id = Column(String, primary_key=True)
+    campaign_id = Column(String, ForeignKey("campaigns.id"), nullable=False)
+    actor_id = Column(String, ForeignKey("actors.id"), nullable=False)
+    text = Column(String, nullable=False, default="")
+    # The events folded in so far: first and last id, and how many.
+    first_event_id = Column(String, nullable=True)
+    last_event_id = Column(String, nullable=True)
+    event_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ux_actor_summaries_campaign_actor", "campaign_id", "actor_id", unique=True),
+    )
+
+
+class CampaignVersion(Base):
+    __tablename__ = "campaign_versions"
+
+    # Kept off the campaigns row so bumping it never contends with the turn claim
+    # in advance_turn. Campaigns without a row are at version 0.
+    campaign_id = Column(String, ForeignKey("campaigns.id"), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -1,31 +1,65 @@
-import json
-import uuid
 from datetime import datetime
+from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from auth import verify_engine_key
-from db import get_db
-from models import Actor, Campaign, StateKV
-from schemas import CampaignCreate, CampaignOut, ActorOut, MutateRequest, StateOut
-from services.state_service import get_campaign_state
+from db import get_db, get_shard_router
+from ids import new_id
+from models import Actor, Campaign
+from schemas import CampaignCreate, CampaignHeadOut, CampaignOut, CampaignRef, ActorOut, MutateRequest, StateOut
+from services.mutation_service import UnknownMutationError, apply_mutations_async
+from services.state_service import get_campaign_state_async, wait_for_version_async
+from write_pipeline import run_write
 
 router = APIRouter(prefix="/v1/campaigns", tags=["campaigns"])
 
+MAX_WAIT_SECONDS = 60.0
+
+
+@router.get("", response_model=List[CampaignRef])
+async def list_campaigns(
+    db: AsyncSession = Depends(get_db),
+    _key: str = Depends(verify_engine_key),
+):
+    """Every campaign id, oldest first; runners use it to discover tables."""
+    shard_router = get_shard_router()
+    if shard_router is None:
+        return await db.run_sync(_list_campaigns)
+    return await shard_router.list_campaigns()
+
+
+def _list_campaigns(db: Session) -> List[CampaignRef]:
+    rows = db.query(Campaign.id, Campaign.created_at).order_by(Campaign.created_at, Campaign.id).all()
+    return [CampaignRef(id=row.id, created_at=row.created_at) for row in rows]
+
 
 @router.post("", response_model=CampaignOut)
-def create_campaign(
+async def create_campaign(
     body: CampaignCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     _key: str = Depends(verify_engine_key),
 ):
-    campaign_id = uuid.uuid4().hex[:8]
+    campaign_id = new_id()
+    shard_router = get_shard_router()
+    if shard_router is None:
+        return await run_write(db, _create_campaign, campaign_id, body)
+    async with shard_router.create(campaign_id) as shard_db:
+        campaign = await run_write(shard_db, _create_campaign, campaign_id, body)
+        await shard_db.commit()
+        return campaign
+
+
+def _create_campaign(db: Session, campaign_id: str, body: CampaignCreate) -> CampaignOut:
+    # Initial turn_owner is the dm actor if there is one
+    dm_actor = next((a for a in body.actors if a.actor_type == "dm"), None)
     campaign = Campaign(
         id=campaign_id,
         name=body.name,
         created_at=datetime.utcnow(),
         state_json="{}",
         ai_only_streak=0,
-        turn_owner="dm",
+        turn_owner=dm_actor.id if dm_actor else "dm",
     )
     db.add(campaign)
 
@@ -41,15 +75,7 @@ def create_campaign(
         db.add(actor)
         actors.append(actor)
 
-    db.commit()
-    db.refresh(campaign)
-
-    # Set initial turn_owner to dm actor id if exists
-    dm_actor = next((a for a in actors if a.actor_type == "dm"), None)
-    if dm_actor:
-        campaign.turn_owner = dm_actor.id
-        db.commit()
-        db.refresh(campaign)
+    db.flush()
 
     return CampaignOut(
         id=campaign.id,
@@ -62,107 +88,43 @@ def create_campaign(
 
 
 @router.get("/{campaign_id}/state", response_model=StateOut)
-def get_state(
+async def get_state(
     campaign_id: str,
     viewer: str = Query(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     _key: str = Depends(verify_engine_key),
 ):
     try:
-        return get_campaign_state(db, campaign_id, viewer)
+        return await get_campaign_state_async(db, campaign_id, viewer)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/{campaign_id}/version", response_model=CampaignHeadOut)
+async def get_version(
+    campaign_id: str,
+    after: int = Query(-1, description="Return once the version differs from this."),
+    wait: float = Query(0.0, ge=0, le=MAX_WAIT_SECONDS, description="Long-poll up to this many seconds."),
+    db: AsyncSession = Depends(get_db),
+    _key: str = Depends(verify_engine_key),
+):
+    """The campaign's version and turn owner; runners park here while the table is idle."""
+    try:
+        return await wait_for_version_async(db, campaign_id, after, wait)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 
 @router.post("/{campaign_id}/mutate")
-def mutate_state(
+async def mutate_state(
     campaign_id: str,
     body: MutateRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     _key: str = Depends(verify_engine_key),
 ):
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
-    if not campaign:
-        raise HTTPException(status_code=404, detail="Campaign not found")
-
-    results = []
-
-    for mutation in body.mutations:
-        mut_type = mutation.type
-        payload = mutation.payload
-
-        if mut_type == "hp_set":
-            actor_id = payload["actor_id"]
-            hp = int(payload["hp"])
-            _set_kv(db, campaign_id, f"hp:{actor_id}", str(hp))
-            results.append({"type": mut_type, "key": f"hp:{actor_id}", "value": hp})
-
-        elif mut_type == "hp_delta":
-            actor_id = payload["actor_id"]
-            delta = int(payload["delta"])
-            current = _get_kv(db, campaign_id, f"hp:{actor_id}", "0")
-            new_hp = int(current) + delta
-            _set_kv(db, campaign_id, f"hp:{actor_id}", str(new_hp))
-            results.append({"type": mut_type, "key": f"hp:{actor_id}", "value": new_hp})
-
-        elif mut_type == "inventory_add":
-            actor_id = payload["actor_id"]
-            item = payload["item"]
-            current = json.loads(_get_kv(db, campaign_id, f"inventory:{actor_id}", "[]"))
-            current.append(item)
-            _set_kv(db, campaign_id, f"inventory:{actor_id}", json.dumps(current))
-            results.append({"type": mut_type, "key": f"inventory:{actor_id}", "value": current})
-
-        elif mut_type == "inventory_remove":
-            actor_id = payload["actor_id"]
-            item = payload["item"]
-            current = json.loads(_get_kv(db, campaign_id, f"inventory:{actor_id}", "[]"))
-            if item in current:
-                current.remove(item)
-            _set_kv(db, campaign_id, f"inventory:{actor_id}", json.dumps(current))
-            results.append({"type": mut_type, "key": f"inventory:{actor_id}", "value": current})
-
-        elif mut_type == "flag_set":
-            key = payload["key"]
-            value = payload["value"]
-            _set_kv(db, campaign_id, f"flag:{key}", json.dumps(value))
-            results.append({"type": mut_type, "key": f"flag:{key}", "value": value})
-
-        elif mut_type == "time_advance":
-            amount = payload["amount"]
-            unit = payload["unit"]
-            _set_kv(db, campaign_id, "time:current", f"{amount} {unit}")
-            results.append({"type": mut_type, "key": "time:current", "value": f"{amount} {unit}"})
-
-        else:
-            raise HTTPException(status_code=400, detail=f"Unknown mutation type: {mut_type}")
-
-    db.commit()
-    return {"mutations_applied": len(results), "results": results}
-
-
-def _get_kv(db: Session, campaign_id: str, key: str, default: str = "") -> str:
-    row = db.query(StateKV).filter(
-        StateKV.campaign_id == campaign_id,
-        StateKV.key == key,
-    ).first()
-    return row.value if row else default
-
-
-def _set_kv(db: Session, campaign_id: str, key: str, value: str):
-    row = db.query(StateKV).filter(
-        StateKV.campaign_id == campaign_id,
-        StateKV.key == key,
-    ).first()
-    if row:
-        row.value = value
-        row.updated_at = datetime.utcnow()
-    else:
-        row = StateKV(
-            id=uuid.uuid4().hex[:8],
-            campaign_id=campaign_id,
-            key=key,
-            value=value,
-            updated_at=datetime.utcnow(),
-        )
-        db.add(row)
+    try:
+        return await apply_mutations_async(db, campaign_id, body)
+    except UnknownMutationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
@@ -1,22 +1,24 @@
-import uuid
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from auth import verify_engine_key
 from db import get_db
+from ids import new_id
 from models import Roll
 from schemas import RollOut, RollRequest, EventCreate
 from services.dice_service import roll_dice
 from services.event_service import append_event
+from write_pipeline import run_write
 
 router = APIRouter(prefix="/v1/campaigns", tags=["dice"])
 
 
 @router.post("/{campaign_id}/roll", response_model=RollOut)
-def roll(
+async def roll(
     campaign_id: str,
     body: RollRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     _key: str = Depends(verify_engine_key),
 ):
     try:
@@ -24,8 +26,13 @@ def roll(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+    roll_obj = await run_write(db, _record_roll, campaign_id, body, result, breakdown)
+    return RollOut.model_validate(roll_obj)
+
+
+def _record_roll(db: Session, campaign_id: str, body: RollRequest, result: int, breakdown: str) -> Roll:
     roll_obj = Roll(
-        id=uuid.uuid4().hex[:8],
+        id=new_id(),
         campaign_id=campaign_id,
         actor_id=body.actor_id,
         expr=body.expr,
@@ -35,10 +42,8 @@ def roll(
         created_at=datetime.utcnow(),
     )
     db.add(roll_obj)
-    db.commit()
-    db.refresh(roll_obj)
 
-    # Log as event
+    # Log as event; both rows go out in one flush
     event_create = EventCreate(
         actor_id=body.actor_id,
         event_type="roll",
@@ -46,5 +51,4 @@ def roll(
         visibility="public",
     )
     append_event(db, campaign_id, event_create)
-
-    return RollOut.model_validate(roll_obj)
+    return roll_obj
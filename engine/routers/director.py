@@ -1,21 +1,86 @@
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from auth import verify_engine_key
 from db import get_db
-from schemas import DirectorNextOut, DirectorNextRequest
-from services.director_service import next_director_context
+from schemas import (
+    DirectorBatchOut,
+    DirectorBatchRequest,
+    DirectorNextOut,
+    DirectorNextRequest,
+    FloorClaimRequest,
+    FloorLeaseOut,
+    FloorReleaseOut,
+)
+from serialization import FieldTree, fast_response, fields_param, project
+from services.director_service import director_batch_async, next_director_context_async
+from services.turn_service import FloorHeldError, check_floor_async, claim_floor_async, release_floor_async
 
 router = APIRouter(prefix="/v1/campaigns", tags=["director"])
 
 
 @router.post("/{campaign_id}/director/next", response_model=DirectorNextOut)
-def director_next(
+async def director_next(
     campaign_id: str,
     body: DirectorNextRequest,
-    db: Session = Depends(get_db),
+    projection: Optional[FieldTree] = Depends(fields_param(DirectorNextOut.model_fields)),
+    db: AsyncSession = Depends(get_db),
     _key: str = Depends(verify_engine_key),
 ):
     try:
-        return next_director_context(db, campaign_id, body)
+        if body.worker_id:
+            await check_floor_async(db, campaign_id, body.worker_id)
+        package = await next_director_context_async(db, campaign_id, body)
+    except FloorHeldError as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": str(e.retry_after())})
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return fast_response(project(package, projection))
+
+
+@router.post("/{campaign_id}/director/batch", response_model=DirectorBatchOut)
+async def director_batch(
+    campaign_id: str,
+    body: DirectorBatchRequest,
+    projection: Optional[FieldTree] = Depends(fields_param(DirectorBatchOut.model_fields)),
+    db: AsyncSession = Depends(get_db),
+    _key: str = Depends(verify_engine_key),
+):
+    try:
+        if body.worker_id:
+            await check_floor_async(db, campaign_id, body.worker_id)
+        batch = await director_batch_async(db, campaign_id, body)
+    except FloorHeldError as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": str(e.retry_after())})
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return fast_response(project(batch, projection))
+
+
+@router.post("/{campaign_id}/director/claim", response_model=FloorLeaseOut)
+async def director_claim(
+    campaign_id: str,
+    body: FloorClaimRequest,
+    db: AsyncSession = Depends(get_db),
+    _key: str = Depends(verify_engine_key),
+):
+    """Take the campaign's floor for ``worker_id``, or renew its lease; 409 while another worker holds it."""
+    try:
+        return await claim_floor_async(db, campaign_id, body.worker_id)
+    except FloorHeldError as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": str(e.retry_after())})
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/{campaign_id}/director/release", response_model=FloorReleaseOut)
+async def director_release(
+    campaign_id: str,
+    body: FloorClaimRequest,
+    db: AsyncSession = Depends(get_db),
+    _key: str = Depends(verify_engine_key),
+):
+    try:
+        return await release_floor_async(db, campaign_id, body.worker_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
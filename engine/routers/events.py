@@ -1,32 +1,34 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from auth import verify_engine_key
 from db import get_db
 from schemas import EventCreate, EventOut
-from services.event_service import append_event, list_events
+from serialization import EVENT_FIELDS, FieldTree, event_row, fast_response, fields_param, project
+from services.event_service import append_event_async, list_events_async
 
 router = APIRouter(prefix="/v1/campaigns", tags=["events"])
 
 
 @router.post("/{campaign_id}/events", response_model=EventOut)
-def create_event(
+async def create_event(
     campaign_id: str,
     body: EventCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     _key: str = Depends(verify_engine_key),
 ):
-    event = append_event(db, campaign_id, body)
+    event = await append_event_async(db, campaign_id, body)
     return EventOut.model_validate(event)
 
 
 @router.get("/{campaign_id}/events", response_model=List[EventOut])
-def get_events(
+async def get_events(
     campaign_id: str,
     viewer: str = Query(...),
     after: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    projection: Optional[FieldTree] = Depends(fields_param(EVENT_FIELDS)),
+    db: AsyncSession = Depends(get_db),
     _key: str = Depends(verify_engine_key),
 ):
-    events = list_events(db, campaign_id, viewer, after)
-    return [EventOut.model_validate(e) for e in events]
+    events = await list_events_async(db, campaign_id, viewer, after)
+    return fast_response(project([event_row(e) for e in events], projection))
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends
+from auth import verify_engine_key
+from services.director_service import package_cache, speculative_packages
+from working_set import get_working_set
+
+router = APIRouter(prefix="/v1/metrics", tags=["metrics"])
+
+
+@router.get("/working-set")
+async def working_set_metrics(_key: str = Depends(verify_engine_key)):
+    working_set = get_working_set()
+    if working_set is None:
+        return {"enabled": False}
+    return {"enabled": True, **working_set.stats()}
+
+
+@router.get("/director-cache")
+async def director_cache_metrics(_key: str = Depends(verify_engine_key)):
+    return {**package_cache.stats(), "speculative": speculative_packages.stats()}
@@ -1,20 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from auth import verify_engine_key
+from config import settings
 from db import get_db
-from schemas import TurnAdvanceOut
-from services.turn_service import advance_turn
+from schemas import ActOut, ActRequest, TurnAdvanceOut
+from serialization import FieldTree, fast_response, fields_param, project, server_timing
+from services.act_service import apply_act_async
+from services.mutation_service import UnknownMutationError
+from services.turn_service import FloorHeldError, TurnInProgressError, advance_turn_async, check_floor_async
 
 router = APIRouter(prefix="/v1/campaigns", tags=["turns"])
 
 
 @router.post("/{campaign_id}/turn/advance", response_model=TurnAdvanceOut)
-def turn_advance(
+async def turn_advance(
     campaign_id: str,
-    db: Session = Depends(get_db),
+    precompute: Optional[bool] = Query(
+        None,
+        description="Build the next owner's director package in the background (default: DIRECTOR_PRECOMPUTE).",
+    ),
+    worker_id: Optional[str] = Query(None, description="Refuse the advance unless this worker holds the floor."),
+    db: AsyncSession = Depends(get_db),
     _key: str = Depends(verify_engine_key),
 ):
+    if precompute is None:
+        precompute = settings.DIRECTOR_PRECOMPUTE
     try:
-        return advance_turn(db, campaign_id)
+        if worker_id:
+            await check_floor_async(db, campaign_id, worker_id)
+        return await advance_turn_async(db, campaign_id, precompute)
+    except FloorHeldError as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": str(e.retry_after())})
+    except TurnInProgressError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/{campaign_id}/act", response_model=ActOut)
+async def act(
+    campaign_id: str,
+    body: ActRequest,
+    projection: Optional[FieldTree] = Depends(fields_param(ActOut.model_fields)),
+    db: AsyncSession = Depends(get_db),
+    _key: str = Depends(verify_engine_key),
+):
+    timings = {}
+    try:
+        result = await apply_act_async(db, campaign_id, body, timings)
+    except FloorHeldError as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": str(e.retry_after())})
+    except TurnInProgressError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except UnknownMutationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    response = fast_response(project(result, projection))
+    response.headers["Server-Timing"] = server_timing(timings)
+    return response
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from auth import verify_engine_key
+from db import get_db
+from schemas import PartialUtteranceCreate, UtteranceChunkOut
+from serialization import fast_response
+from services.utterance_service import append_partial_async, read_partials_async
+
+router = APIRouter(prefix="/v1/campaigns", tags=["utterances"])
+
+MAX_WAIT_SECONDS = 30.0
+
+
+@router.post("/{campaign_id}/utterances/partial", response_model=UtteranceChunkOut)
+async def post_partial(
+    campaign_id: str,
+    body: PartialUtteranceCreate,
+    db: AsyncSession = Depends(get_db),
+    _key: str = Depends(verify_engine_key),
+):
+    try:
+        chunk = await append_partial_async(
+            db, campaign_id, body.utterance_id, body.actor_id, body.text, body.visibility
+        )
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return fast_response(chunk)
+
+
+@router.get("/{campaign_id}/utterances", response_model=List[UtteranceChunkOut])
+async def get_utterances(
+    campaign_id: str,
+    viewer: str = Query(...),
+    after: int = Query(0, description="Return chunks with a larger seq than this."),
+    wait: float = Query(0.0, ge=0, le=MAX_WAIT_SECONDS, description="Long-poll up to this many seconds."),
+    db: AsyncSession = Depends(get_db),
+    _key: str = Depends(verify_engine_key),
+):
+    try:
+        chunks = await read_partials_async(db, campaign_id, viewer, after, wait)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return fast_response(chunks)
@@ -35,6 +35,17 @@ class CampaignOut(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class CampaignRef(BaseModel):
+    id: str
+    created_at: datetime
+
+
+class CampaignHeadOut(BaseModel):
+    campaign_id: str
+    version: int
+    turn_owner: str
+
+
 class EventCreate(BaseModel):
     actor_id: str
     event_type: str
@@ -90,6 +101,23 @@ class TurnAdvanceOut(BaseModel):
     last_event_id: Optional[str] = None
 
 
+class FloorClaimRequest(BaseModel):
+    # Any id unique to the runner process, e.g. host and pid.
+    worker_id: str
+
+
+class FloorLeaseOut(BaseModel):
+    campaign_id: str
+    worker_id: str
+    expires_at: datetime
+    lease_seconds: float
+
+
+class FloorReleaseOut(BaseModel):
+    campaign_id: str
+    released: bool
+
+
 class MemoryWrite(BaseModel):
     actor_id: str
     scope: str
@@ -121,6 +149,9 @@ class StateOut(BaseModel):
 class DirectorNextRequest(BaseModel):
     max_events: int = 50
     max_memories: int = 30
+    max_tokens: Optional[int] = None
+    # When set, the request is refused unless this worker holds the floor (see /director/claim).
+    worker_id: Optional[str] = None
 
 
 class DirectorMemoriesOut(BaseModel):
@@ -135,12 +166,75 @@ class DirectorConstraintsOut(BaseModel):
     stop_after_act: Optional[bool] = None
 
 
+class DirectorSummaryOut(BaseModel):
+    text: str
+    first_event_id: Optional[str] = None
+    last_event_id: Optional[str] = None
+    event_count: int
+
+
 class DirectorNextOut(BaseModel):
     should_act: bool
     actor_id: Optional[str] = None
     actor_role: Optional[str] = None
     reason: str
     viewer_state: Dict[str, Any]
+    summary: Optional[DirectorSummaryOut] = None
     visible_events: List[EventOut]
     memories: DirectorMemoriesOut
     constraints: DirectorConstraintsOut
+    estimated_tokens: Optional[int] = None
+
+
+class DirectorBatchRequest(DirectorNextRequest):
+    actor_ids: List[str]
+    # Off by default so warming prompts does not consume events.
+    advance_cursors: bool = False
+
+
+class DirectorBatchOut(BaseModel):
+    packages: List[DirectorNextOut]
+
+
+class ActRequest(BaseModel):
+    actor_id: str
+    say: str = ""
+    think: str = ""
+    ask: str = ""
+    state_updates: List[MutationItem] = []
+    visibility: str = "party"
+    advance_turn: bool = True
+    # When set, the response carries the next director package built with these limits.
+    director: Optional[DirectorNextRequest] = None
+    # Otherwise, optionally start building it in the background (see /turn/advance).
+    precompute: bool = False
+    # Finalizes the partial utterance streamed under this id (see /utterances/partial).
+    utterance_id: Optional[str] = None
+    # When set, the act is refused unless this worker holds the floor (see /director/claim).
+    worker_id: Optional[str] = None
+
+
+class ActOut(BaseModel):
+    event_id: Optional[str] = None
+    memory_id: Optional[str] = None
+    mutations_applied: int = 0
+    turn: Optional[TurnAdvanceOut] = None
+    director: Optional[DirectorNextOut] = None
+
+
+class PartialUtteranceCreate(BaseModel):
+    # Chosen by the caller, one per utterance; /act's utterance_id finalizes it.
+    utterance_id: str
+    actor_id: str
+    text: str
+    visibility: str = "party"
+
+
+class UtteranceChunkOut(BaseModel):
+    seq: int
+    utterance_id: str
+    actor_id: str
+    visibility: str
+    text: str
+    final: bool
+    event_id: Optional[str] = None
@@ -0,0 +1,103 @@
+from typing import Any, Collection, Dict, Optional, Sequence
+import orjson
+from fastapi import HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.engine import Row
+
+# Field order of EventOut / MemoryOut, and of the column tuples the services
+# select for them.
+EVENT_FIELDS = ("id", "campaign_id", "actor_id", "event_type", "content", "visibility", "created_at")
+MEMORY_FIELDS = ("id", "campaign_id", "actor_id", "scope", "text", "tags", "created_at")
+
+
+def _values(obj, fields: Sequence[str]):
+    # Zipping a Row is several times cheaper than reading its attributes; ORM
+    # objects and working-set records fall back to getattr.
+    if isinstance(obj, (Row, tuple)):
+        return obj
+    return [getattr(obj, name) for name in fields]
+
+
+def event_row(event) -> Dict[str, Any]:
+    return dict(zip(EVENT_FIELDS, _values(event, EVENT_FIELDS)))
+
+
+def memory_row(memory) -> Dict[str, Any]:
+    row = dict(zip(MEMORY_FIELDS, _values(memory, MEMORY_FIELDS)))
+    if isinstance(row["tags"], str):
+        row["tags"] = orjson.loads(row["tags"])
+    return row
+
+
+def fast_response(content: Any) -> ORJSONResponse:
+    """Serialize trusted engine output with orjson, bypassing ``response_model`` validation.
+
+    Routes keep their ``response_model`` for the OpenAPI schema; returning a
+    Response object makes FastAPI skip re-validating the content against it.
+    """
+    return ORJSONResponse(content)
+
+
+def server_timing(timings: Dict[str, float]) -> str:
+    """A ``Server-Timing`` header value for seconds per phase (durations in ms)."""
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.items())
+
+
+# A parsed ``fields=`` projection: each key maps to the projection of its value,
+# or None to keep the value whole.
+FieldTree = Dict[str, Optional["FieldTree"]]
+
+
+def parse_fields(fields: Optional[str], allowed: Collection[str]) -> Optional[FieldTree]:
+    """Parse ``fields=a,b.c,d.*.e`` into a FieldTree; None means no projection.
+
+    Top-level names must be in ``allowed`` (ValueError otherwise). Nested
+    segments are matched against whatever the payload holds; ``*`` matches
+    every key of a mapping.
+    """
+    if not fields:
+        return None
+    tree: FieldTree = {}
+    for path in fields.split(","):
+        parts = [p.strip() for p in path.split(".")]
+        if not parts[0]:
+            continue
+        if parts[0] not in allowed:
+            raise ValueError(f"Unknown field: {parts[0]}")
+        node = tree
+        for i, part in enumerate(parts):
+            if part in node and node[part] is None:
+                break  # an ancestor is already kept whole
+            if i == len(parts) - 1:
+                node[part] = None
+            else:
+                node = node.setdefault(part, {})
+    return tree
+
+
+def project(value: Any, tree: Optional[FieldTree]) -> Any:
+    """Keep only the fields in ``tree``; lists are projected item by item."""
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [project(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if "*" in tree:
+        return {key: project(item, tree["*"]) for key, item in value.items()}
+    return {key: project(value[key], sub) for key, sub in tree.items() if key in value}
+
+
+def fields_param(allowed: Collection[str]):
+    """Dependency parsing the ``fields`` query parameter; unknown fields are a 400."""
+    def dependency(
+        fields: Optional[str] = Query(
+            None,
+            description="Comma-separated fields to return; dotted paths select nested fields, '*' any key.",
+        ),
+    ) -> Optional[FieldTree]:
+        try:
+            return parse_fields(fields, allowed)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return dependency
@@ -0,0 +1,87 @@
+import time
+from typing import Any, Dict, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from models import Actor
+from schemas import ActRequest, EventCreate, MemoryWrite, MutateRequest
+from services.director_service import next_director_context_async, schedule_precompute
+from services.event_service import append_event
+from services.memory_service import write_memory
+from services.mutation_service import apply_mutations
+from services.turn_service import advance_turn, claim_floor
+from services.utterance_service import partial_utterances
+from write_pipeline import on_commit, run_write
+
+
+def spoken_text(body: ActRequest) -> str:
+    """The utterance ``/act`` logs: ``say`` only, as the runner always posted it (``ask`` is not spoken)."""
+    return body.say.strip()
+
+
+def apply_act(db: Session, campaign_id: str, body: ActRequest, timings: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """Apply one actor's model output (utterance, private thought, state updates, turn advance).
+
+    Everything is flushed into the request's single transaction, so the turn
+    lands whole or not at all.
+
+    Follows the runner's rules: only ``say`` is spoken, only non-DM
+    actors keep ``think`` as a private memory, and only the DM may mutate state.
+    ``timings``, if given, receives the seconds spent advancing the turn.
+    With ``body.worker_id`` the act is refused (``FloorHeldError``) unless that
+    worker holds the floor, and otherwise renews its lease.
+    """
+    if body.worker_id:
+        claim_floor(db, campaign_id, body.worker_id)
+    actor = db.query(Actor.actor_type).filter(Actor.id == body.actor_id, Actor.campaign_id == campaign_id).first()
+    if actor is None:
+        raise ValueError(f"Actor not found: {body.actor_id}")
+    is_dm = actor.actor_type == "dm"
+
+    result: Dict[str, Any] = {"event_id": None, "memory_id": None, "mutations_applied": 0, "turn": None}
+    content = spoken_text(body)
+    if content:
+        event = append_event(db, campaign_id, EventCreate(
+            actor_id=body.actor_id, event_type="utterance", content=content, visibility=body.visibility,
+        ))
+        result["event_id"] = event.id
+    think = body.think.strip()
+    if think and not is_dm:
+        memory = write_memory(db, campaign_id, MemoryWrite(actor_id=body.actor_id, scope="private", text=think))
+        result["memory_id"] = memory.id
+    if body.state_updates and is_dm:
+        applied = apply_mutations(db, campaign_id, MutateRequest(actor_id=body.actor_id, mutations=body.state_updates))
+        result["mutations_applied"] = applied["mutations_applied"]
+    if body.advance_turn:
+        started = time.perf_counter()
+        result["turn"] = advance_turn(db, campaign_id).model_dump()
+        if timings is not None:
+            timings["advance"] = time.perf_counter() - started
+    return result
+
+
+async def apply_act_async(
+    db: AsyncSession,
+    campaign_id: str,
+    body: ActRequest,
+    timings: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """``apply_act``, then the next director package if asked for.
+
+    ``timings``, if given, receives seconds per phase: ``apply`` (the writes,
+    less the turn advance), ``advance`` and ``director``.
+    """
+    timings = {} if timings is None else timings
+    started = time.perf_counter()
+    result = await run_write(db, apply_act, campaign_id, body, timings)
+    timings["apply"] = time.perf_counter() - started - timings.get("advance", 0.0)
+    result["director"] = None
+    if body.utterance_id:
+        event_id, text = result["event_id"], spoken_text(body)
+        on_commit(db, lambda: partial_utterances.finalize(campaign_id, body.utterance_id, text, event_id))
+    if body.director is not None:
+        started = time.perf_counter()
+        result["director"] = await next_director_context_async(db, campaign_id, body.director)
+        timings["director"] = time.perf_counter() - started
+    elif body.precompute and body.advance_turn:
+        on_commit(db, lambda: schedule_precompute(campaign_id))
+    return result
@@ -0,0 +1,142 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from models import Actor, ActorCursor, Campaign, Event
+from schemas import StateOut
+from services.event_service import campaign_events, is_visible, list_events
+from services.state_service import Snapshot, get_campaign_state, load_snapshot, state_from_entry
+from working_set import CampaignEntry
+
+
+class DbCampaignView:
+    """Read-only view of one campaign for the director, answered by queries."""
+
+    def __init__(self, db: Session, campaign_id: str):
+        self.db = db
+        self.campaign_id = campaign_id
+        self._actors: Optional[Dict[str, Actor]] = None
+
+    def turn_state(self) -> Optional[Tuple[str, int]]:
+        """``(turn_owner, ai_only_streak)``, or None if the campaign does not exist."""
+        row = self.db.query(Campaign.turn_owner, Campaign.ai_only_streak).filter(
+            Campaign.id == self.campaign_id
+        ).first()
+        return (row.turn_owner, row.ai_only_streak) if row else None
+
+    def actors(self) -> Dict[str, Actor]:
+        if self._actors is None:
+            self._actors = self._load_actors()
+        return self._actors
+
+    def actor(self, actor_id: str):
+        return self.actors().get(actor_id)
+
+    def recent_events(self, limit: int) -> List[Event]:
+        """The last ``limit`` events, newest first."""
+        return (
+            self.db.query(Event)
+            .filter(Event.campaign_id == self.campaign_id)
+            .order_by(Event.created_at.desc())
+            .limit(limit)
+            .all()
+        )
+
+    def latest_event_by(self, actor_ids: Iterable[str]) -> Optional[Event]:
+        actor_ids = list(actor_ids)
+        if not actor_ids:
+            return None
+        return (
+            self.db.query(Event)
+            .filter(Event.campaign_id == self.campaign_id, Event.actor_id.in_(actor_ids))
+            .order_by(Event.created_at.desc())
+            .first()
+        )
+
+    def cursor(self, actor_id: str) -> Optional[str]:
+        return self.db.query(ActorCursor.last_seen_event_id).filter(
+            ActorCursor.campaign_id == self.campaign_id,
+            ActorCursor.actor_id == actor_id,
+        ).scalar()
+
+    def visible_events(self, viewer_actor_id: str, after_event_id: Optional[str]) -> List[Event]:
+        return list_events(self.db, self.campaign_id, viewer_actor_id, after_event_id=after_event_id)
+
+    def visible_events_for(self, viewer_actor_ids: Iterable[str]) -> Dict[str, List[Event]]:
+        """``visible_events`` after each viewer's cursor, from one cursor and one event query."""
+        viewer_actor_ids = list(viewer_actor_ids)
+        cursor_times = dict(
+            self.db.query(ActorCursor.actor_id, Event.created_at)
+            .outerjoin(Event, Event.id == ActorCursor.last_seen_event_id)
+            .filter(ActorCursor.campaign_id == self.campaign_id, ActorCursor.actor_id.in_(viewer_actor_ids))
+            .all()
+        )
+        after = {actor_id: cursor_times.get(actor_id) for actor_id in viewer_actor_ids}
+        oldest = None if None in after.values() else min(after.values(), default=None)
+        events = campaign_events(self.db, self.campaign_id, oldest)
+
+        result = {}
+        for actor_id, since in after.items():
+            viewer = self.actor(actor_id)
+            viewer_is_dm = viewer is not None and viewer.actor_type == "dm"
+            result[actor_id] = [
+                e for e in events
+                if (since is None or e.created_at > since) and is_visible(e, actor_id, viewer_is_dm)
+            ]
+        return result
+
+    def state(self, viewer_actor_id: str) -> StateOut:
+        return get_campaign_state(self.db, self.campaign_id, viewer_actor_id)
+
+    def snapshot(self) -> Snapshot:
+        return load_snapshot(self.db, self.campaign_id)
+
+    def _load_actors(self) -> Dict[str, Actor]:
+        return {
+            a.id: a
+            for a in self.db.query(Actor).filter(Actor.campaign_id == self.campaign_id).all()
+        }
+
+
+class CachedCampaignView(DbCampaignView):
+    """The same view served from a working-set entry, querying only what the entry cannot answer."""
+
+    def __init__(self, db: Session, entry: CampaignEntry):
+        super().__init__(db, entry.campaign_id)
+        self.entry = entry
+
+    def turn_state(self) -> Optional[Tuple[str, int]]:
+        with self.entry.lock:
+            return self.entry.turn_owner, self.entry.ai_only_streak
+
+    def recent_events(self, limit: int):
+        events = self.entry.recent_events(limit)
+        return events if events is not None else super().recent_events(limit)
+
+    def latest_event_by(self, actor_ids: Iterable[str]):
+        return self.entry.latest_event_by(actor_ids)
+
+    def cursor(self, actor_id: str) -> Optional[str]:
+        return self.entry.cursors.get(actor_id)
+
+    def visible_events(self, viewer_actor_id: str, after_event_id: Optional[str]):
+        events = self.entry.events_after(after_event_id)
+        if events is None:
+            return super().visible_events(viewer_actor_id, after_event_id)
+        viewer = self.actor(viewer_actor_id)
+        viewer_is_dm = viewer is not None and viewer.actor_type == "dm"
+        return [e for e in events if is_visible(e, viewer_actor_id, viewer_is_dm)]
+
+    def visible_events_for(self, viewer_actor_ids: Iterable[str]):
+        return {
+            actor_id: self.visible_events(actor_id, self.cursor(actor_id))
+            for actor_id in viewer_actor_ids
+        }
+
+    def state(self, viewer_actor_id: str) -> StateOut:
+        return state_from_entry(self.entry, viewer_actor_id)
+
+    def snapshot(self) -> Snapshot:
+        return self.entry.snapshot()
+
+    def _load_actors(self):
+        with self.entry.lock:
+            return dict(self.entry.actors)
@@ -1,88 +1,118 @@
-import json
-import uuid
-from typing import Dict, List, Optional
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncContextManager, Callable, Dict, List, Optional, Set, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from models import Actor, ActorCursor, Campaign, Event
-from schemas import (
-    DirectorConstraintsOut,
-    DirectorMemoriesOut,
-    DirectorNextOut,
-    DirectorNextRequest,
-    EventOut,
-    MemoryOut,
-)
-from services.event_service import list_events
-from services.memory_service import read_memory
-from services.state_service import get_campaign_state
+from config import settings
+from db import campaign_session, upsert
+from ids import new_id
+from models import ActorCursor
+from schemas import DirectorBatchRequest, DirectorNextRequest, StateOut
+from serialization import event_row, memory_row
+from services.campaign_view import CachedCampaignView, DbCampaignView
+from services.memory_service import campaign_memories, memory_allows, read_memory
+from services.state_service import state_from_snapshot
+from services.summary_service import compact_summary, read_summaries, read_summary
+from tokens import json_tokens
+from versioning import campaign_head, touch
+from working_set import CampaignEntry, get_entry, note_change
+from write_pipeline import on_commit, run_write
+
+logger = logging.getLogger(__name__)
 
 AI_ONLY_STREAK_THRESHOLD = 3
 RECENT_EVENTS_LOOKBACK = 6
+_MEMORY_GROUPS = {"world": "world", "public": "world", "party": "party", "private": "private"}
+# Order in which memory groups claim what is left of a token budget.
+_MEMORY_PRIORITY = ("private", "party", "world")
 
 
-def _to_memory_out(memory) -> MemoryOut:
-    tags = json.loads(memory.tags) if isinstance(memory.tags, str) else memory.tags
-    return MemoryOut(
-        id=memory.id,
-        campaign_id=memory.campaign_id,
-        actor_id=memory.actor_id,
-        scope=memory.scope,
-        text=memory.text,
-        tags=tags,
-        created_at=memory.created_at,
-    )
+def _empty_response(reason: str) -> Dict[str, Any]:
+    return {
+        "should_act": False,
+        "actor_id": None,
+        "actor_role": None,
+        "reason": reason,
+        "viewer_state": {},
+        "summary": None,
+        "visible_events": [],
+        "memories": {"world": [], "party": [], "private": []},
+        "constraints": {"must_ask_question": False, "max_output_sentences": 6, "stop_after_act": None},
+        "estimated_tokens": None,
+    }
 
 
-def _empty_response(reason: str) -> DirectorNextOut:
-    return DirectorNextOut(
-        should_act=False,
-        reason=reason,
-        viewer_state={},
-        visible_events=[],
-        memories=DirectorMemoriesOut(world=[], party=[], private=[]),
-        constraints=DirectorConstraintsOut(must_ask_question=False, max_output_sentences=6),
-    )
+def _fit_to_budget(package: Dict[str, Any], max_tokens: int) -> Dict[str, Any]:
+    """Trim ``package`` greedily to roughly ``max_tokens``.
 
+    The decision, constraints, turn owner and actor list are always kept; then
+    the newest visible events (a contiguous run, so the model never sees a gap),
+    the summary of older events, memories by group, newest first, and finally
+    the rest of the viewer state. Whatever does not fit is dropped.
+    """
+    state = package["viewer_state"]
+    events = package["visible_events"]
+    memories = package["memories"]
+    trimmed = {
+        **package,
+        "viewer_state": {"turn_owner": state.get("turn_owner"), "actors": state.get("actors", [])},
+        "summary": None,
+        "visible_events": [],
+        "memories": {group: [] for group in memories},
+    }
+    used = json_tokens(trimmed)
 
-def _latest_dm_utterance(db: Session, campaign_id: str) -> Optional[Event]:
-    dm_actor_ids = [
-        a.id
-        for a in db.query(Actor).filter(
-            Actor.campaign_id == campaign_id,
-            Actor.actor_type == "dm",
-        ).all()
-    ]
-    if not dm_actor_ids:
-        return None
-    return (
-        db.query(Event)
-        .filter(Event.campaign_id == campaign_id, Event.actor_id.in_(dm_actor_ids))
-        .order_by(Event.created_at.desc())
-        .first()
-    )
+    kept_events = []
+    for row in reversed(events):
+        cost = json_tokens(row)
+        if used + cost > max_tokens:
+            break
+        kept_events.append(row)
+        used += cost
+    trimmed["visible_events"] = kept_events[::-1]
+
+    if package["summary"] is not None:
+        cost = json_tokens(package["summary"]) - json_tokens(None)
+        if used + cost <= max_tokens:
+            trimmed["summary"] = package["summary"]
+            used += cost
+
+    for group in _MEMORY_PRIORITY:
+        kept = []
+        for row in reversed(memories.get(group, [])):
+            cost = json_tokens(row)
+            if used + cost <= max_tokens:
+                kept.append(row)
+                used += cost
+        trimmed["memories"][group] = kept[::-1]
+
+    extra = json_tokens(state) - json_tokens(trimmed["viewer_state"])
+    if used + extra <= max_tokens:
+        trimmed["viewer_state"] = state
+        used += extra
+    trimmed["estimated_tokens"] = used
+    return trimmed
+
+
+def _latest_dm_utterance(view: DbCampaignView):
+    dm_actor_ids = [a.id for a in view.actors().values() if a.actor_type == "dm"]
+    return view.latest_event_by(dm_actor_ids)
 
 
-def _is_directly_addressed(db: Session, campaign_id: str, actor: Actor) -> bool:
-    last_dm = _latest_dm_utterance(db, campaign_id)
+def _is_directly_addressed(last_dm, actor) -> bool:
     if not last_dm:
         return False
     content = (last_dm.content or "").lower()
     return f"@{actor.id}".lower() in content or (actor.name or "").lower() in content
 
 
-def _recent_ai_only_streak(db: Session, campaign_id: str, limit: int = 3) -> int:
-    events = (
-        db.query(Event)
-        .filter(Event.campaign_id == campaign_id)
-        .order_by(Event.created_at.desc())
-        .limit(limit)
-        .all()
-    )
+def _recent_ai_only_streak(view: DbCampaignView, limit: int = 3) -> int:
     streak = 0
-    for event in events:
-        event_actor = db.query(Actor).filter(
-            Actor.campaign_id == campaign_id,
-            Actor.id == event.actor_id,
-        ).first()
+    for event in view.recent_events(limit):
+        event_actor = view.actor(event.actor_id)
         if event_actor and event_actor.is_ai:
             streak += 1
         else:
@@ -90,113 +120,434 @@ def _recent_ai_only_streak(db: Session, campaign_id: str, limit: int = 3) -> int
     return streak
 
 
-def _last_event(db: Session, campaign_id: str) -> Optional[Event]:
-    return (
-        db.query(Event)
-        .filter(Event.campaign_id == campaign_id)
-        .order_by(Event.created_at.desc())
-        .first()
+def _last_event(view: DbCampaignView):
+    events = view.recent_events(1)
+    return events[0] if events else None
+
+
+def _move_cursor(db: Session, campaign_id: str, actor_id: str, last_seen_event_id: str) -> None:
+    # Concurrent directors for the same actor may race to create the cursor;
+    # the upsert lets the loser update the winner's row instead of failing.
+    upsert(
+        db,
+        ActorCursor,
+        {
+            "id": new_id(),
+            "campaign_id": campaign_id,
+            "actor_id": actor_id,
+            "last_seen_event_id": last_seen_event_id,
+        },
+        conflict_cols=["campaign_id", "actor_id"],
+        update_cols=["last_seen_event_id"],
     )
+    if settings.SUMMARY_ENABLED:
+        compact_summary(db, campaign_id, actor_id, last_seen_event_id)
+    note_change(db, "cursor", campaign_id, (actor_id, last_seen_event_id))
+
+
+def advance_cursor(db: Session, campaign_id: str, actor_id: str, last_seen_event_id: str) -> None:
+    _move_cursor(db, campaign_id, actor_id, last_seen_event_id)
+    touch(db, campaign_id)
+
+
+def advance_cursors(db: Session, campaign_id: str, updates: List[Tuple[str, str, str]]) -> None:
+    """Apply several ``build_director_batch`` cursor moves in one transaction."""
+    for update in updates:
+        _move_cursor(db, *update)
+    touch(db, campaign_id)
+
+
+def next_director_context(db: Session, campaign_id: str, body: DirectorNextRequest) -> Dict[str, Any]:
+    package, cursor_update = build_director_context(db, campaign_id, body)
+    if cursor_update is not None:
+        advance_cursor(db, *cursor_update)
+    return package
 
 
-def _get_cursor(db: Session, campaign_id: str, actor_id: str) -> ActorCursor:
-    cursor = db.query(ActorCursor).filter(
-        ActorCursor.campaign_id == campaign_id,
-        ActorCursor.actor_id == actor_id,
-    ).first()
-    if cursor:
-        return cursor
+def _has_human_input(view: DbCampaignView) -> bool:
+    return any(
+        (event_actor := view.actor(e.actor_id)) is not None and not event_actor.is_ai
+        for e in view.recent_events(RECENT_EVENTS_LOOKBACK)
+    )
+
 
-    cursor = ActorCursor(
-        id=uuid.uuid4().hex,
-        campaign_id=campaign_id,
-        actor_id=actor_id,
-        last_seen_event_id=None,
+def _must_refocus(view: DbCampaignView, ai_only_streak: int) -> bool:
+    last_event = _last_event(view)
+    return (
+        ai_only_streak >= AI_ONLY_STREAK_THRESHOLD
+        or _recent_ai_only_streak(view, limit=AI_ONLY_STREAK_THRESHOLD) >= AI_ONLY_STREAK_THRESHOLD
+        or (last_event is not None and last_event.event_type == "system_refocus")
     )
-    db.add(cursor)
-    db.commit()
-    db.refresh(cursor)
-    return cursor
 
 
-def next_director_context(db: Session, campaign_id: str, body: DirectorNextRequest) -> DirectorNextOut:
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
-    if campaign is None:
+def _awaits_human(actor, has_human_input: bool, last_dm) -> bool:
+    # AI players only speak after a human has, or when the DM addresses them.
+    return actor.actor_type == "player" and actor.is_ai and not has_human_input and not _is_directly_addressed(last_dm, actor)
+
+
+def _group_memories(memories, max_memories: int) -> Dict[str, List[Dict[str, Any]]]:
+    grouped: Dict[str, List[Dict[str, Any]]] = {"world": [], "party": [], "private": []}
+    for mem in memories:
+        group = _MEMORY_GROUPS.get(mem.scope)
+        if group is not None and len(grouped[group]) < max_memories:
+            grouped[group].append(memory_row(mem))
+    return grouped
+
+
+def _assemble(
+    campaign_id: str,
+    actor,
+    must_refocus: bool,
+    body: DirectorNextRequest,
+    visible_events,
+    memories,
+    state: StateOut,
+    summary: Optional[Dict[str, Any]],
+) -> Tuple[Dict[str, Any], Optional[Tuple[str, str, str]]]:
+    visible_events = visible_events[:body.max_events]
+    cursor_update = (campaign_id, actor.id, visible_events[-1].id) if visible_events else None
+    package = {
+        "should_act": True,
+        "actor_id": actor.id,
+        "actor_role": actor.actor_type,
+        "reason": "refocus" if must_refocus else "turn_owner",
+        "viewer_state": state.model_dump(),
+        "summary": summary,
+        "visible_events": [event_row(e) for e in visible_events],
+        "memories": _group_memories(memories, body.max_memories),
+        "constraints": {
+            "must_ask_question": must_refocus,
+            "max_output_sentences": 6,
+            "stop_after_act": True if must_refocus else None,
+        },
+        "estimated_tokens": None,
+    }
+    if body.max_tokens is not None:
+        # Events trimmed for space still count as seen: the cursor moves past
+        # them rather than replaying stale context on the next tick.
+        package = _fit_to_budget(package, body.max_tokens)
+    return package, cursor_update
+
+
+def build_director_context(
+    db: Session,
+    campaign_id: str,
+    body: DirectorNextRequest,
+    entry: Optional[CampaignEntry] = None,
+) -> Tuple[Dict[str, Any], Optional[Tuple[str, str, str]]]:
+    """Read-only half of the director: the package plus the cursor move it implies.
+
+    The package is a plain dict shaped like ``DirectorNextOut``, ready to serialize,
+    trimmed to ``body.max_tokens`` when one is given.
+
+    The cursor update is returned as ``(campaign_id, actor_id, last_seen_event_id)``
+    (or None) for the caller to apply with ``advance_cursor``. With a working-set
+    ``entry`` only memories, the summary and anything the entry cannot answer
+    are queried.
+    """
+    view = CachedCampaignView(db, entry) if entry is not None else DbCampaignView(db, campaign_id)
+    turn_state = view.turn_state()
+    if turn_state is None:
         raise ValueError(f"Campaign not found: {campaign_id}")
+    turn_owner, ai_only_streak = turn_state
 
-    actor = db.query(Actor).filter(
-        Actor.campaign_id == campaign_id,
-        Actor.id == campaign.turn_owner,
-    ).first()
+    actor = view.actor(turn_owner)
     if actor is None:
-        return _empty_response("no_turn_owner")
-
-    recent_events = (
-        db.query(Event)
-        .filter(Event.campaign_id == campaign_id)
-        .order_by(Event.created_at.desc())
-        .limit(RECENT_EVENTS_LOOKBACK)
-        .all()
-    )
-    has_human_input = any(
-        db.query(Actor).filter(
-            Actor.campaign_id == campaign_id,
-            Actor.id == e.actor_id,
-            Actor.is_ai.is_(False),
-        ).first()
-        for e in recent_events
-    )
+        return _empty_response("no_turn_owner"), None
 
-    if actor.actor_type == "player" and actor.is_ai and not has_human_input and not _is_directly_addressed(db, campaign_id, actor):
-        return _empty_response("await_human_input")
+    # Same rule as _awaits_human, evaluated lazily: most turns need neither query.
+    if actor.actor_type == "player" and actor.is_ai and not _has_human_input(view):
+        if not _is_directly_addressed(_latest_dm_utterance(view), actor):
+            return _empty_response("await_human_input"), None
 
-    cursor = _get_cursor(db, campaign_id, actor.id)
-    visible_events = list_events(
-        db,
+    return _assemble(
         campaign_id,
-        actor.id,
-        after_event_id=cursor.last_seen_event_id,
-    )[:body.max_events]
-
-    if visible_events:
-        cursor.last_seen_event_id = visible_events[-1].id
-        db.commit()
-
-    all_memories = read_memory(db, campaign_id, actor.id)
-    grouped: Dict[str, List[MemoryOut]] = {"world": [], "party": [], "private": []}
-    for mem in all_memories:
-        mem_out = _to_memory_out(mem)
-        if mem.scope in ("world", "public"):
-            if len(grouped["world"]) < body.max_memories:
-                grouped["world"].append(mem_out)
-        elif mem.scope == "party":
-            if len(grouped["party"]) < body.max_memories:
-                grouped["party"].append(mem_out)
-        elif mem.scope == "private":
-            if len(grouped["private"]) < body.max_memories:
-                grouped["private"].append(mem_out)
-
-    last_event = _last_event(db, campaign_id)
-    must_refocus = (
-        campaign.ai_only_streak >= AI_ONLY_STREAK_THRESHOLD
-        or _recent_ai_only_streak(db, campaign_id, limit=AI_ONLY_STREAK_THRESHOLD) >= AI_ONLY_STREAK_THRESHOLD
-        or (last_event is not None and last_event.event_type == "system_refocus")
-    )
-    return DirectorNextOut(
-        should_act=True,
-        actor_id=actor.id,
-        actor_role=actor.actor_type,
-        reason="refocus" if must_refocus else "turn_owner",
-        viewer_state=get_campaign_state(db, campaign_id, actor.id).model_dump(),
-        visible_events=[EventOut.model_validate(e) for e in visible_events],
-        memories=DirectorMemoriesOut(
-            world=grouped["world"],
-            party=grouped["party"],
-            private=grouped["private"],
-        ),
-        constraints=DirectorConstraintsOut(
-            must_ask_question=must_refocus,
-            max_output_sentences=6,
-            stop_after_act=True if must_refocus else None,
-        ),
+        actor,
+        _must_refocus(view, ai_only_streak),
+        body,
+        view.visible_events(actor.id, view.cursor(actor.id)),
+        read_memory(db, campaign_id, actor.id),
+        view.state(actor.id),
+        read_summary(db, campaign_id, actor.id) if settings.SUMMARY_ENABLED else None,
     )
+
+
+def build_director_batch(
+    db: Session,
+    campaign_id: str,
+    actor_ids: List[str],
+    body: DirectorNextRequest,
+    entry: Optional[CampaignEntry] = None,
+) -> Tuple[List[Dict[str, Any]], List[Tuple[str, str, str]]]:
+    """``build_director_context`` for several actors, each as if it held the turn.
+
+    Roster, recent events, state, memories and summaries are loaded once and
+    filtered per viewer, so the query count does not grow with the number of
+    actors. Returns the packages in ``actor_ids`` order and the cursor moves
+    they imply.
+    """
+    view = CachedCampaignView(db, entry) if entry is not None else DbCampaignView(db, campaign_id)
+    turn_state = view.turn_state()
+    if turn_state is None:
+        raise ValueError(f"Campaign not found: {campaign_id}")
+    _, ai_only_streak = turn_state
+
+    has_human_input = _has_human_input(view)
+    last_dm = _latest_dm_utterance(view)
+    acting = {}
+    for actor_id in dict.fromkeys(actor_ids):
+        actor = view.actor(actor_id)
+        if actor is not None and not _awaits_human(actor, has_human_input, last_dm):
+            acting[actor_id] = actor
+
+    if acting:
+        must_refocus = _must_refocus(view, ai_only_streak)
+        events = view.visible_events_for(acting)
+        memories = campaign_memories(db, campaign_id)
+        snapshot = view.snapshot()
+        summaries = read_summaries(db, campaign_id, acting) if settings.SUMMARY_ENABLED else {}
+
+    built: Dict[str, Tuple[Dict[str, Any], Optional[Tuple[str, str, str]]]] = {}
+    for actor_id, actor in acting.items():
+        viewer_is_dm = actor.actor_type == "dm"
+        built[actor_id] = _assemble(
+            campaign_id,
+            actor,
+            must_refocus,
+            body,
+            events[actor_id],
+            [m for m in memories if memory_allows(m, actor_id, viewer_is_dm)],
+            state_from_snapshot(campaign_id, snapshot, actor_id),
+            summaries.get(actor_id),
+        )
+
+    packages = []
+    for actor_id in actor_ids:
+        if actor_id in built:
+            packages.append(built[actor_id][0])
+        else:
+            reason = "unknown_actor" if view.actor(actor_id) is None else "await_human_input"
+            packages.append({**_empty_response(reason), "actor_id": actor_id})
+    cursor_updates = [update for _, update in built.values() if update is not None]
+    return packages, cursor_updates
+
+
+class PackageCache:
+    """LRU of director packages keyed on ``(campaign, turn owner, limits, version)``.
+
+    Only packages that did not move a cursor are stored: serving one again is
+    exactly what a rebuild at the same version would return.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._packages: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            package = self._packages.get(key)
+            if package is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._packages.move_to_end(key)
+            return package
+
+    def put(self, key: tuple, package: Dict[str, Any]) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._packages[key] = package
+            self._packages.move_to_end(key)
+            while len(self._packages) > self.max_size:
+                self._packages.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._packages.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "packages": len(self._packages),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+package_cache = PackageCache(settings.DIRECTOR_CACHE_SIZE)
+
+# A build result: the package and the cursor move it implies, as returned by
+# build_director_context.
+BuildResult = Tuple[Dict[str, Any], Optional[Tuple[str, str, str]]]
+
+
+class SpeculativePackages:
+    """Director packages built ahead of the request, keyed like ``PackageCache``.
+
+    Each entry is a future, so a request that arrives while its package is still
+    being built waits for that build instead of starting another. Entries are
+    single-use (serving one moves the cursor, and so the version) and expire
+    after ``ttl_seconds``. Only touched from the event loop.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[tuple, Tuple[float, asyncio.Future]]" = OrderedDict()
+        self._requests: "OrderedDict[str, DirectorNextRequest]" = OrderedDict()
+        self.built = 0
+        self.served = 0
+        self.expired = 0
+
+    def remember(self, campaign_id: str, body: DirectorNextRequest) -> None:
+        """Record the limits the campaign's director asks with, for the next build."""
+        self._requests[campaign_id] = body
+        self._requests.move_to_end(campaign_id)
+        while len(self._requests) > self.max_size:
+            self._requests.popitem(last=False)
+
+    def request_for(self, campaign_id: str) -> DirectorNextRequest:
+        return self._requests.get(campaign_id) or DirectorNextRequest()
+
+    def reserve(self, key: tuple) -> Optional[asyncio.Future]:
+        """A future to resolve with the build for ``key``; None if one is already pending."""
+        now = time.monotonic()
+        current = self._entries.get(key)
+        if current is not None and current[0] > now:
+            return None
+        future = asyncio.get_running_loop().create_future()
+        self._entries[key] = (now + self.ttl_seconds, future)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return future
+
+    def take(self, key: tuple) -> Optional[asyncio.Future]:
+        item = self._entries.pop(key, None)
+        if item is None:
+            return None
+        deadline, future = item
+        if deadline <= time.monotonic():
+            self.expired += 1
+            return None
+        return future
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._requests.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._entries),
+            "built": self.built,
+            "served": self.served,
+            "expired": self.expired,
+        }
+
+
+speculative_packages = SpeculativePackages(settings.DIRECTOR_PRECOMPUTE_TTL_SECONDS)
+_precompute_tasks: Set[asyncio.Task] = set()
+
+
+def _cache_key(campaign_id: str, turn_owner: str, body: DirectorNextRequest, version: int) -> tuple:
+    return (campaign_id, turn_owner, body.max_events, body.max_memories, body.max_tokens, version)
+
+
+async def precompute_director_context(
+    campaign_id: str,
+    session_factory: Callable[[str], AsyncContextManager[AsyncSession]] = campaign_session,
+) -> None:
+    """Build the current turn owner's package ahead of its ``/director/next``.
+
+    Uses the limits the campaign's director last asked with. The result is only
+    kept if the campaign version did not move during the build.
+    """
+    body = speculative_packages.request_for(campaign_id)
+    async with session_factory(campaign_id) as db:
+        head = await db.run_sync(campaign_head, campaign_id)
+        if head is None:
+            return
+        version, turn_owner = head
+        future = speculative_packages.reserve(_cache_key(campaign_id, turn_owner, body, version))
+        if future is None:
+            return
+        result = None
+        try:
+            entry = await get_entry(db, campaign_id)
+            if entry is not None and entry.version != version:
+                entry = None
+            built = await db.run_sync(build_director_context, campaign_id, body, entry)
+            if await db.run_sync(campaign_head, campaign_id) == head:
+                result = built
+                speculative_packages.built += 1
+        finally:
+            future.set_result(result)
+
+
+def schedule_precompute(campaign_id: str) -> bool:
+    """Start ``precompute_director_context`` in the background; False if all workers are busy."""
+    if len(_precompute_tasks) >= settings.DIRECTOR_PRECOMPUTE_WORKERS:
+        return False
+    task = asyncio.get_running_loop().create_task(precompute_director_context(campaign_id))
+    _precompute_tasks.add(task)
+    task.add_done_callback(_precompute_done)
+    return True
+
+
+def _precompute_done(task: asyncio.Task) -> None:
+    _precompute_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Director precompute failed", exc_info=task.exception())
+
+
+async def next_director_context_async(
+    db: AsyncSession,
+    campaign_id: str,
+    body: DirectorNextRequest,
+) -> Dict[str, Any]:
+    speculative_packages.remember(campaign_id, body)
+    # Idle ticks stop here: one version read, then the cached package.
+    head = await db.run_sync(campaign_head, campaign_id)
+    if head is None:
+        raise ValueError(f"Campaign not found: {campaign_id}")
+    version, turn_owner = head
+    key = _cache_key(campaign_id, turn_owner, body, version)
+    package = package_cache.get(key)
+    if package is not None:
+        return package
+
+    # A precomputed build at this version is exactly what building now would give.
+    future = speculative_packages.take(key)
+    result: Optional[BuildResult] = await future if future is not None else None
+    if result is not None:
+        speculative_packages.served += 1
+    else:
+        entry = await get_entry(db, campaign_id)
+        if entry is not None and entry.version != version:
+            entry = None  # a commit has not reached the working set yet
+        result = await db.run_sync(build_director_context, campaign_id, body, entry)
+    package, cursor_update = result
+    if cursor_update is None:
+        # The version read may include this request's own uncommitted writes.
+        on_commit(db, lambda: package_cache.put(key, package))
+    else:
+        await run_write(db, advance_cursor, *cursor_update)
+    return package
+
+
+async def director_batch_async(db: AsyncSession, campaign_id: str, body: DirectorBatchRequest) -> Dict[str, Any]:
+    head = await db.run_sync(campaign_head, campaign_id)
+    if head is None:
+        raise ValueError(f"Campaign not found: {campaign_id}")
+    entry = await get_entry(db, campaign_id)
+    if entry is not None and entry.version != head[0]:
+        entry = None
+    packages, cursor_updates = await db.run_sync(build_director_batch, campaign_id, body.actor_ids, body, entry)
+    if body.advance_cursors and cursor_updates:
+        await run_write(db, advance_cursors, campaign_id, cursor_updates)
+    return {"packages": packages}
@@ -1,10 +1,16 @@
-import uuid
 from datetime import datetime
 from typing import List, Optional
+from sqlalchemy import or_
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from config import settings
+from ids import new_id
 from models import Actor, Event
 from schemas import EventCreate
+from serialization import EVENT_FIELDS
+from working_set import get_entry
+from write_pipeline import run_write
 
 
 def is_visible(
@@ -12,10 +18,18 @@ def is_visible(
     viewer_actor_id: str,
     viewer_is_dm: bool,
     dm_omniscient_private: Optional[bool] = None,
+) -> bool:
+    return visibility_allows(event.visibility, viewer_actor_id, viewer_is_dm, dm_omniscient_private)
+
+
+def visibility_allows(
+    vis: str,
+    viewer_actor_id: str,
+    viewer_is_dm: bool,
+    dm_omniscient_private: Optional[bool] = None,
 ) -> bool:
     if dm_omniscient_private is None:
         dm_omniscient_private = settings.DM_OMNISCIENT_PRIVATE
-    vis = event.visibility
 
     if vis == "public":
         return True
@@ -34,9 +48,29 @@ def is_visible(
     return False
 
 
+def visibility_clause(
+    viewer_actor_id: str,
+    viewer_is_dm: bool,
+    dm_omniscient_private: Optional[bool] = None,
+):
+    """SQL counterpart of ``is_visible``, matching the partial indexes on ``events``."""
+    if dm_omniscient_private is None:
+        dm_omniscient_private = settings.DM_OMNISCIENT_PRIVATE
+
+    clauses = [
+        Event.visibility.in_(("public", "party")),
+        Event.visibility == f"private:{viewer_actor_id}",
+    ]
+    if viewer_is_dm:
+        clauses.append(Event.visibility == "dm_only")
+        if dm_omniscient_private:
+            clauses.append(Event.visibility.like("private:%"))
+    return or_(*clauses)
+
+
 def append_event(db: Session, campaign_id: str, event_create: EventCreate) -> Event:
     event = Event(
-        id=uuid.uuid4().hex[:8],
+        id=new_id(),
         campaign_id=campaign_id,
         actor_id=event_create.actor_id,
         event_type=event_create.event_type,
@@ -45,17 +79,20 @@ def append_event(db: Session, campaign_id: str, event_create: EventCreate) -> Ev
         created_at=datetime.utcnow(),
     )
     db.add(event)
-    db.commit()
-    db.refresh(event)
+    db.flush()
     return event
 
 
+_EVENT_COLUMNS = [getattr(Event, name) for name in EVENT_FIELDS]
+
+
 def list_events(
     db: Session,
     campaign_id: str,
     viewer_actor_id: str,
     after_event_id: Optional[str] = None,
-) -> List[Event]:
+) -> List[Row]:
+    """Visible events as column tuples (attribute access works as on ``Event``)."""
     viewer_actor = db.query(Actor).filter(
         Actor.id == viewer_actor_id,
         Actor.campaign_id == campaign_id,
@@ -63,13 +100,43 @@ def list_events(
 
     viewer_is_dm = viewer_actor is not None and viewer_actor.actor_type == "dm"
 
-    query = db.query(Event).filter(Event.campaign_id == campaign_id).order_by(Event.created_at)
+    query = (
+        db.query(*_EVENT_COLUMNS)
+        .filter(Event.campaign_id == campaign_id, visibility_clause(viewer_actor_id, viewer_is_dm))
+        .order_by(Event.created_at)
+    )
 
     if after_event_id:
-        after_event = db.query(Event).filter(Event.id == after_event_id).first()
-        if after_event:
-            query = query.filter(Event.created_at > after_event.created_at)
+        after_created_at = db.query(Event.created_at).filter(Event.id == after_event_id).scalar()
+        if after_created_at:
+            query = query.filter(Event.created_at > after_created_at)
+
+    return query.all()
+
 
-    all_events = query.all()
+def campaign_events(db: Session, campaign_id: str, after: Optional[datetime] = None) -> List[Row]:
+    """Every event of the campaign created after ``after``, oldest first, before visibility filtering."""
+    query = db.query(*_EVENT_COLUMNS).filter(Event.campaign_id == campaign_id)
+    if after is not None:
+        query = query.filter(Event.created_at > after)
+    return query.order_by(Event.created_at).all()
 
-    return [e for e in all_events if is_visible(e, viewer_actor_id, viewer_is_dm)]
+
+async def append_event_async(db: AsyncSession, campaign_id: str, event_create: EventCreate) -> Event:
+    return await run_write(db, append_event, campaign_id, event_create)
+
+
+async def list_events_async(
+    db: AsyncSession,
+    campaign_id: str,
+    viewer_actor_id: str,
+    after_event_id: Optional[str] = None,
+) -> List[Row]:
+    entry = await get_entry(db, campaign_id)
+    if entry is not None:
+        events = entry.events_after(after_event_id)
+        if events is not None:
+            viewer = entry.actors.get(viewer_actor_id)
+            viewer_is_dm = viewer is not None and viewer.actor_type == "dm"
+            return [e for e in events if is_visible(e, viewer_actor_id, viewer_is_dm)]
+    return await db.run_sync(list_events, campaign_id, viewer_actor_id, after_event_id)
@@ -1,16 +1,20 @@
 import json
-import uuid
 from datetime import datetime
 from typing import List, Optional
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from config import settings
+from ids import new_id
 from models import Actor, Memory
 from schemas import MemoryWrite
+from serialization import MEMORY_FIELDS
+from write_pipeline import run_write
 
 
 def write_memory(db: Session, campaign_id: str, memory_write: MemoryWrite) -> Memory:
     memory = Memory(
-        id=uuid.uuid4().hex[:8],
+        id=new_id(),
         campaign_id=campaign_id,
         actor_id=memory_write.actor_id,
         scope=memory_write.scope,
@@ -19,20 +23,41 @@ def write_memory(db: Session, campaign_id: str, memory_write: MemoryWrite) -> Me
         created_at=datetime.utcnow(),
     )
     db.add(memory)
-    db.commit()
-    db.refresh(memory)
+    db.flush()
     return memory
 
 
+_MEMORY_COLUMNS = [getattr(Memory, name) for name in MEMORY_FIELDS]
+
+
+def memory_allows(mem, viewer_actor_id: str, viewer_is_dm: bool, dm_omniscient_private: Optional[bool] = None) -> bool:
+    if dm_omniscient_private is None:
+        dm_omniscient_private = settings.DM_OMNISCIENT_PRIVATE
+    if mem.scope in ("world", "public", "party"):
+        return True
+    elif mem.scope == "dm_only":
+        return viewer_is_dm
+    elif mem.scope == "private":
+        return mem.actor_id == viewer_actor_id or (viewer_is_dm and dm_omniscient_private)
+    return False
+
+
+def campaign_memories(db: Session, campaign_id: str, scope: Optional[str] = None) -> List[Row]:
+    """Every memory of the campaign, oldest first, before visibility filtering."""
+    query = db.query(*_MEMORY_COLUMNS).filter(Memory.campaign_id == campaign_id)
+    if scope:
+        query = query.filter(Memory.scope == scope)
+    return query.order_by(Memory.created_at).all()
+
+
 def read_memory(
     db: Session,
     campaign_id: str,
     viewer_actor_id: str,
     scope: Optional[str] = None,
     dm_omniscient_private: Optional[bool] = None,
-) -> List[Memory]:
-    if dm_omniscient_private is None:
-        dm_omniscient_private = settings.DM_OMNISCIENT_PRIVATE
+) -> List[Row]:
+    """Visible memories as column tuples (attribute access works as on ``Memory``)."""
     viewer_actor = db.query(Actor).filter(
         Actor.id == viewer_actor_id,
         Actor.campaign_id == campaign_id,
@@ -40,24 +65,21 @@ def read_memory(
 
     viewer_is_dm = viewer_actor is not None and viewer_actor.actor_type == "dm"
 
-    query = db.query(Memory).filter(Memory.campaign_id == campaign_id)
+    return [
+        mem for mem in campaign_memories(db, campaign_id, scope)
+        if memory_allows(mem, viewer_actor_id, viewer_is_dm, dm_omniscient_private)
+    ]
 
-    if scope:
-        query = query.filter(Memory.scope == scope)
 
-    all_memories = query.order_by(Memory.created_at).all()
-
-    result = []
-    for mem in all_memories:
-        if mem.scope in ("world", "public", "party"):
-            result.append(mem)
-        elif mem.scope == "dm_only":
-            if viewer_is_dm:
-                result.append(mem)
-        elif mem.scope == "private":
-            if mem.actor_id == viewer_actor_id:
-                result.append(mem)
-            elif viewer_is_dm and dm_omniscient_private:
-                result.append(mem)
-
-    return result
+async def write_memory_async(db: AsyncSession, campaign_id: str, memory_write: MemoryWrite) -> Memory:
+    return await run_write(db, write_memory, campaign_id, memory_write)
+
+
+async def read_memory_async(
+    db: AsyncSession,
+    campaign_id: str,
+    viewer_actor_id: str,
+    scope: Optional[str] = None,
+    dm_omniscient_private: Optional[bool] = None,
+) -> List[Row]:
+    return await db.run_sync(read_memory, campaign_id, viewer_actor_id, scope, dm_omniscient_private)
@@ -0,0 +1,109 @@
+import json
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from db import upsert
+from ids import new_id
+from models import Campaign, StateKV
+from schemas import MutateRequest
+from versioning import touch
+from working_set import note_change
+from write_pipeline import run_write
+
+
+class UnknownMutationError(ValueError):
+    """A mutation type the engine does not implement."""
+
+
+def apply_mutations(db: Session, campaign_id: str, body: MutateRequest) -> dict:
+    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    if not campaign:
+        raise ValueError(f"Campaign not found: {campaign_id}")
+
+    results = []
+
+    for mutation in body.mutations:
+        mut_type = mutation.type
+        payload = mutation.payload
+
+        if mut_type == "hp_set":
+            actor_id = payload["actor_id"]
+            hp = int(payload["hp"])
+            set_kv(db, campaign_id, f"hp:{actor_id}", str(hp))
+            results.append({"type": mut_type, "key": f"hp:{actor_id}", "value": hp})
+
+        elif mut_type == "hp_delta":
+            actor_id = payload["actor_id"]
+            delta = int(payload["delta"])
+            current = get_kv(db, campaign_id, f"hp:{actor_id}", "0")
+            new_hp = int(current) + delta
+            set_kv(db, campaign_id, f"hp:{actor_id}", str(new_hp))
+            results.append({"type": mut_type, "key": f"hp:{actor_id}", "value": new_hp})
+
+        elif mut_type == "inventory_add":
+            actor_id = payload["actor_id"]
+            item = payload["item"]
+            current = json.loads(get_kv(db, campaign_id, f"inventory:{actor_id}", "[]"))
+            current.append(item)
+            set_kv(db, campaign_id, f"inventory:{actor_id}", json.dumps(current))
+            results.append({"type": mut_type, "key": f"inventory:{actor_id}", "value": current})
+
+        elif mut_type == "inventory_remove":
+            actor_id = payload["actor_id"]
+            item = payload["item"]
+            current = json.loads(get_kv(db, campaign_id, f"inventory:{actor_id}", "[]"))
+            if item in current:
+                current.remove(item)
+            set_kv(db, campaign_id, f"inventory:{actor_id}", json.dumps(current))
+            results.append({"type": mut_type, "key": f"inventory:{actor_id}", "value": current})
+
+        elif mut_type == "flag_set":
+            key = payload["key"]
+            value = payload["value"]
+            set_kv(db, campaign_id, f"flag:{key}", json.dumps(value))
+            results.append({"type": mut_type, "key": f"flag:{key}", "value": value})
+
+        elif mut_type == "time_advance":
+            amount = payload["amount"]
+            unit = payload["unit"]
+            set_kv(db, campaign_id, "time:current", f"{amount} {unit}")
+            results.append({"type": mut_type, "key": "time:current", "value": f"{amount} {unit}"})
+
+        else:
+            raise UnknownMutationError(f"Unknown mutation type: {mut_type}")
+
+    return {"mutations_applied": len(results), "results": results}
+
+
+def get_kv(db: Session, campaign_id: str, key: str, default: str = "") -> str:
+    # Select the column, not the entity: set_kv writes around the identity map.
+    value = db.execute(
+        select(StateKV.value).where(
+            StateKV.campaign_id == campaign_id,
+            StateKV.key == key,
+        )
+    ).scalar()
+    return value if value is not None else default
+
+
+def set_kv(db: Session, campaign_id: str, key: str, value: str):
+    upsert(
+        db,
+        StateKV,
+        {
+            "id": new_id(),
+            "campaign_id": campaign_id,
+            "key": key,
+            "value": value,
+            "updated_at": datetime.utcnow(),
+        },
+        conflict_cols=["campaign_id", "key"],
+        update_cols=["value", "updated_at"],
+    )
+    note_change(db, "kv", campaign_id, (key, value))
+    touch(db, campaign_id)
+
+
+async def apply_mutations_async(db: AsyncSession, campaign_id: str, body: MutateRequest) -> dict:
+    return await run_write(db, apply_mutations, campaign_id, body)
@@ -1,7 +1,18 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Tuple
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from config import settings
 from models import Actor, Campaign, Event, StateKV
-from schemas import ActorOut, StateOut
-from services.event_service import is_visible
+from schemas import ActorOut, CampaignHeadOut, StateOut
+from services.event_service import visibility_allows, visibility_clause
+from versioning import campaign_head, version_waiters
+from working_set import CampaignEntry, get_entry
+
+# (turn_owner, ai_only_streak, actors, state_kv, event counts by visibility)
+Snapshot = Tuple[str, int, List[Any], Dict[str, str], Dict[str, int]]
 
 
 def get_campaign_state(db: Session, campaign_id: str, viewer_actor_id: str) -> StateOut:
@@ -17,8 +28,10 @@ def get_campaign_state(db: Session, campaign_id: str, viewer_actor_id: str) -> S
     kv_rows = db.query(StateKV).filter(StateKV.campaign_id == campaign_id).all()
     state_kv = {row.key: row.value for row in kv_rows}
 
-    all_events = db.query(Event).filter(Event.campaign_id == campaign_id).all()
-    visible_count = sum(1 for e in all_events if is_visible(e, viewer_actor_id, viewer_is_dm))
+    visible_count = db.query(func.count(Event.id)).filter(
+        Event.campaign_id == campaign_id,
+        visibility_clause(viewer_actor_id, viewer_is_dm),
+    ).scalar()
 
     return StateOut(
         campaign_id=campaign_id,
@@ -28,3 +41,74 @@ def get_campaign_state(db: Session, campaign_id: str, viewer_actor_id: str) -> S
         state_kv=state_kv,
         visible_events_count=visible_count,
     )
+
+
+def load_snapshot(db: Session, campaign_id: str) -> Snapshot:
+    """The campaign state every viewer's ``StateOut`` is derived from, in one pass.
+
+    Same shape as ``CampaignEntry.snapshot``: event counts are grouped by
+    visibility so each viewer's count is a sum, not another query.
+    """
+    campaign = db.query(Campaign.turn_owner, Campaign.ai_only_streak).filter(Campaign.id == campaign_id).first()
+    if campaign is None:
+        raise ValueError(f"Campaign not found: {campaign_id}")
+    actors = db.query(Actor).filter(Actor.campaign_id == campaign_id).all()
+    state_kv = dict(db.query(StateKV.key, StateKV.value).filter(StateKV.campaign_id == campaign_id).all())
+    visibility_counts = dict(
+        db.query(Event.visibility, func.count(Event.id))
+        .filter(Event.campaign_id == campaign_id)
+        .group_by(Event.visibility)
+        .all()
+    )
+    return campaign.turn_owner, campaign.ai_only_streak, actors, state_kv, visibility_counts
+
+
+def state_from_snapshot(campaign_id: str, snapshot: Snapshot, viewer_actor_id: str) -> StateOut:
+    turn_owner, ai_only_streak, actors, state_kv, visibility_counts = snapshot
+
+    viewer_actor = next((a for a in actors if a.id == viewer_actor_id), None)
+    viewer_is_dm = viewer_actor is not None and viewer_actor.actor_type == "dm"
+    visible_count = sum(
+        n for vis, n in visibility_counts.items()
+        if visibility_allows(vis, viewer_actor_id, viewer_is_dm)
+    )
+
+    return StateOut(
+        campaign_id=campaign_id,
+        turn_owner=turn_owner,
+        ai_only_streak=ai_only_streak,
+        actors=[ActorOut.model_validate(a) for a in actors],
+        state_kv=state_kv,
+        visible_events_count=visible_count,
+    )
+
+
+def state_from_entry(entry: CampaignEntry, viewer_actor_id: str) -> StateOut:
+    """``get_campaign_state`` answered from a working-set entry."""
+    return state_from_snapshot(entry.campaign_id, entry.snapshot(), viewer_actor_id)
+
+
+async def get_campaign_state_async(db: AsyncSession, campaign_id: str, viewer_actor_id: str) -> StateOut:
+    entry = await get_entry(db, campaign_id)
+    if entry is not None:
+        return state_from_entry(entry, viewer_actor_id)
+    return await db.run_sync(get_campaign_state, campaign_id, viewer_actor_id)
+
+
+async def wait_for_version_async(db: AsyncSession, campaign_id: str, after: int, wait: float = 0.0) -> CampaignHeadOut:
+    """The campaign's version and turn owner; with ``wait``, long-poll until the version is not ``after``."""
+    deadline = time.monotonic() + wait
+    while True:
+        with version_waiters.watch(campaign_id) as changed:
+            head = await db.run_sync(campaign_head, campaign_id)
+            if head is None:
+                raise ValueError(f"Campaign not found: {campaign_id}")
+            remaining = deadline - time.monotonic()
+            if head[0] != after or remaining <= 0:
+                return CampaignHeadOut(campaign_id=campaign_id, version=head[0], turn_owner=head[1])
+            # Hand the connection back to the pool while parked.
+            await db.close()
+            try:
+                await asyncio.wait_for(changed, min(remaining, settings.VERSION_WAIT_RECHECK_SECONDS))
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,64 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+from sqlalchemy.orm import Session
+from db import upsert
+from ids import new_id
+from models import ActorSummary
+from services.event_service import list_events
+from summarizer import get_summarizer
+
+SUMMARY_FIELDS = ("text", "first_event_id", "last_event_id", "event_count")
+_SUMMARY_COLUMNS = [getattr(ActorSummary, name) for name in SUMMARY_FIELDS]
+
+
+def read_summary(db: Session, campaign_id: str, actor_id: str) -> Optional[Dict[str, Any]]:
+    """The actor's rolling summary as a ``DirectorSummaryOut``-shaped dict, or None."""
+    row = db.query(*_SUMMARY_COLUMNS).filter(
+        ActorSummary.campaign_id == campaign_id,
+        ActorSummary.actor_id == actor_id,
+    ).first()
+    return dict(zip(SUMMARY_FIELDS, row)) if row else None
+
+
+def read_summaries(db: Session, campaign_id: str, actor_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """``read_summary`` for several actors in one query; actors without a summary are absent."""
+    rows = db.query(ActorSummary.actor_id, *_SUMMARY_COLUMNS).filter(
+        ActorSummary.campaign_id == campaign_id,
+        ActorSummary.actor_id.in_(list(actor_ids)),
+    ).all()
+    return {row[0]: dict(zip(SUMMARY_FIELDS, row[1:])) for row in rows}
+
+
+def compact_summary(db: Session, campaign_id: str, actor_id: str, upto_event_id: str) -> None:
+    """Fold the actor's visible events after its summary, through ``upto_event_id``, into it.
+
+    Does not commit; ``advance_cursor`` calls this in the cursor's transaction.
+    """
+    summary = read_summary(db, campaign_id, actor_id)
+    pending = []
+    for event in list_events(db, campaign_id, actor_id, after_event_id=summary and summary["last_event_id"]):
+        pending.append(event)
+        if event.id == upto_event_id:
+            break
+    else:
+        return  # already folded in, or not visible to this actor
+
+    previous = summary["text"] if summary else None
+    # A racing compaction for the same actor folds the same events, so the
+    # loser's update is equivalent; first_event_id keeps the original start.
+    upsert(
+        db,
+        ActorSummary,
+        {
+            "id": new_id(),
+            "campaign_id": campaign_id,
+            "actor_id": actor_id,
+            "text": get_summarizer()(previous, pending),
+            "first_event_id": summary["first_event_id"] if summary else pending[0].id,
+            "last_event_id": upto_event_id,
+            "event_count": (summary["event_count"] if summary else 0) + len(pending),
+            "updated_at": datetime.utcnow(),
+        },
+        conflict_cols=["campaign_id", "actor_id"],
+        update_cols=["text", "last_event_id", "event_count", "updated_at"],
+    )
@@ -1,14 +1,112 @@
-import uuid
-from datetime import datetime
+import math
+from datetime import datetime, timedelta
+from sqlalchemy import or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from config import settings
+from ids import new_id
 from models import Actor, Campaign, Event
-from schemas import TurnAdvanceOut
+from schemas import FloorLeaseOut, FloorReleaseOut, TurnAdvanceOut
+from services.director_service import schedule_precompute
+from write_pipeline import on_commit, run_write
+
+
+class TurnInProgressError(RuntimeError):
+    """Another engine replica holds the campaign row while advancing its turn."""
+
+
+class FloorHeldError(RuntimeError):
+    """Another runner worker holds an unexpired lease on the campaign's floor."""
+
+    def __init__(self, message: str, expires_at: datetime):
+        super().__init__(message)
+        self.expires_at = expires_at
+
+    def retry_after(self) -> int:
+        """Whole seconds until the lease lapses, for a ``Retry-After`` header."""
+        return max(1, math.ceil((self.expires_at - datetime.utcnow()).total_seconds()))
+
+
+def claim_floor(db: Session, campaign_id: str, worker_id: str) -> FloorLeaseOut:
+    """Take or renew ``worker_id``'s lease on the campaign's floor.
+
+    ``floor_lock`` holds the worker and ``floor_lock_at`` its last claim; the
+    lease lapses ``FLOOR_LEASE_SECONDS`` later. The check and the write are one
+    conditional UPDATE, so of two workers racing for a free floor exactly one
+    wins. It is issued outside the unit of work on purpose: a claim is not a
+    change to the game, so it must not move the campaign's version.
+    """
+    now = datetime.utcnow()
+    lease = timedelta(seconds=settings.FLOOR_LEASE_SECONDS)
+    claimed = db.execute(
+        update(Campaign)
+        .where(
+            Campaign.id == campaign_id,
+            or_(
+                Campaign.floor_lock.is_(None),
+                Campaign.floor_lock == worker_id,
+                Campaign.floor_lock_at.is_(None),
+                Campaign.floor_lock_at <= now - lease,
+            ),
+        )
+        .values(floor_lock=worker_id, floor_lock_at=now)
+    ).rowcount
+    if not claimed:
+        row = db.query(Campaign.floor_lock, Campaign.floor_lock_at).filter(Campaign.id == campaign_id).first()
+        if row is None:
+            raise ValueError(f"Campaign not found: {campaign_id}")
+        raise FloorHeldError(f"Floor held by another worker: {row.floor_lock}", row.floor_lock_at + lease)
+    return FloorLeaseOut(
+        campaign_id=campaign_id,
+        worker_id=worker_id,
+        expires_at=now + lease,
+        lease_seconds=settings.FLOOR_LEASE_SECONDS,
+    )
+
+
+def check_floor(db: Session, campaign_id: str, worker_id: str) -> None:
+    """Raise FloorHeldError unless ``worker_id`` holds an unexpired lease on the floor.
+
+    Unlike ``claim_floor`` this only reads: ``/director/next``, ``/director/batch``
+    and ``/turn/advance`` move the game without renewing anything, so a worker
+    must have claimed the floor before calling them.
+    """
+    row = db.query(Campaign.floor_lock, Campaign.floor_lock_at).filter(Campaign.id == campaign_id).first()
+    if row is None:
+        raise ValueError(f"Campaign not found: {campaign_id}")
+    now = datetime.utcnow()
+    expires_at = row.floor_lock_at + timedelta(seconds=settings.FLOOR_LEASE_SECONDS) if row.floor_lock_at else now
+    if expires_at <= now:
+        raise FloorHeldError(f"Floor not held by {worker_id}", now)
+    if row.floor_lock != worker_id:
+        raise FloorHeldError(f"Floor held by another worker: {row.floor_lock}", expires_at)
+
+
+def release_floor(db: Session, campaign_id: str, worker_id: str) -> FloorReleaseOut:
+    """Give up ``worker_id``'s lease early; a no-op unless it holds the floor."""
+    released = db.execute(
+        update(Campaign)
+        .where(Campaign.id == campaign_id, Campaign.floor_lock == worker_id)
+        .values(floor_lock=None, floor_lock_at=None)
+    ).rowcount
+    if not released and db.query(Campaign.id).filter(Campaign.id == campaign_id).first() is None:
+        raise ValueError(f"Campaign not found: {campaign_id}")
+    return FloorReleaseOut(campaign_id=campaign_id, released=bool(released))
 
 
 def advance_turn(db: Session, campaign_id: str) -> TurnAdvanceOut:
-    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    # Claim the campaign row so replicas sharing a database cannot advance the same
+    # turn twice. SKIP LOCKED makes a concurrent claim fail fast instead of queueing
+    # behind the first one; SQLite ignores the clause and serializes writers itself.
+    campaign = (
+        db.query(Campaign)
+        .filter(Campaign.id == campaign_id)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
     if campaign is None:
+        if db.query(Campaign.id).filter(Campaign.id == campaign_id).first() is not None:
+            raise TurnInProgressError(f"Turn advance already in progress: {campaign_id}")
         raise ValueError(f"Campaign not found: {campaign_id}")
 
     actors = db.query(Actor).filter(Actor.campaign_id == campaign_id).order_by(Actor.id).all()
@@ -58,7 +156,7 @@ def advance_turn(db: Session, campaign_id: str) -> TurnAdvanceOut:
         streak = 0
         # Append system_refocus event
         refocus_event = Event(
-            id=uuid.uuid4().hex[:8],
+            id=new_id(),
             campaign_id=campaign_id,
             actor_id="system",
             event_type="system_refocus",
@@ -70,11 +168,8 @@ def advance_turn(db: Session, campaign_id: str) -> TurnAdvanceOut:
 
     campaign.turn_owner = next_owner_id
     campaign.ai_only_streak = streak
-    campaign.floor_lock = next_owner_id
-    campaign.floor_lock_at = datetime.utcnow()
 
-    db.commit()
-    db.refresh(campaign)
+    db.flush()
 
     return TurnAdvanceOut(
         turn_owner=next_owner_id,
@@ -82,3 +177,24 @@ def advance_turn(db: Session, campaign_id: str) -> TurnAdvanceOut:
         refocus_triggered=refocus_triggered,
         last_event_id=last_event.id if last_event else None,
     )
+
+
+async def advance_turn_async(db: AsyncSession, campaign_id: str, precompute: bool = False) -> TurnAdvanceOut:
+    """Advance the turn; with ``precompute``, start building the new owner's director package."""
+    result = await run_write(db, advance_turn, campaign_id)
+    if precompute:
+        # Build against the committed turn, not this request's pending one.
+        on_commit(db, lambda: schedule_precompute(campaign_id))
+    return result
+
+
+async def claim_floor_async(db: AsyncSession, campaign_id: str, worker_id: str) -> FloorLeaseOut:
+    return await run_write(db, claim_floor, campaign_id, worker_id)
+
+
+async def check_floor_async(db: AsyncSession, campaign_id: str, worker_id: str) -> None:
+    await db.run_sync(check_floor, campaign_id, worker_id)
+
+
+async def release_floor_async(db: AsyncSession, campaign_id: str, worker_id: str) -> FloorReleaseOut:
+    return await run_write(db, release_floor, campaign_id, worker_id)
@@ -0,0 +1,194 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from config import settings
+from models import Actor, Campaign
+from services.event_service import visibility_allows
+
+
+class _Channel:
+    def __init__(self, max_chunks: int):
+        self.seq = 0
+        self.chunks: Deque[Dict[str, Any]] = deque(maxlen=max_chunks)
+        # utterance_id -> (actor_id, visibility, last touched), for utterances not yet finalized.
+        self.open: "OrderedDict[str, tuple]" = OrderedDict()
+        self.changed = asyncio.Event()
+
+
+class PartialUtterances:
+    """Per-campaign channel of utterances streamed sentence by sentence.
+
+    A runner posts each sentence of an actor's line while the model is still
+    generating it; voice clients read them back by sequence number. When the
+    turn lands, ``/act`` finalizes the utterance with the event it wrote. The
+    channel is a preview, not a record: it lives in process memory (like the
+    director package cache), keeps the last ``max_chunks`` chunks per campaign,
+    and forgets utterances left open for ``ttl_seconds``. Only touched from the
+    event loop.
+    """
+
+    def __init__(self, max_chunks: int = 256, ttl_seconds: float = 120.0, max_campaigns: int = 1024):
+        self.max_chunks = max_chunks
+        self.ttl_seconds = ttl_seconds
+        self.max_campaigns = max_campaigns
+        self._channels: "OrderedDict[str, _Channel]" = OrderedDict()
+
+    def _channel(self, campaign_id: str) -> _Channel:
+        channel = self._channels.get(campaign_id)
+        if channel is None:
+            channel = self._channels[campaign_id] = _Channel(self.max_chunks)
+            while len(self._channels) > self.max_campaigns:
+                self._channels.popitem(last=False)
+        self._channels.move_to_end(campaign_id)
+        return channel
+
+    def _publish(self, channel: _Channel, chunk: Dict[str, Any]) -> Dict[str, Any]:
+        channel.seq += 1
+        chunk["seq"] = channel.seq
+        channel.chunks.append(chunk)
+        channel.changed.set()
+        channel.changed = asyncio.Event()
+        return chunk
+
+    def append(self, campaign_id: str, utterance_id: str, actor_id: str, text: str, visibility: str) -> Dict[str, Any]:
+        """Publish one more sentence of an open utterance, opening it if new.
+
+        Raises ValueError if the utterance was already finalized or belongs to
+        another actor.
+        """
+        channel = self._channel(campaign_id)
+        now = time.monotonic()
+        for stale_id, (_, _, touched) in list(channel.open.items()):
+            if touched + self.ttl_seconds > now:
+                break
+            del channel.open[stale_id]
+
+        current = channel.open.get(utterance_id)
+        if current is None:
+            if any(c["utterance_id"] == utterance_id for c in channel.chunks):
+                raise ValueError(f"Utterance already finalized: {utterance_id}")
+        elif current[0] != actor_id:
+            raise ValueError(f"Utterance {utterance_id} belongs to {current[0]}")
+        else:
+            visibility = current[1]
+        channel.open[utterance_id] = (actor_id, visibility, now)
+        channel.open.move_to_end(utterance_id)
+        return self._publish(channel, {
+            "utterance_id": utterance_id,
+            "actor_id": actor_id,
+            "visibility": visibility,
+            "text": text,
+            "final": False,
+            "event_id": None,
+        })
+
+    def finalize(self, campaign_id: str, utterance_id: str, text: str, event_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Close an open utterance with the full line and the event that recorded it.
+
+        Returns None if nothing was streamed for ``utterance_id``.
+        """
+        channel = self._channels.get(campaign_id)
+        current = channel and channel.open.pop(utterance_id, None)
+        if current is None:
+            return None
+        actor_id, visibility, _ = current
+        return self._publish(channel, {
+            "utterance_id": utterance_id,
+            "actor_id": actor_id,
+            "visibility": visibility,
+            "text": text,
+            "final": True,
+            "event_id": event_id,
+        })
+
+    def read(self, campaign_id: str, viewer_actor_id: str, viewer_is_dm: bool, after: int = 0) -> List[Dict[str, Any]]:
+        """Chunks after sequence number ``after`` that the viewer may see."""
+        channel = self._channels.get(campaign_id)
+        if channel is None:
+            return []
+        return [
+            chunk for chunk in channel.chunks
+            if chunk["seq"] > after and visibility_allows(chunk["visibility"], viewer_actor_id, viewer_is_dm)
+        ]
+
+    def latest(self, campaign_id: str) -> int:
+        channel = self._channels.get(campaign_id)
+        return channel.seq if channel is not None else 0
+
+    async def wait(self, campaign_id: str, after: int, timeout: float) -> None:
+        """Return once the channel has moved past ``after``, or after ``timeout`` seconds."""
+        channel = self._channel(campaign_id)
+        if channel.seq > after:
+            return
+        try:
+            await asyncio.wait_for(channel.changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def clear(self) -> None:
+        self._channels.clear()
+
+
+partial_utterances = PartialUtterances(
+    max_chunks=settings.PARTIAL_UTTERANCE_CHUNKS,
+    ttl_seconds=settings.PARTIAL_UTTERANCE_TTL_SECONDS,
+)
+
+
+def _viewer_is_dm(db: Session, campaign_id: str, viewer_actor_id: str) -> bool:
+    # Checked before the channel is touched: polling made-up ids must not
+    # push live campaigns out of the channel LRU.
+    if db.query(Campaign.id).filter(Campaign.id == campaign_id).first() is None:
+        raise LookupError(f"Campaign not found: {campaign_id}")
+    actor_type = db.query(Actor.actor_type).filter(
+        Actor.id == viewer_actor_id,
+        Actor.campaign_id == campaign_id,
+    ).scalar()
+    return actor_type == "dm"
+
+
+def _actor_exists(db: Session, campaign_id: str, actor_id: str) -> bool:
+    return db.query(Actor.id).filter(Actor.id == actor_id, Actor.campaign_id == campaign_id).first() is not None
+
+
+async def append_partial_async(
+    db: AsyncSession,
+    campaign_id: str,
+    utterance_id: str,
+    actor_id: str,
+    text: str,
+    visibility: str,
+) -> Dict[str, Any]:
+    if not await db.run_sync(_actor_exists, campaign_id, actor_id):
+        raise LookupError(f"Actor not found: {actor_id}")
+    return partial_utterances.append(campaign_id, utterance_id, actor_id, text, visibility)
+
+
+async def read_partials_async(
+    db: AsyncSession,
+    campaign_id: str,
+    viewer_actor_id: str,
+    after: int = 0,
+    wait: float = 0.0,
+) -> List[Dict[str, Any]]:
+    """Visible chunks after ``after``; with ``wait``, long-poll until one arrives.
+
+    Raises LookupError if the campaign does not exist.
+    """
+    viewer_is_dm = await db.run_sync(_viewer_is_dm, campaign_id, viewer_actor_id)
+    if wait > 0:
+        # Hand the connection back to the pool before parking on the channel.
+        await db.close()
+    deadline = time.monotonic() + wait
+    seen = after
+    while True:
+        chunks = partial_utterances.read(campaign_id, viewer_actor_id, viewer_is_dm, after)
+        remaining = deadline - time.monotonic()
+        if chunks or remaining <= 0:
+            return chunks
+        # Chunks the viewer cannot see still wake us; wait past them.
+        seen = max(seen, partial_utterances.latest(campaign_id))
+        await partial_utterances.wait(campaign_id, seen, remaining)
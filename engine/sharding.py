@@ -0,0 +1,237 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+from sqlalchemy import Column, DateTime, String, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import DeclarativeBase
+from config import settings
+from db import init_db, make_async_engine, make_engine
+from write_pipeline import WritePipeline, register_write_pipeline, unregister_write_pipeline
+
+
+class CatalogBase(DeclarativeBase):
+    pass
+
+
+class CampaignShard(CatalogBase):
+    __tablename__ = "campaign_shards"
+
+    campaign_id = Column(String, primary_key=True)
+    database_url = Column(String, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class UnknownCampaignError(LookupError):
+    """The catalog has no shard for the requested campaign."""
+
+
+class _OpenShard:
+    def __init__(self, async_engine: AsyncEngine, sync_engine: Optional[Engine], pipeline: Optional[WritePipeline]):
+        self.async_engine = async_engine
+        self.sync_engine = sync_engine
+        self.pipeline = pipeline
+        self.session_factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+        self.last_used = time.monotonic()
+        self.active = 0
+
+
+class ShardRouter:
+    """Routes each campaign to its own SQLite file.
+
+    A small catalog database maps campaign ids to shard URLs. Open shard engines
+    are kept in an LRU capped at ``max_open``; shards with no request in flight are
+    closed once idle for ``idle_seconds`` (checked by ``start``'s sweeper and on
+    every acquire) or when the LRU is full.
+
+    The LRU bookkeeping never awaits, so it runs atomically on the event loop
+    without a lock. Catalog lookups, ``init_db`` and engine disposal happen
+    outside it: a shard being opened or closed only holds up the requests for
+    that campaign, and concurrent requests for one campaign share its opening.
+    """
+
+    def __init__(self, catalog_url: str, shard_dir: str, max_open: int = 64, idle_seconds: float = 300):
+        self.shard_dir = shard_dir
+        self.max_open = max_open
+        self.idle_seconds = idle_seconds
+        self._catalog = make_async_engine(catalog_url)
+        self._catalog_ready = False
+        self._urls: Dict[str, str] = {}
+        self._open: "OrderedDict[str, _OpenShard]" = OrderedDict()
+        self._opening: Dict[str, asyncio.Task] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Close idle shards in the background, about every ``idle_seconds / 2``."""
+        if self._sweeper is None:
+            self._sweeper = asyncio.get_running_loop().create_task(self._sweep())
+
+    @asynccontextmanager
+    async def session(self, campaign_id: str) -> AsyncIterator[AsyncSession]:
+        """Yield a session on ``campaign_id``'s shard."""
+        shard = await self.acquire(campaign_id)
+        try:
+            async with shard.session_factory() as db:
+                yield db
+        finally:
+            self.release(shard)
+
+    @asynccontextmanager
+    async def create(self, campaign_id: str) -> AsyncIterator[AsyncSession]:
+        """Yield a session on a new shard for ``campaign_id``.
+
+        The catalog row is written only after the block exits cleanly, i.e. once
+        the caller has committed the campaign; if the block raises, the shard is
+        closed and its file removed, so a failed create leaves nothing behind.
+        """
+        os.makedirs(self.shard_dir, exist_ok=True)
+        path = os.path.join(self.shard_dir, f"{campaign_id}.db")
+        url = f"sqlite:///{path}"
+        shard = await self._open_shard(url)
+        try:
+            async with shard.session_factory() as db:
+                yield db
+            await self._ensure_catalog()
+            async with AsyncSession(self._catalog) as catalog:
+                catalog.add(CampaignShard(campaign_id=campaign_id, database_url=url, created_at=datetime.utcnow()))
+                await catalog.commit()
+        except BaseException:
+            await self._dispose(shard)
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+            raise
+        self._urls[campaign_id] = url
+        self._open[campaign_id] = shard
+        shard.active += 1
+        try:
+            await self._dispose_all(self._take_evictable())
+        finally:
+            self.release(shard)
+
+    async def acquire(self, campaign_id: str) -> _OpenShard:
+        """Open (or reuse) ``campaign_id``'s shard and pin it until ``release``.
+
+        Raises UnknownCampaignError if the campaign is not in the catalog.
+        """
+        while True:
+            shard = self._open.get(campaign_id)
+            if shard is not None:
+                self._open.move_to_end(campaign_id)
+                shard.active += 1
+                shard.last_used = time.monotonic()
+                await self._dispose_all(self._take_evictable())
+                return shard
+            opening = self._opening.get(campaign_id)
+            if opening is None:
+                opening = self._opening[campaign_id] = asyncio.get_running_loop().create_task(
+                    self._open_campaign(campaign_id)
+                )
+            # Shielded: a cancelled request must not abort an opening others wait on.
+            await asyncio.shield(opening)
+
+    def release(self, shard: _OpenShard) -> None:
+        shard.active -= 1
+        shard.last_used = time.monotonic()
+
+    async def list_campaigns(self) -> List[Dict[str, Any]]:
+        """Every catalogued campaign as ``{"id", "created_at"}``, oldest first."""
+        await self._ensure_catalog()
+        async with AsyncSession(self._catalog) as catalog:
+            rows = await catalog.execute(
+                select(CampaignShard.campaign_id, CampaignShard.created_at)
+                .order_by(CampaignShard.created_at, CampaignShard.campaign_id)
+            )
+            return [{"id": campaign_id, "created_at": created_at} for campaign_id, created_at in rows]
+
+    @property
+    def open_shards(self) -> int:
+        return len(self._open)
+
+    async def close(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        await asyncio.gather(*self._opening.values(), return_exceptions=True)
+        shards = list(self._open.values())
+        self._open.clear()
+        await self._dispose_all(shards)
+        await self._catalog.dispose()
+
+    async def _shard_url(self, campaign_id: str) -> str:
+        if campaign_id in self._urls:
+            return self._urls[campaign_id]
+
+        await self._ensure_catalog()
+        async with AsyncSession(self._catalog) as catalog:
+            url = (
+                await catalog.execute(
+                    select(CampaignShard.database_url).where(CampaignShard.campaign_id == campaign_id)
+                )
+            ).scalar()
+            if url is None:
+                raise UnknownCampaignError(f"Campaign not found: {campaign_id}")
+        self._urls[campaign_id] = url
+        return url
+
+    async def _ensure_catalog(self) -> None:
+        if not self._catalog_ready:
+            async with self._catalog.begin() as conn:
+                await conn.run_sync(CatalogBase.metadata.create_all)
+            self._catalog_ready = True
+
+    async def _open_shard(self, url: str) -> _OpenShard:
+        async_engine = make_async_engine(url, pool_size=settings.SHARD_POOL_SIZE)
+        async with async_engine.begin() as conn:
+            await conn.run_sync(init_db)
+
+        sync_engine = pipeline = None
+        if settings.WRITE_PIPELINE_ENABLED:
+            sync_engine = make_engine(url, pool_size=1)
+            pipeline = WritePipeline(
+                sync_engine,
+                window_ms=settings.WRITE_PIPELINE_WINDOW_MS,
+                max_batch=settings.WRITE_PIPELINE_MAX_BATCH,
+            )
+            pipeline.start()
+            register_write_pipeline(async_engine.sync_engine, pipeline)
+        return _OpenShard(async_engine, sync_engine, pipeline)
+
+    async def _open_campaign(self, campaign_id: str) -> None:
+        try:
+            url = await self._shard_url(campaign_id)
+            self._open[campaign_id] = await self._open_shard(url)
+        finally:
+            del self._opening[campaign_id]
+
+    def _take_evictable(self) -> List[_OpenShard]:
+        """Remove unpinned shards that are idle or beyond ``max_open`` from the LRU; the caller disposes them."""
+        now = time.monotonic()
+        evicted = []
+        for campaign_id, shard in list(self._open.items()):
+            over_capacity = len(self._open) > self.max_open
+            idle = now - shard.last_used > self.idle_seconds
+            if shard.active == 0 and (over_capacity or idle):
+                del self._open[campaign_id]
+                evicted.append(shard)
+        return evicted
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(max(0.1, self.idle_seconds / 2))
+            await self._dispose_all(self._take_evictable())
+
+    async def _dispose_all(self, shards: List[_OpenShard]) -> None:
+        if shards:
+            await asyncio.gather(*(self._dispose(shard) for shard in shards))
+
+    async def _dispose(self, shard: _OpenShard) -> None:
+        if shard.pipeline is not None:
+            unregister_write_pipeline(shard.async_engine.sync_engine)
+            await asyncio.to_thread(shard.pipeline.stop)
+            shard.sync_engine.dispose()
+        await shard.async_engine.dispose()
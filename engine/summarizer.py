@@ -0,0 +1,84 @@
+import importlib
+import re
+from collections import Counter
+from typing import Any, Callable, List, Optional, Sequence
+from config import settings
+
+# ``summarizer(previous_summary, events) -> summary``: fold events (oldest first,
+# each with actor_id, event_type and content) into the previous summary text.
+Summarizer = Callable[[Optional[str], Sequence[Any]], str]
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"[a-z0-9']+")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have he her his i in is it its me my of on or our "
+    "she so that the their them they this to was we were what with you your".split()
+)
+
+
+def _words(line: str) -> List[str]:
+    # Skip the "actor_id: " prefix so speakers do not dominate the scores.
+    _, _, text = line.partition(": ")
+    return [w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS]
+
+
+class ExtractiveSummarizer:
+    """Deterministic, offline summarizer: one line per event, the most salient kept.
+
+    Each event contributes ``actor_id: <first sentence>``. Past ``max_lines`` the
+    newest third is always kept and the rest are ranked by the average corpus
+    frequency of their words, so recurring names and places outlive one-off
+    chatter. Kept lines stay in chronological order.
+    """
+
+    def __init__(self, max_lines: int = 12, max_line_chars: int = 200):
+        self.max_lines = max_lines
+        self.max_line_chars = max_line_chars
+
+    def __call__(self, previous: Optional[str], events: Sequence[Any]) -> str:
+        lines = previous.splitlines() if previous else []
+        for event in events:
+            if event.event_type.startswith("system_"):
+                continue
+            content = " ".join((event.content or "").split())
+            if content:
+                sentence = _SENTENCE_END.split(content, 1)[0][:self.max_line_chars]
+                lines.append(f"{event.actor_id}: {sentence}")
+        if len(lines) <= self.max_lines:
+            return "\n".join(lines)
+
+        recent = max(1, self.max_lines // 3)
+        older = lines[:-recent]
+        frequency = Counter(w for line in lines for w in set(_words(line)))
+
+        def score(i: int):
+            words = _words(older[i])
+            return (sum(frequency[w] for w in words) / len(words) if words else 0.0, i)
+
+        keep = sorted(sorted(range(len(older)), key=score, reverse=True)[:self.max_lines - recent])
+        return "\n".join([older[i] for i in keep] + lines[-recent:])
+
+
+_summarizer: Optional[Summarizer] = None
+
+
+def _load(path: str) -> Summarizer:
+    module_name, _, attr = path.partition(":")
+    factory = getattr(importlib.import_module(module_name), attr)
+    return factory()
+
+
+def get_summarizer() -> Summarizer:
+    """The configured summarizer: ``SUMMARIZER`` (``module:factory``) or the extractive default."""
+    global _summarizer
+    if _summarizer is None:
+        if settings.SUMMARIZER:
+            _summarizer = _load(settings.SUMMARIZER)
+        else:
+            _summarizer = ExtractiveSummarizer(max_lines=settings.SUMMARY_MAX_LINES)
+    return _summarizer
+
+
+def set_summarizer(summarizer: Optional[Summarizer]) -> None:
+    global _summarizer
+    _summarizer = summarizer
@@ -0,0 +1,100 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+from tests.conftest import test_engine
+
+HEADERS = {"X-ENGINE-KEY": "test-key"}
+
+
+@contextmanager
+def count_commits():
+    commits = []
+
+    def record(conn):
+        commits.append(conn)
+
+    event.listen(test_engine.sync_engine, "commit", record)
+    try:
+        yield commits
+    finally:
+        event.remove(test_engine.sync_engine, "commit", record)
+
+
+def act(client, cid, **body):
+    return client.post(f"/v1/campaigns/{cid}/act", json=body, headers=HEADERS)
+
+
+def events(client, cid):
+    return client.get(f"/v1/campaigns/{cid}/events", params={"viewer": "dm"}, headers=HEADERS).json()
+
+
+def test_dm_act_is_one_commit(client, campaign):
+    cid = campaign["id"]
+    with count_commits() as commits:
+        resp = act(
+            client, cid,
+            actor_id="dm",
+            say="The bridge sways.",
+            ask="What do you do?",
+            state_updates=[{"type": "flag_set", "payload": {"key": "bridge", "value": "swaying"}}],
+        )
+    assert resp.status_code == 200
+    assert len(commits) == 1
+
+    out = resp.json()
+    assert out["mutations_applied"] == 1
+    assert out["turn"]["turn_owner"] != "dm"
+    assert out["director"] is None
+    assert [e["content"] for e in events(client, cid)] == ["The bridge sways."]
+    state = client.get(f"/v1/campaigns/{cid}/state", params={"viewer": "dm"}, headers=HEADERS).json()
+    assert state["state_kv"]["flag:bridge"] == '"swaying"'
+
+
+def test_act_returns_next_director_package(client, campaign):
+    cid = campaign["id"]
+    resp = act(client, cid, actor_id="dm", say="The gate opens.", director={"max_events": 10})
+    assert [t.split(";")[0] for t in resp.headers["server-timing"].split(", ")] == ["advance", "apply", "director"]
+    out = resp.json()
+    assert out["director"]["actor_id"] == out["turn"]["turn_owner"] == "human1"
+    assert [e["content"] for e in out["director"]["visible_events"]] == ["The gate opens."]
+
+    resp = client.post(
+        f"/v1/campaigns/{cid}/act",
+        params={"fields": "turn.turn_owner,director.actor_id"},
+        json={"actor_id": "human1", "say": "I step through.", "director": {}},
+        headers=HEADERS,
+    )
+    assert resp.json() == {"turn": {"turn_owner": "player1"}, "director": {"actor_id": "player1"}}
+
+
+def test_player_think_is_private_and_players_cannot_mutate(client, campaign):
+    cid = campaign["id"]
+    out = act(
+        client, cid,
+        actor_id="player1",
+        say="I follow.",
+        think="I do not trust the DM.",
+        state_updates=[{"type": "hp_set", "payload": {"actor_id": "player1", "hp": 99}}],
+        advance_turn=False,
+    ).json()
+    assert out["memory_id"] and out["mutations_applied"] == 0 and out["turn"] is None
+
+    memories = client.get(f"/v1/campaigns/{cid}/memory/read", params={"viewer": "human1"}, headers=HEADERS).json()
+    assert memories == []
+    memories = client.get(f"/v1/campaigns/{cid}/memory/read", params={"viewer": "player1"}, headers=HEADERS).json()
+    assert [(m["scope"], m["text"]) for m in memories] == [("private", "I do not trust the DM.")]
+
+
+def test_failed_act_applies_nothing(client, campaign):
+    cid = campaign["id"]
+    resp = act(
+        client, cid,
+        actor_id="dm",
+        say="This should not land.",
+        state_updates=[{"type": "bogus", "payload": {}}],
+    )
+    assert resp.status_code == 400
+    assert events(client, cid) == []
+    state = client.get(f"/v1/campaigns/{cid}/state", params={"viewer": "dm"}, headers=HEADERS).json()
+    assert state["turn_owner"] == "dm"
+
+    assert act(client, cid, actor_id="nobody", say="Hi").status_code == 404
@@ -0,0 +1,61 @@
+import asyncio
+import inspect
+import httpx
+from fastapi.routing import APIRoute
+from sqlalchemy import text
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app import app
+from db import make_async_engine
+
+HEADERS = {"X-ENGINE-KEY": "test-key"}
+
+
+def test_all_routes_are_async():
+    routes = [r for r in app.routes if isinstance(r, APIRoute) and r.path.startswith("/v1/")]
+    assert routes
+    for route in routes:
+        assert inspect.iscoroutinefunction(route.endpoint), route.path
+
+
+def test_async_engine_pool_and_pragmas(tmp_path):
+    engine = make_async_engine(f"sqlite:///{tmp_path / 'async.db'}")
+
+    async def check():
+        async with engine.connect() as conn:
+            return (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+
+    try:
+        assert isinstance(engine.pool, AsyncAdaptedQueuePool)
+        assert asyncio.run(check()) == "wal"
+    finally:
+        asyncio.run(engine.dispose())
+
+
+def test_concurrent_requests_on_one_event_loop(campaign):
+    cid = campaign["id"]
+
+    async def burst():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://engine") as client:
+            writes = [
+                client.post(
+                    f"/v1/campaigns/{cid}/events",
+                    json={"actor_id": "human1", "event_type": "utterance", "content": f"line {i}", "visibility": "public"},
+                    headers=HEADERS,
+                )
+                for i in range(20)
+            ]
+            assert all(r.status_code == 200 for r in await asyncio.gather(*writes))
+
+            reads = [
+                client.get(f"/v1/campaigns/{cid}/events", params={"viewer": "player1"}, headers=HEADERS)
+                for _ in range(20)
+            ] + [
+                client.post(f"/v1/campaigns/{cid}/director/next", json={}, headers=HEADERS)
+                for _ in range(5)
+            ]
+            return await asyncio.gather(*reads)
+
+    responses = asyncio.run(burst())
+    assert all(r.status_code == 200 for r in responses)
+    assert all(len(r.json()) == 20 for r in responses[:20])
@@ -1,4 +1,5 @@
 from config import settings
+from tokens import estimate_tokens, json_tokens
 
 
 def create_campaign(client, actors):
@@ -34,10 +35,10 @@ def write_memory(client, campaign_id, actor_id, scope, text):
     assert resp.status_code == 200
 
 
-def director_next(client, campaign_id, max_events=50, max_memories=30):
+def director_next(client, campaign_id, max_events=50, max_memories=30, max_tokens=None):
     resp = client.post(
         f"/v1/campaigns/{campaign_id}/director/next",
-        json={"max_events": max_events, "max_memories": max_memories},
+        json={"max_events": max_events, "max_memories": max_memories, "max_tokens": max_tokens},
         headers={"X-ENGINE-KEY": "test-key"},
     )
     assert resp.status_code == 200
@@ -137,3 +138,48 @@ def test_director_blocks_ai_player_without_human_or_direct_address(client):
     post_event(client, cid, "dm", "party", "@player1 what do you do?")
     allowed = director_next(client, cid)
     assert allowed["should_act"] is True
+
+
+def test_estimate_tokens_grows_with_text():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("Hello, world!") == 4
+    assert estimate_tokens("The torch gutters.") < estimate_tokens("The torch gutters and the shadows lengthen.")
+
+
+def test_director_fills_token_budget_newest_first(client, campaign):
+    cid = campaign["id"]
+    for i in range(8):
+        post_event(client, cid, "dm", "public", f"event {i}")
+    write_memory(client, cid, "dm", "private", "The DM knows the trap.")
+
+    package = director_next(client, cid, max_tokens=500)
+    contents = [e["content"] for e in package["visible_events"]]
+    assert 0 < len(contents) < 8
+    assert contents == [f"event {i}" for i in range(8 - len(contents), 8)]
+    assert package["estimated_tokens"] <= 500
+    assert json_tokens(package) <= 500
+    assert package["viewer_state"]["turn_owner"] == "dm"
+    assert package["viewer_state"]["actors"]
+    assert director_next(client, cid)["visible_events"] == []
+
+
+def test_director_budget_large_enough_keeps_everything(client, campaign):
+    cid = campaign["id"]
+    post_event(client, cid, "dm", "public", "event 0")
+    write_memory(client, cid, "dm", "world", "The keep is ruined.")
+
+    package = director_next(client, cid, max_tokens=100_000)
+    assert director_next(client, cid, max_tokens=None)["estimated_tokens"] is None
+    assert [e["content"] for e in package["visible_events"]] == ["event 0"]
+    assert [m["text"] for m in package["memories"]["world"]] == ["The keep is ruined."]
+    assert "state_kv" in package["viewer_state"]
+
+
+def test_director_budget_stops_at_oversized_event(client, campaign):
+    cid = campaign["id"]
+    post_event(client, cid, "dm", "public", "event 0")
+    post_event(client, cid, "dm", "public", "A long-winded account of the keep. " * 40)
+    post_event(client, cid, "dm", "public", "event 2")
+
+    package = director_next(client, cid, max_tokens=450)
+    assert [e["content"] for e in package["visible_events"]] == ["event 2"]
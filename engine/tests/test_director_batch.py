@@ -0,0 +1,78 @@
+import orjson
+from schemas import DirectorNextRequest
+from services.director_service import build_director_context
+from tests.conftest import run_in_session
+from tests.test_director import post_event, write_memory
+from tests.test_director_cache import count_statements
+
+HEADERS = {"X-ENGINE-KEY": "test-key"}
+
+
+def director_batch(client, cid, actor_ids, **body):
+    resp = client.post(
+        f"/v1/campaigns/{cid}/director/batch",
+        json={"actor_ids": actor_ids, **body},
+        headers=HEADERS,
+    )
+    assert resp.status_code == 200
+    return resp.json()["packages"]
+
+
+def seed(client, cid):
+    post_event(client, cid, "human1", "public", "I light the brazier.")
+    post_event(client, cid, "dm", "private:human1", "Only you notice the draft.")
+    post_event(client, cid, "dm", "dm_only", "The cultists are near.")
+    write_memory(client, cid, "player1", "private", "player1 fears fire")
+    write_memory(client, cid, "human1", "private", "human1 keeps a map")
+
+
+def test_batch_matches_single_director_and_filters_per_viewer(client, campaign):
+    cid = campaign["id"]
+    seed(client, cid)
+
+    dm, player1, human1 = director_batch(client, cid, ["dm", "player1", "human1"])
+    single, _ = run_in_session(build_director_context, cid, DirectorNextRequest())
+    assert dm == orjson.loads(orjson.dumps(single))
+
+    assert [p["actor_id"] for p in (dm, player1, human1)] == ["dm", "player1", "human1"]
+    assert [e["content"] for e in player1["visible_events"]] == ["I light the brazier."]
+    assert [e["content"] for e in human1["visible_events"]] == ["I light the brazier.", "Only you notice the draft."]
+    assert [m["text"] for m in player1["memories"]["private"]] == ["player1 fears fire"]
+    assert [m["text"] for m in human1["memories"]["private"]] == ["human1 keeps a map"]
+    assert player1["viewer_state"]["visible_events_count"] == 1
+    assert human1["viewer_state"]["visible_events_count"] == 2
+
+
+def test_batch_query_count_does_not_grow_with_actors(client, campaign):
+    cid = campaign["id"]
+    seed(client, cid)
+
+    with count_statements() as one:
+        director_batch(client, cid, ["player1"])
+    with count_statements() as three:
+        director_batch(client, cid, ["dm", "player1", "human1"])
+    assert len(three) == len(one)
+
+
+def test_batch_advances_cursors_only_when_asked(client, campaign):
+    cid = campaign["id"]
+    seed(client, cid)
+
+    director_batch(client, cid, ["dm", "human1"])
+    assert director_batch(client, cid, ["human1"])[0]["visible_events"]
+
+    director_batch(client, cid, ["dm", "human1"], advance_cursors=True)
+    dm, human1 = director_batch(client, cid, ["dm", "human1"])
+    assert dm["visible_events"] == [] and human1["visible_events"] == []
+
+    post_event(client, cid, "human1", "party", "Onward.")
+    assert [e["content"] for e in director_batch(client, cid, ["human1"])[0]["visible_events"]] == ["Onward."]
+
+
+def test_batch_gates_ai_players_and_unknown_actors(client, campaign):
+    cid = campaign["id"]
+    post_event(client, cid, "dm", "public", "The hall is quiet.")
+
+    player1, ghost = director_batch(client, cid, ["player1", "ghost"])
+    assert (player1["should_act"], player1["reason"], player1["actor_id"]) == (False, "await_human_input", "player1")
+    assert (ghost["should_act"], ghost["reason"]) == (False, "unknown_actor")
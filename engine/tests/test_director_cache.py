@@ -0,0 +1,151 @@
+import asyncio
+import time
+from contextlib import contextmanager
+import httpx
+from sqlalchemy import event
+import services.turn_service
+from app import app
+from services.director_service import package_cache, precompute_director_context, speculative_packages
+from tests.conftest import TestingSessionLocal, run_in_session, test_engine
+from tests.test_director import director_next, post_event, write_memory
+from versioning import campaign_head
+
+HEADERS = {"X-ENGINE-KEY": "test-key"}
+
+
+def version(cid):
+    return run_in_session(campaign_head, cid)[0]
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", record)
+
+
+def test_every_write_bumps_version(client, campaign):
+    cid = campaign["id"]
+
+    writes = [
+        lambda: post_event(client, cid, "dm", "public", "hello"),
+        lambda: write_memory(client, cid, "dm", "world", "lore"),
+        lambda: client.post(
+            f"/v1/campaigns/{cid}/mutate",
+            json={"actor_id": "dm", "mutations": [{"type": "flag_set", "payload": {"key": "door", "value": True}}]},
+            headers=HEADERS,
+        ),
+        lambda: client.post(f"/v1/campaigns/{cid}/roll", json={"expr": "1d20", "reason": "x", "actor_id": "dm"}, headers=HEADERS),
+        lambda: client.post(f"/v1/campaigns/{cid}/turn/advance", headers=HEADERS),
+        lambda: director_next(client, cid),  # moves player1's cursor
+    ]
+    for write in writes:
+        before = version(cid)
+        write()
+        assert version(cid) > before
+
+
+def test_version_long_poll_wakes_on_commit(client, campaign):
+    cid = campaign["id"]
+    head = client.get(f"/v1/campaigns/{cid}/version", headers=HEADERS).json()
+    assert head == {"campaign_id": cid, "version": version(cid), "turn_owner": "dm"}
+    assert client.get("/v1/campaigns/nope/version", headers=HEADERS).status_code == 404
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://engine") as engine:
+            waiting = asyncio.create_task(engine.get(
+                f"/v1/campaigns/{cid}/version",
+                params={"after": head["version"], "wait": 10},
+                headers=HEADERS,
+            ))
+            await asyncio.sleep(0.1)
+            assert not waiting.done()
+            started = time.monotonic()
+            await engine.post(
+                f"/v1/campaigns/{cid}/events",
+                json={"actor_id": "human1", "event_type": "utterance", "content": "I open the door.", "visibility": "public"},
+                headers=HEADERS,
+            )
+            resp = await asyncio.wait_for(waiting, 2)
+            return resp.json(), time.monotonic() - started
+
+    woken, elapsed = asyncio.run(scenario())
+    assert woken["version"] == version(cid) > head["version"]
+    assert elapsed < 0.5
+
+
+def test_idle_ticks_served_from_cache(client, campaign):
+    cid = campaign["id"]
+    post_event(client, cid, "human1", "public", "I wait.")
+
+    first = director_next(client, cid)
+    assert [e["content"] for e in first["visible_events"]] == ["I wait."]
+    assert director_next(client, cid)["visible_events"] == []  # cursor moved: rebuilt, then cached
+
+    hits = package_cache.hits
+    with count_statements() as statements:
+        idle = director_next(client, cid)
+    assert idle["visible_events"] == []
+    assert package_cache.hits == hits + 1
+    assert len(statements) == 1
+
+    post_event(client, cid, "human1", "public", "I open the door.")
+    fresh = director_next(client, cid)
+    assert [e["content"] for e in fresh["visible_events"]] == ["I open the door."]
+
+
+def test_limits_are_part_of_the_key(client, campaign):
+    cid = campaign["id"]
+    for i in range(3):
+        write_memory(client, cid, "dm", "world", f"lore {i}")
+    assert len(director_next(client, cid, max_memories=1)["memories"]["world"]) == 1
+    assert len(director_next(client, cid, max_memories=3)["memories"]["world"]) == 3
+
+
+def precompute(cid):
+    asyncio.run(precompute_director_context(cid, lambda _: TestingSessionLocal()))
+
+
+def test_precomputed_package_is_served_once(client, campaign):
+    cid = campaign["id"]
+    post_event(client, cid, "human1", "public", "I draw my sword.")
+    precompute(cid)
+
+    served = speculative_packages.served
+    with count_statements() as statements:
+        package = director_next(client, cid)
+    assert speculative_packages.served == served + 1
+    assert [e["content"] for e in package["visible_events"]] == ["I draw my sword."]
+    assert not any("FROM memories" in s for s in statements)  # not rebuilt
+    assert director_next(client, cid)["visible_events"] == []  # the cursor still moved
+
+
+def test_stale_precompute_is_rebuilt(client, campaign):
+    cid = campaign["id"]
+    post_event(client, cid, "human1", "public", "I draw my sword.")
+    precompute(cid)
+    post_event(client, cid, "human1", "public", "I charge.")
+
+    served = speculative_packages.served
+    package = director_next(client, cid)
+    assert speculative_packages.served == served
+    assert [e["content"] for e in package["visible_events"]] == ["I draw my sword.", "I charge."]
+
+
+def test_turn_advance_schedules_precompute(client, campaign, monkeypatch):
+    cid = campaign["id"]
+    scheduled = []
+    monkeypatch.setattr(services.turn_service, "schedule_precompute", scheduled.append)
+
+    client.post(f"/v1/campaigns/{cid}/turn/advance", headers=HEADERS)
+    assert scheduled == []
+    client.post(f"/v1/campaigns/{cid}/turn/advance", params={"precompute": True}, headers=HEADERS)
+    assert scheduled == [cid]
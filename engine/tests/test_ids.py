@@ -0,0 +1,32 @@
+from datetime import datetime, timedelta, timezone
+from ids import id_timestamp, new_id
+
+
+def test_ids_sort_in_creation_order():
+    ids = [new_id() for _ in range(2000)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert all(len(i) == 26 for i in ids)
+
+
+def test_id_timestamp_round_trips():
+    stamp = id_timestamp(new_id())
+    assert abs(stamp - datetime.now(timezone.utc)) < timedelta(seconds=5)
+
+
+def test_legacy_ids_still_accepted():
+    assert id_timestamp("3f9a1c0b") is None
+
+
+def test_services_issue_sortable_ids(client, campaign):
+    cid = campaign["id"]
+    assert id_timestamp(cid) is not None
+    ids = [
+        client.post(
+            f"/v1/campaigns/{cid}/events",
+            json={"actor_id": "dm", "event_type": "utterance", "content": str(i), "visibility": "public"},
+            headers={"X-ENGINE-KEY": "test-key"},
+        ).json()["id"]
+        for i in range(5)
+    ]
+    assert ids == sorted(ids)
@@ -0,0 +1,86 @@
+import asyncio
+import httpx
+import runner as runner_module
+from runner import _configured_campaigns
+from stub_model import StubModel
+from tests.conftest import make_runner, settle_engine, stub_model_handler
+
+HEADERS = {"X-ENGINE-KEY": "test-key"}
+
+
+def events(client, cid):
+    resp = client.get(f"/v1/campaigns/{cid}/events", params={"viewer": "dm"}, headers=HEADERS)
+    return [(e["actor_id"], e["content"]) for e in resp.json() if e["event_type"] == "utterance"]
+
+
+def test_tick_plays_ai_and_human_seats_in_turn(client, campaign, monkeypatch):
+    cid = campaign["id"]
+    monkeypatch.setattr(runner_module, "MAX_AUTO_TURNS_PER_TICK", 3)
+    model = StubModel(base_ms=0, prompt_ms_per_token=0, tokens_per_second=1e9)
+
+    async def scenario():
+        runner = make_runner(stub_model_handler(model), floor_lease=False)
+        try:
+            return await runner.tick(cid)
+        finally:
+            await runner.close()
+            await settle_engine()
+
+    assert asyncio.run(scenario()) == 3
+    assert [actor_id for actor_id, _ in events(client, cid)] == ["dm", "human1", "player1"]
+    assert model.stats()["requests"] == 3
+
+
+def test_run_once_ticks_every_campaign_within_the_model_limit(client, campaign, monkeypatch):
+    other = client.post("/v1/campaigns", json={"name": "Second Table", "actors": [
+        {"id": "dm2", "name": "DM", "actor_type": "dm", "is_ai": True},
+        {"id": "human2", "name": "Human 2", "actor_type": "human", "is_ai": False},
+    ]}, headers=HEADERS)
+    campaign_ids = [campaign["id"], other.json()["id"]]
+    monkeypatch.setattr(runner_module, "MAX_AUTO_TURNS_PER_TICK", 2)
+    answer = stub_model_handler(StubModel(base_ms=0, prompt_ms_per_token=0, tokens_per_second=1e9))
+    in_flight, most = 0, 0
+
+    async def model(request):
+        nonlocal in_flight, most
+        in_flight += 1
+        most = max(most, in_flight)
+        try:
+            await asyncio.sleep(0.02)
+            return answer(request)
+        finally:
+            in_flight -= 1
+
+    async def scenario():
+        runner = make_runner(model, model_concurrency=1, worker_id="w1")
+        try:
+            return await runner.run_once(campaign_ids, discover=False)
+        finally:
+            await runner.close()
+            await settle_engine()
+
+    assert asyncio.run(scenario()) == 4
+    assert most == 1
+    assert [actor_id for actor_id, _ in events(client, campaign_ids[0])] == ["dm", "human1"]
+    assert [actor_id for actor_id, _ in events(client, campaign_ids[1])] == ["dm2", "human2"]
+
+
+def test_campaigns_come_from_configuration_and_discovery(client, campaign, monkeypatch):
+    monkeypatch.setattr(runner_module, "CAMPAIGN_ID", "a")
+    monkeypatch.setattr(runner_module, "CAMPAIGN_IDS", "b, a,,c")
+    assert _configured_campaigns("c,d") == ["a", "b", "c", "d"]
+
+    def unreachable(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    async def scenario():
+        runner = make_runner()
+        down = make_runner(engine_transport=httpx.MockTransport(unreachable))
+        try:
+            return await runner.campaigns(["x"], discover=True), await down.campaigns(["x"], discover=True)
+        finally:
+            await runner.close()
+            await down.close()
+
+    # Discovery failing leaves the configured campaigns.
+    assert asyncio.run(scenario()) == (["x", campaign["id"]], ["x"])
@@ -0,0 +1,142 @@
+import asyncio
+import httpx
+import pytest
+import runner as runner_module
+from config import settings
+from stub_model import StubModel
+from tests.conftest import make_runner, settle_engine, stub_model_handler
+
+HEADERS = {"X-ENGINE-KEY": "test-key"}
+
+
+def events(client, cid):
+    resp = client.get(f"/v1/campaigns/{cid}/events", params={"viewer": "dm"}, headers=HEADERS)
+    return [(e["actor_id"], e["content"]) for e in resp.json() if e["event_type"] == "utterance"]
+
+
+def claim(client, cid, worker_id):
+    return client.post(f"/v1/campaigns/{cid}/director/claim", json={"worker_id": worker_id}, headers=HEADERS)
+
+
+def test_floor_is_held_renewed_and_released(client, campaign, monkeypatch):
+    cid = campaign["id"]
+    monkeypatch.setattr(settings, "FLOOR_LEASE_SECONDS", 0.6)
+
+    async def scenario():
+        first, second = make_runner(worker_id="first"), make_runner(worker_id="second")
+        try:
+            assert await first.hold_floor(cid) == 0.0
+            # Held: no second claim until the heartbeat stops.
+            assert await first.hold_floor(cid) == 0.0
+            assert await second.hold_floor(cid) >= 1
+            # Two leases later the heartbeat has kept the floor.
+            await asyncio.sleep(1.2)
+            assert await second.hold_floor(cid) >= 1
+
+            # Dropped, the lease runs out on its own.
+            first.drop_floor(cid)
+            await asyncio.sleep(0.7)
+            assert await second.hold_floor(cid) == 0.0
+            assert await first.hold_floor(cid) >= 1
+
+            # Released, the floor is free at once.
+            await second.release_floor(cid)
+            assert cid not in second._floors
+            assert await first.hold_floor(cid) == 0.0
+        finally:
+            await first.close()
+            await second.close()
+
+    asyncio.run(scenario())
+    # Closing a runner hands back its floors.
+    assert claim(client, cid, "third").status_code == 200
+
+
+def test_engine_without_leases_is_driven_unclaimed():
+    def old_engine(request):
+        return httpx.Response(404, json={"detail": "Not Found"})
+
+    async def scenario():
+        runner = make_runner(engine_transport=httpx.MockTransport(old_engine))
+        try:
+            waited = await runner.hold_floor("c1")
+            return waited, runner.floor_lease, runner.fenced({"max_events": 1})
+        finally:
+            await runner.close()
+
+    assert asyncio.run(scenario()) == (0.0, False, {"max_events": 1})
+
+
+def test_tick_plays_the_table_under_the_floor(client, campaign, monkeypatch):
+    cid = campaign["id"]
+    monkeypatch.setattr(runner_module, "MAX_AUTO_TURNS_PER_TICK", 2)
+    model = StubModel(base_ms=0, prompt_ms_per_token=0, tokens_per_second=1e9)
+
+    async def scenario():
+        runner = make_runner(stub_model_handler(model), worker_id="w1")
+        try:
+            assert await runner.hold_floor(cid) == 0.0
+            return await runner.tick(cid)
+        finally:
+            await runner.close()
+            await settle_engine()
+
+    assert asyncio.run(scenario()) == 2
+    # The DM opens, then the human seat, which the runner plays too; ask is not spoken.
+    (dm_line, human_line) = events(client, cid)
+    assert dm_line[0] == "dm" and dm_line[1].endswith("begins.")
+    assert human_line[0] == "human1" and human_line[1].startswith("I steady myself.")
+    state = client.get(f"/v1/campaigns/{cid}/state", params={"viewer": "dm"}, headers=HEADERS).json()
+    assert state["turn_owner"] == "player1"
+    assert model.stats()["requests"] == 2
+
+
+def test_tick_stops_when_another_worker_holds_the_floor(client, campaign):
+    cid = campaign["id"]
+    assert claim(client, cid, "other").status_code == 200
+    model = StubModel(base_ms=0, prompt_ms_per_token=0, tokens_per_second=1e9)
+
+    async def scenario():
+        runner = make_runner(stub_model_handler(model), worker_id="w1")
+        try:
+            assert await runner.hold_floor(cid) >= 1
+            with pytest.raises(httpx.HTTPStatusError) as refused:
+                await runner.tick(cid)
+            return refused.value.response.status_code
+        finally:
+            await runner.close()
+
+    assert asyncio.run(scenario()) == 409
+    assert model.stats()["requests"] == 0
+    assert events(client, cid) == []
+
+
+def test_watch_keeps_an_idle_floor_through_the_grace_period(client, monkeypatch):
+    resp = client.post("/v1/campaigns", json={"name": "Quiet", "actors": [
+        {"id": "dm", "name": "DM", "actor_type": "dm", "is_ai": True},
+        {"id": "player1", "name": "Player 1", "actor_type": "player", "is_ai": True},
+    ]}, headers=HEADERS)
+    cid = resp.json()["id"]
+    monkeypatch.setattr(runner_module, "POLL_SECONDS", 0.01)
+    model = StubModel(base_ms=0, prompt_ms_per_token=0, tokens_per_second=1e9)
+
+    async def scenario():
+        runner = make_runner(stub_model_handler(model), worker_id="w1", floor_idle=0.5)
+        other = make_runner(worker_id="w2")
+        watching = asyncio.create_task(runner.watch(cid))
+        try:
+            # The DM speaks; the AI player then waits for a human who never comes.
+            await asyncio.sleep(0.3)
+            assert model.stats()["requests"] == 1
+            assert await other.hold_floor(cid) >= 1
+            await asyncio.sleep(0.5)
+            assert cid not in runner._floors
+            assert await other.hold_floor(cid) == 0.0
+        finally:
+            watching.cancel()
+            await asyncio.gather(watching, return_exceptions=True)
+            await runner.close()
+            await other.close()
+            await settle_engine()
+
+    asyncio.run(scenario())
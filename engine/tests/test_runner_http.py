@@ -0,0 +1,68 @@
+import asyncio
+import httpx
+import pytest
+import runner as runner_module
+from runner import TickStats, _pool_limits, _tick_stats
+from tests.conftest import make_runner
+
+
+class Flaky:
+    """Engine transport failing the first ``failures`` requests with ``error``, then answering 200."""
+
+    def __init__(self, error, failures):
+        self.error = error
+        self.failures = failures
+        self.attempts = 0
+
+    def __call__(self, request):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise self.error("boom", request=request)
+        return httpx.Response(200, json={})
+
+
+@pytest.mark.parametrize("error,failures,idempotent,attempts,ok", [
+    # Never reached the server: always safe to resend, up to HTTP_RETRIES times.
+    (httpx.ConnectError, 2, False, 3, True),
+    (httpx.ConnectError, 3, False, 3, False),
+    (httpx.PoolTimeout, 1, False, 2, True),
+    # Cut off mid-flight: the engine may have acted, so only idempotent calls are resent.
+    (httpx.ReadError, 1, False, 1, False),
+    (httpx.RemoteProtocolError, 1, False, 1, False),
+    (httpx.ReadError, 1, True, 2, True),
+    (httpx.WriteError, 3, True, 3, False),
+    # Anything else (here a slow engine) is the caller's to handle.
+    (httpx.ReadTimeout, 1, True, 1, False),
+])
+def test_send_retries_only_what_is_safe_to_resend(monkeypatch, error, failures, idempotent, attempts, ok):
+    monkeypatch.setattr(runner_module, "HTTP_RETRIES", 2)
+    flaky = Flaky(error, failures)
+
+    async def scenario():
+        runner = make_runner(engine_transport=httpx.MockTransport(flaky))
+        stats = TickStats()
+        _tick_stats.set(stats)
+        try:
+            resp = await runner.send("engine", "POST", "/v1/campaigns/c1/act", idempotent=idempotent, json={})
+            return resp.status_code, stats
+        finally:
+            await runner.close()
+
+    if ok:
+        status, stats = asyncio.run(scenario())
+        assert status == 200
+        assert stats.retries == attempts - 1
+        assert stats.engine_calls == attempts
+    else:
+        with pytest.raises(error):
+            asyncio.run(scenario())
+    assert flaky.attempts == attempts
+
+
+def test_pool_limits_keep_every_pooled_connection_alive(monkeypatch):
+    monkeypatch.setattr(runner_module, "HTTP_KEEPALIVE_SECONDS", 30.0)
+    limits = _pool_limits(8)
+    assert (limits.max_connections, limits.max_keepalive_connections, limits.keepalive_expiry) == (8, 8, 30.0)
+    # The wakeup pool holds one parked long-poll per idle campaign.
+    unbounded = _pool_limits(None)
+    assert (unbounded.max_connections, unbounded.max_keepalive_connections) == (None, None)
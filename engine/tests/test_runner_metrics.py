@@ -0,0 +1,140 @@
+import asyncio
+import json
+import math
+import random
+import httpx
+import pytest
+from metrics import Histogram, PhaseMetrics, parse_server_timing, serve_metrics
+
+
+def exact_quantile(values, q):
+    """Nearest-rank quantile, the definition ``Histogram.quantile`` approximates."""
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(q * len(ordered))) - 1]
+
+
+@pytest.mark.parametrize("distribution", ["uniform", "lognormal", "bimodal"])
+def test_quantiles_are_within_the_stated_precision(distribution):
+    rng = random.Random(7)
+    if distribution == "uniform":
+        values = [rng.uniform(0.001, 10.0) for _ in range(20000)]
+    elif distribution == "lognormal":
+        values = [rng.lognormvariate(math.log(0.05), 1.5) for _ in range(20000)]
+    else:
+        values = [rng.gauss(0.002, 0.0002) if rng.random() < 0.9 else rng.gauss(1.5, 0.1) for _ in range(20000)]
+    histogram = Histogram(significant_digits=2)
+    for value in values:
+        histogram.record(value)
+
+    assert histogram.count == len(values)
+    assert histogram.total == pytest.approx(sum(values))
+    for q in (0.5, 0.9, 0.99, 0.999):
+        # Two significant digits: within 1% (plus the microsecond the values are rounded to).
+        assert histogram.quantile(q) == pytest.approx(exact_quantile(values, q), rel=0.01, abs=1e-6)
+    assert histogram.quantile(1.0) == pytest.approx(max(values), rel=0.01)
+    assert histogram.min == min(values) and histogram.max == max(values)
+
+
+def test_small_values_are_exact_and_extremes_are_clamped():
+    histogram = Histogram()
+    for micros in (3, 5, 5, 200):
+        histogram.record(micros / 1e6)
+    assert [histogram.quantile(q) for q in (0.25, 0.5, 0.75, 1.0)] == [3e-6, 5e-6, 5e-6, 200e-6]
+
+    single = Histogram()
+    single.record(0.0123456)
+    assert {single.quantile(q) for q in (0.01, 0.5, 0.99)} == {0.0123456}
+
+    assert Histogram().quantile(0.5) == 0.0
+    assert Histogram().snapshot() == {
+        "count": 0, "mean_ms": 0.0, "min_ms": 0.0, "p50_ms": 0.0, "p90_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0,
+    }
+
+
+def test_more_digits_buy_more_precision():
+    values = [1.0 + i / 1000 for i in range(1000)]
+    coarse, fine = Histogram(1), Histogram(3)
+    for value in values:
+        coarse.record(value)
+        fine.record(value)
+    exact = exact_quantile(values, 0.5)
+    assert coarse.quantile(0.5) == pytest.approx(exact, rel=0.1)
+    assert fine.quantile(0.5) == pytest.approx(exact, rel=0.001)
+    assert len(fine.counts) > len(coarse.counts)
+
+
+def test_merge_matches_recording_into_one_histogram():
+    rng = random.Random(3)
+    values = [rng.expovariate(20) for _ in range(5000)]
+    whole, left, right = Histogram(), Histogram(), Histogram()
+    for i, value in enumerate(values):
+        whole.record(value)
+        (left if i % 3 else right).record(value)
+    left.merge(right)
+    assert left.counts == whole.counts
+    assert left.snapshot() == whole.snapshot()
+
+    empty = Histogram()
+    empty.merge(Histogram())
+    assert empty.snapshot()["count"] == 0
+
+
+def test_phase_metrics_merge_per_role_and_export():
+    metrics = PhaseMetrics()
+    for seconds in (0.010, 0.020, 0.030):
+        metrics.record("c1", "dm", "model", seconds)
+    metrics.record("c2", "dm", "model", 0.040)
+    metrics.record('c"3\n', None, "tick", 1.0)
+
+    by_role = metrics.by_role()
+    assert by_role[("dm", "model")].count == 4
+    assert by_role[("none", "tick")].count == 1
+    report = json.loads(json.dumps(metrics.report()))
+    assert [(row["role"], row["phase"], row["count"]) for row in report["by_role"]] == [("dm", "model", 4), ("none", "tick", 1)]
+    assert len(report["by_campaign"]) == 3
+
+    text = metrics.prometheus_text()
+    assert text.startswith("# HELP runner_phase_seconds ")
+    assert "# TYPE runner_phase_seconds summary\n" in text
+    assert 'runner_phase_seconds{campaign="c1",role="dm",phase="model",quantile="0.5"} 0.020' in text
+    assert 'runner_phase_seconds_count{campaign="c1",role="dm",phase="model"} 3\n' in text
+    assert 'runner_phase_seconds_sum{campaign="c1",role="dm",phase="model"} 0.060000\n' in text
+    # Label values are escaped.
+    assert 'campaign="c\\"3\\n",role="none",phase="tick"' in text
+    assert text.endswith("\n")
+
+
+@pytest.mark.parametrize("header,expected", [
+    (None, {}),
+    ("", {}),
+    ("advance;dur=12.5", {"advance": 0.0125}),
+    ("advance;dur=1, apply;dur=2.25,director;dur=0", {"advance": 0.001, "apply": 0.00225, "director": 0.0}),
+    ('db;desc="Database";dur=3', {"db": 0.003}),
+    ("cache, miss;desc=x", {}),
+    ("advance;dur=abc, apply;dur=4", {"apply": 0.004}),
+    (" spaced ; dur=5 ,;dur=6", {"spaced": 0.005}),
+])
+def test_parse_server_timing(header, expected):
+    assert parse_server_timing(header) == pytest.approx(expected)
+
+
+def test_serve_metrics_answers_metrics_and_report():
+    metrics = PhaseMetrics()
+    metrics.record("c1", "player", "model", 0.25)
+
+    async def scenario():
+        server = await serve_metrics(metrics, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+                return [await client.get(path) for path in ("/metrics", "/report", "/missing")]
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    prometheus, report, missing = asyncio.run(scenario())
+    assert prometheus.status_code == 200
+    assert prometheus.headers["content-type"].startswith("text/plain")
+    assert prometheus.text == metrics.prometheus_text()
+    assert report.json()["by_role"][0]["count"] == 1
+    assert missing.status_code == 404
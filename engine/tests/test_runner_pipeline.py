@@ -0,0 +1,131 @@
+import asyncio
+import json
+import httpx
+import runner as runner_module
+from app import app
+from runner import TickStats, _predicted_next_actor, _tick_stats
+from stub_model import StubModel
+from tests.conftest import make_runner, settle_engine, stub_model_handler
+
+HEADERS = {"X-ENGINE-KEY": "test-key"}
+
+
+def events(client, cid):
+    resp = client.get(f"/v1/campaigns/{cid}/events", params={"viewer": "dm"}, headers=HEADERS)
+    return [(e["actor_id"], e["content"]) for e in resp.json() if e["event_type"] == "utterance"]
+
+
+def test_predicted_next_actor_mirrors_turn_advance(client, campaign):
+    cid = campaign["id"]
+    # The director lists actors in no particular order.
+    payload = {"viewer_state": {"actors": list(reversed(campaign["actors"]))}}
+    owner = campaign["turn_owner"]
+    for _ in range(4):
+        predicted = _predicted_next_actor({**payload, "actor_id": owner})
+        owner = client.post(f"/v1/campaigns/{cid}/turn/advance", headers=HEADERS).json()["turn_owner"]
+        assert predicted == owner
+    assert _predicted_next_actor({**payload, "actor_id": "ghost"}) is None
+    assert _predicted_next_actor({"viewer_state": {"actors": campaign["actors"][:1]}, "actor_id": "dm"}) is None
+
+
+class StatefulStub(StubModel):
+    """The stub model, with a DM that also sets a flag each turn."""
+
+    def complete(self, body):
+        content, usage, seconds = super().complete(body)
+        output = json.loads(content)
+        if "state_updates" in output:
+            output["state_updates"] = [{"type": "flag_set", "payload": {"key": "gate", "value": "open"}}]
+        return json.dumps(output), usage, seconds
+
+
+class InterruptedEngine(httpx.AsyncBaseTransport):
+    """The in-process engine, where a player line lands just before the first ``/act``."""
+
+    def __init__(self, campaign_id):
+        self.inner = httpx.ASGITransport(app=app)
+        self.campaign_id = campaign_id
+        self.interrupted = False
+
+    async def handle_async_request(self, request):
+        if request.url.path.endswith("/act") and not self.interrupted:
+            self.interrupted = True
+            await self.inner.handle_async_request(httpx.Request(
+                "POST", f"http://engine/v1/campaigns/{self.campaign_id}/events", headers=HEADERS, json={
+                    "actor_id": "player1", "event_type": "utterance", "content": "Wait!", "visibility": "public",
+                },
+            ))
+        return await self.inner.handle_async_request(request)
+
+
+def pipelined_tick(campaign_id, model, engine_transport=None):
+    """One pipelined tick; how many acted and its stats."""
+    answer = stub_model_handler(model)
+
+    async def slow_model(request):
+        # As with a real model, each prefetch lands well before the output is ready.
+        await asyncio.sleep(0.05)
+        return answer(request)
+
+    async def scenario():
+        runner = make_runner(slow_model, engine_transport, worker_id="w1", pipeline=True)
+        stats = TickStats()
+        _tick_stats.set(stats)
+        try:
+            assert await runner.hold_floor(campaign_id) == 0.0
+            return await runner.tick(campaign_id), stats
+        finally:
+            await runner.close()
+            await settle_engine()
+
+    return asyncio.run(scenario())
+
+
+def test_pipelined_tick_keeps_early_turns_past_state_updates(client, campaign, monkeypatch):
+    cid = campaign["id"]
+    monkeypatch.setattr(runner_module, "MAX_AUTO_TURNS_PER_TICK", 3)
+    model = StatefulStub(base_ms=0, prompt_ms_per_token=0, tokens_per_second=1e9)
+
+    acted, stats = pipelined_tick(cid, model)
+    # The human's turn started while the DM's /act was applied. The AI player's
+    # could not: until the human spoke, it had no one to answer.
+    assert acted == 3
+    assert (stats.ahead_kept, stats.ahead_discarded) == (1, 0)
+    assert model.stats()["requests"] == 3
+    assert [actor_id for actor_id, _ in events(client, cid)] == ["dm", "human1", "player1"]
+    state = client.get(f"/v1/campaigns/{cid}/state", params={"viewer": "dm"}, headers=HEADERS).json()
+    assert state["state_kv"]["flag:gate"] == '"open"'
+
+
+def test_pipelined_tick_discards_an_early_turn_the_table_outran(client, campaign, monkeypatch):
+    cid = campaign["id"]
+    monkeypatch.setattr(runner_module, "MAX_AUTO_TURNS_PER_TICK", 2)
+    model = StubModel(base_ms=0, prompt_ms_per_token=0, tokens_per_second=1e9)
+
+    acted, stats = pipelined_tick(cid, model, InterruptedEngine(cid))
+    # The human's early turn missed the player's line: it was dropped and played again.
+    assert acted == 2
+    assert (stats.ahead_kept, stats.ahead_discarded) == (0, 1)
+    assert [actor_id for actor_id, _ in events(client, cid)] == ["player1", "dm", "human1"]
+    # Only the replayed turn was heard.
+    resp = client.get(f"/v1/campaigns/{cid}/utterances", params={"viewer": "human1"}, headers=HEADERS)
+    assert len({chunk["utterance_id"] for chunk in resp.json() if chunk["actor_id"] == "human1"}) == 1
+
+
+def test_pipelined_tick_sees_the_act_through_when_the_early_turn_fails(client, campaign, monkeypatch):
+    cid = campaign["id"]
+    monkeypatch.setattr(runner_module, "MAX_AUTO_TURNS_PER_TICK", 2)
+    build_messages = runner_module.Runner.build_messages
+
+    def failing_build(self, campaign_id, actor_id, actor_role, director, speculative=False):
+        if speculative:
+            raise RuntimeError("no early prompt")
+        return build_messages(self, campaign_id, actor_id, actor_role, director)
+
+    monkeypatch.setattr(runner_module.Runner, "build_messages", failing_build)
+    model = StubModel(base_ms=0, prompt_ms_per_token=0, tokens_per_second=1e9)
+
+    acted, stats = pipelined_tick(cid, model)
+    assert acted == 2
+    assert (stats.ahead_kept, stats.ahead_discarded) == (0, 0)
+    assert [actor_id for actor_id, _ in events(client, cid)] == ["dm", "human1"]
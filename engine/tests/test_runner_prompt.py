@@ -0,0 +1,127 @@
+import json
+from prompt import PromptBuilder
+from runner import _schema_for_role
+from stub_model import StubModel
+
+ACTORS = [
+    {"id": "player1", "actor_type": "player", "is_ai": True},
+    {"id": "dm", "actor_type": "dm", "is_ai": True},
+    {"id": "human1", "actor_type": "human", "is_ai": False},
+]
+
+
+def package(actor_id, events, turn=0, summary=None):
+    """A director package as ``/director/next`` sends it: only events the actor has not seen."""
+    return {
+        "actor_id": actor_id,
+        "reason": "turn_owner",
+        "visible_events": [
+            {"id": f"e{n}", "actor_id": "human1", "event_type": "utterance", "content": f"Line {n}."} for n in events
+        ],
+        "memories": {
+            "world": [{"text": "The old kingdom of Vel fell when its river changed course."}],
+            "party": [{"text": f"Party note {turn}."}],
+            "private": [{"text": f"Private thought {turn}."}],
+        },
+        "viewer_state": {"actors": ACTORS, "turn_owner": actor_id, "state_kv": {"round": str(turn)}},
+        "constraints": {"must_ask_question": turn % 2 == 1, "max_output_sentences": 3},
+        "summary": {"text": summary} if summary else None,
+    }
+
+
+def build(builder, actor_id, events, turn=0, summary=None, speculative=False):
+    role = "dm" if actor_id == "dm" else "player"
+    messages, reuse = builder.build(
+        "c1", actor_id, role, package(actor_id, events, turn, summary), _schema_for_role(role)["schema"], speculative
+    )
+    return messages, reuse
+
+
+def titles(messages):
+    return [block.split(":\n", 1)[0] for block in messages[1]["content"].split("\n\n")]
+
+
+def event_lines(messages):
+    (block,) = [b for b in messages[1]["content"].split("\n\n") if b.startswith("Events:\n")]
+    return block.splitlines()[1:]
+
+
+def test_stable_sections_come_before_volatile_state():
+    messages, reuse = build(PromptBuilder(), "dm", [1, 2], summary="Earlier, the party met.")
+    assert reuse == 0.0
+    assert messages[0]["role"] == "system" and '"say"' in messages[0]["content"]
+    assert titles(messages) == [
+        "Cast", "World", "Story so far", "Events", "Party memories", "Private memories", "Now",
+    ]
+    # The cast is sorted, so the director's actor order does not shift the prefix.
+    assert messages[1]["content"].startswith("Cast:\n- dm (dm, ai)\n- human1 (human)\n- player1 (player, ai)")
+
+
+def test_history_is_append_only_across_turns():
+    builder = PromptBuilder()
+    first, _ = build(builder, "dm", [1, 2], turn=0)
+    second, reuse = build(builder, "dm", [3], turn=1)
+    assert event_lines(second) == ["human1: Line 1.", "human1: Line 2.", "human1: Line 3."]
+
+    # Everything up to the last old event line is unchanged; only what follows it moved.
+    stable = first[1]["content"].split("\n\nParty memories:")[0]
+    assert second[1]["content"].startswith(stable)
+    prompt = second[0]["content"] + "\n" + second[1]["content"]
+    assert reuse >= (len(first[0]["content"]) + 1 + len(stable)) / len(prompt)
+    # Each actor keeps its own history.
+    other, _ = build(builder, "player1", [3], turn=1)
+    assert event_lines(other) == ["human1: Line 3."]
+
+
+def test_long_history_is_trimmed_in_one_step():
+    builder = PromptBuilder(max_history_events=4)
+    build(builder, "dm", [1, 2, 3, 4], summary="Old summary.")
+    messages, _ = build(builder, "dm", [5], summary="New summary.")
+    assert event_lines(messages) == ["human1: Line 4.", "human1: Line 5."]
+    assert "Story so far:\nNew summary." in messages[1]["content"]
+    # Until the next trim the archived summary stays put, whatever the director sends.
+    messages, _ = build(builder, "dm", [6], summary="Newer summary.")
+    assert "Story so far:\nNew summary." in messages[1]["content"]
+
+
+def test_speculative_builds_join_the_history_only_when_accepted():
+    builder = PromptBuilder()
+    build(builder, "dm", [1])
+
+    build(builder, "dm", [2], speculative=True)
+    builder.discard("c1", "dm")
+    messages, _ = build(builder, "dm", [3])
+    assert event_lines(messages) == ["human1: Line 1.", "human1: Line 3."]
+
+    speculative, _ = build(builder, "dm", [4], speculative=True)
+    assert event_lines(speculative) == ["human1: Line 1.", "human1: Line 3.", "human1: Line 4."]
+    builder.accept("c1", "dm")
+    messages, _ = build(builder, "dm", [5])
+    assert event_lines(messages) == ["human1: Line 1.", "human1: Line 3.", "human1: Line 4.", "human1: Line 5."]
+
+
+def cache_ratio(layout, turns=12):
+    """Share of prompt tokens the stub serves from cache over a session of two alternating actors."""
+    model = StubModel(slots=2)
+    builder = PromptBuilder()
+    for turn in range(turns):
+        actor_id = ("dm", "player1")[turn % 2]
+        role = "dm" if actor_id == "dm" else "player"
+        if layout == "prefix":
+            messages, reuse = build(builder, actor_id, [turn], turn)
+        else:
+            messages = [{"role": "system", "content": f"You are actor '{actor_id}'."},
+                        {"role": "user", "content": json.dumps(package(actor_id, [turn], turn))}]
+        _, usage, _ = model.complete({"messages": messages, "response_format": {"json_schema": _schema_for_role(role)}})
+        if layout == "prefix":
+            # With a slot per actor, the builder's estimate is what the server reuses.
+            cached = usage["prompt_tokens_details"]["cached_tokens"] / usage["prompt_tokens"]
+            assert abs(cached - reuse) < 0.02
+    return model.stats()["cache_ratio"]
+
+
+def test_prefix_layout_is_reused_by_a_prefix_cache():
+    prefix, raw = cache_ratio("prefix"), cache_ratio("json")
+    # Two of the twelve prompts are each actor's first, with nothing cached.
+    assert prefix > 0.5
+    assert prefix > 3 * raw
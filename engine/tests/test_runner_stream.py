@@ -0,0 +1,105 @@
+import asyncio
+import json
+import pytest
+from runner import _SayStream, _Sentences
+from tests.conftest import make_runner, sse
+
+HEADERS = {"X-ENGINE-KEY": "test-key"}
+
+OUTPUT = {
+    "notes": {"say": "not this one", "list": ["}", "{", "\"say\""]},
+    "intent": "say",
+    "say": "Tab\there, \"quoted\", back\\slash, café and \U0001F409.",
+    "ask": "What now?",
+}
+
+
+def say_of(chunks):
+    stream = _SayStream()
+    return "".join(stream.feed(chunk) for chunk in chunks), stream.done
+
+
+def test_say_stream_matches_json_at_every_split():
+    # ensure_ascii: the dragon becomes a 🐉 surrogate pair in the text.
+    text = json.dumps(OUTPUT)
+    assert "\\ud83d\\udc09" in text
+    for cut in range(1, len(text)):
+        assert say_of([text[:cut], text[cut:]]) == (OUTPUT["say"], True), cut
+    assert say_of(list(text)) == (OUTPUT["say"], True)
+
+
+def test_say_stream_stops_at_the_end_of_say():
+    stream = _SayStream()
+    assert stream.feed('{"say": "Hello') == "Hello"
+    assert not stream.done
+    assert stream.feed(' there", "ask": "ignored"}') == " there"
+    assert stream.done
+
+
+def test_say_stream_keeps_an_unpaired_surrogate():
+    text = '{"say": "a\\ud83d", "ask": ""}'
+    assert say_of(list(text)) == (json.loads(text)["say"], True)
+
+
+def test_sentences_are_cut_on_terminal_punctuation():
+    sentences = _Sentences()
+    assert sentences.feed("The door creaks") == []
+    assert sentences.feed(". Something moves") == ["The door creaks."]
+    assert sentences.feed('! He yells "Run!" then') == ["Something moves!", 'He yells "Run!"']
+    assert sentences.feed(" flees... It costs 3.5 gold?! ") == ["then flees...", "It costs 3.5 gold?!"]
+    assert sentences.flush() == []
+    assert sentences.feed("No end") == []
+    assert sentences.flush() == ["No end"]
+
+
+def stream_turn(campaign_id, output, chunk_size, max_sentences=None, confirm=None):
+    """Stream ``output`` in ``chunk_size`` pieces through the runner; what the model returned."""
+    text = json.dumps(output)
+
+    def model(request):
+        return sse([text[i:i + chunk_size] for i in range(0, len(text), chunk_size)])
+
+    async def scenario():
+        runner = make_runner(model)
+        confirmed = None
+        if confirm is not None:
+            confirmed = asyncio.get_running_loop().create_future()
+            confirmed.set_result(confirm)
+        try:
+            return await runner._stream_completion(campaign_id, "dm", {}, "u1", max_sentences, confirmed)
+        finally:
+            await runner.close()
+
+    return asyncio.run(scenario())
+
+
+def partials(client, campaign_id):
+    resp = client.get(f"/v1/campaigns/{campaign_id}/utterances", params={"viewer": "human1"}, headers=HEADERS)
+    assert resp.status_code == 200
+    return [(chunk["utterance_id"], chunk["actor_id"], chunk["text"]) for chunk in resp.json()]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7])
+def test_streamed_sentences_reach_the_engine(client, campaign, chunk_size):
+    cid = campaign["id"]
+    output = {"say": "The gate opens. A cold wind \U0001F32C️ blows! Beyond", "ask": "Do you enter?", "state_updates": []}
+    assert json.loads(stream_turn(cid, output, chunk_size)) == output
+    assert partials(client, cid) == [
+        ("u1", "dm", "The gate opens."),
+        ("u1", "dm", "A cold wind \U0001F32C️ blows!"),
+        ("u1", "dm", "Beyond"),
+    ]
+
+
+def test_streaming_forwards_only_the_sentences_kept(client, campaign):
+    cid = campaign["id"]
+    output = {"say": "One. Two. Three. Four.", "ask": "Well?", "state_updates": []}
+    stream_turn(cid, output, 4, max_sentences=2)
+    assert [text for _, _, text in partials(client, cid)] == ["One.", "Two."]
+
+
+def test_unconfirmed_stream_publishes_nothing(client, campaign):
+    cid = campaign["id"]
+    output = {"say": "Never heard. At all.", "ask": "", "state_updates": []}
+    assert json.loads(stream_turn(cid, output, 5, confirm=False)) == output
+    assert partials(client, cid) == []
@@ -0,0 +1,53 @@
+import asyncio
+import random
+import httpx
+from runner import _Backoff
+from tests.conftest import make_runner
+
+HEADERS = {"X-ENGINE-KEY": "test-key"}
+
+
+def test_backoff_doubles_with_jitter_up_to_maximum():
+    random.seed(1)
+    backoff = _Backoff(1.0, 5.0)
+    delays = [backoff.next() for _ in range(6)]
+    for delay, ceiling in zip(delays, (1, 2, 4, 5, 5, 5)):
+        assert ceiling / 2 <= delay <= ceiling
+    backoff.reset()
+    assert 0.5 <= backoff.next() <= 1.0
+    # A maximum below the initial delay is raised to it.
+    assert _Backoff(2.0, 1.0).maximum == 2.0
+
+
+def test_wait_for_change_returns_the_new_version(client, campaign):
+    cid = campaign["id"]
+    version = client.get(f"/v1/campaigns/{cid}/version", headers=HEADERS).json()["version"]
+
+    async def scenario():
+        runner = make_runner()
+        try:
+            waiting = asyncio.create_task(runner.wait_for_change(cid, version))
+            await asyncio.sleep(0.05)
+            assert not waiting.done()
+            await runner.engine_post(cid, "/events", {
+                "actor_id": "human1", "event_type": "utterance", "content": "Hello?", "visibility": "public",
+            })
+            return await asyncio.wait_for(waiting, 2)
+        finally:
+            await runner.close()
+
+    assert asyncio.run(scenario()) > version
+
+
+def test_wait_for_change_falls_back_without_long_poll():
+    def old_engine(request):
+        return httpx.Response(404, json={"detail": "Not Found"})
+
+    async def scenario():
+        runner = make_runner(engine_transport=httpx.MockTransport(old_engine))
+        try:
+            return await runner.wait_for_change("c1", 0), runner.wake_on_change
+        finally:
+            await runner.close()
+
+    assert asyncio.run(scenario()) == (None, False)
@@ -0,0 +1,114 @@
+import json
+from typing import List
+import zstandard
+from pydantic import TypeAdapter
+from schemas import DirectorNextOut, EventOut, MemoryOut
+
+HEADERS = {"X-ENGINE-KEY": "test-key"}
+
+
+def test_fast_responses_match_response_models(client, campaign):
+    cid = campaign["id"]
+    client.post(
+        f"/v1/campaigns/{cid}/events",
+        json={"actor_id": "dm", "event_type": "utterance", "content": "You enter the keep.", "visibility": "public"},
+        headers=HEADERS,
+    )
+    client.post(
+        f"/v1/campaigns/{cid}/memory/write",
+        json={"actor_id": "dm", "scope": "world", "text": "The keep is ruined.", "tags": ["lore"]},
+        headers=HEADERS,
+    )
+
+    events = client.get(f"/v1/campaigns/{cid}/events", params={"viewer": "dm"}, headers=HEADERS).json()
+    memories = client.get(f"/v1/campaigns/{cid}/memory/read", params={"viewer": "dm"}, headers=HEADERS).json()
+    package = client.post(f"/v1/campaigns/{cid}/director/next", json={}, headers=HEADERS).json()
+
+    for adapter, payload in (
+        (TypeAdapter(List[EventOut]), events),
+        (TypeAdapter(List[MemoryOut]), memories),
+        (TypeAdapter(DirectorNextOut), package),
+    ):
+        assert adapter.dump_python(adapter.validate_python(payload), mode="json") == payload
+    assert memories[0]["tags"] == ["lore"]
+    assert package["visible_events"] == events
+
+
+def _seed(client, cid, n=20):
+    for i in range(n):
+        client.post(
+            f"/v1/campaigns/{cid}/events",
+            json={"actor_id": "human1", "event_type": "utterance", "content": f"I search room {i}.", "visibility": "public"},
+            headers=HEADERS,
+        )
+
+
+def test_fields_projection(client, campaign):
+    cid = campaign["id"]
+    _seed(client, cid, n=2)
+    client.post(
+        f"/v1/campaigns/{cid}/memory/write",
+        json={"actor_id": "dm", "scope": "world", "text": "The keep is ruined.", "tags": ["lore"]},
+        headers=HEADERS,
+    )
+
+    events = client.get(
+        f"/v1/campaigns/{cid}/events",
+        params={"viewer": "dm", "fields": "actor_id,content"},
+        headers=HEADERS,
+    ).json()
+    assert events == [{"actor_id": "human1", "content": "I search room 0."},
+                      {"actor_id": "human1", "content": "I search room 1."}]
+
+    memories = client.get(
+        f"/v1/campaigns/{cid}/memory/read",
+        params={"viewer": "dm", "fields": "text"},
+        headers=HEADERS,
+    ).json()
+    assert memories == [{"text": "The keep is ruined."}]
+
+    package = client.post(
+        f"/v1/campaigns/{cid}/director/next",
+        params={"fields": "should_act,visible_events.content,memories.*.text,viewer_state.actors.id"},
+        json={},
+        headers=HEADERS,
+    ).json()
+    assert package == {
+        "should_act": True,
+        "visible_events": [{"content": "I search room 0."}, {"content": "I search room 1."}],
+        "memories": {"world": [{"text": "The keep is ruined."}], "party": [], "private": []},
+        "viewer_state": {"actors": [{"id": "dm"}, {"id": "player1"}, {"id": "human1"}]},
+    }
+
+
+def test_unknown_field_rejected(client, campaign):
+    resp = client.get(
+        f"/v1/campaigns/{campaign['id']}/events",
+        params={"viewer": "dm", "fields": "id,secret"},
+        headers=HEADERS,
+    )
+    assert resp.status_code == 400
+
+
+def test_large_responses_compressed(client, campaign):
+    cid = campaign["id"]
+    _seed(client, cid)
+    url = f"/v1/campaigns/{cid}/events"
+
+    plain = client.get(url, params={"viewer": "dm"}, headers={**HEADERS, "Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+    gzipped = client.get(url, params={"viewer": "dm"}, headers={**HEADERS, "Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.json() == plain.json()
+
+    zstd = client.get(url, params={"viewer": "dm"}, headers={**HEADERS, "Accept-Encoding": "gzip, zstd"})
+    assert zstd.headers["content-encoding"] == "zstd"
+    assert int(zstd.headers["content-length"]) < len(plain.content)
+    assert json.loads(zstandard.ZstdDecompressor().decompress(zstd.content)) == plain.json()
+
+    small = client.get(
+        url, params={"viewer": "dm", "fields": "id", "after": plain.json()[-2]["id"]},
+        headers={**HEADERS, "Accept-Encoding": "gzip"},
+    )
+    assert "content-encoding" not in small.headers
@@ -0,0 +1,180 @@
+import asyncio
+import os
+import pytest
+from fastapi.testclient import TestClient
+from app import app
+from db import get_db, set_shard_router
+from sharding import ShardRouter, UnknownCampaignError
+
+HEADERS = {"X-ENGINE-KEY": "test-key"}
+ACTORS = [
+    {"id": "dm", "name": "DM", "actor_type": "dm", "is_ai": True},
+    {"id": "human1", "name": "Human 1", "actor_type": "human", "is_ai": False},
+]
+
+
+@pytest.fixture
+def shard_router(tmp_path):
+    router = ShardRouter(
+        f"sqlite:///{tmp_path / 'catalog.db'}",
+        str(tmp_path / "shards"),
+        max_open=1,
+        idle_seconds=300,
+    )
+    # Route through the real get_db instead of the shared test database.
+    override = app.dependency_overrides.pop(get_db)
+    set_shard_router(router)
+    yield router
+    set_shard_router(None)
+    app.dependency_overrides[get_db] = override
+    asyncio.run(router.close())
+
+
+def _create(client, name):
+    resp = client.post("/v1/campaigns", json={"name": name, "actors": ACTORS}, headers=HEADERS)
+    assert resp.status_code == 200
+    return resp.json()["id"]
+
+
+def _post(client, cid, content):
+    resp = client.post(
+        f"/v1/campaigns/{cid}/events",
+        json={"actor_id": "human1", "event_type": "utterance", "content": content, "visibility": "public"},
+        headers=HEADERS,
+    )
+    assert resp.status_code == 200
+
+
+def test_campaigns_get_their_own_database(shard_router, tmp_path):
+    client = TestClient(app)
+    first = _create(client, "First")
+    second = _create(client, "Second")
+    _post(client, first, "in first")
+    _post(client, second, "in second")
+
+    assert os.path.exists(tmp_path / "shards" / f"{first}.db")
+    assert os.path.exists(tmp_path / "shards" / f"{second}.db")
+    for cid, content in ((first, "in first"), (second, "in second")):
+        events = client.get(f"/v1/campaigns/{cid}/events", params={"viewer": "dm"}, headers=HEADERS).json()
+        assert [e["content"] for e in events] == [content]
+        state = client.get(f"/v1/campaigns/{cid}/state", params={"viewer": "dm"}, headers=HEADERS).json()
+        assert state["campaign_id"] == cid
+
+
+def test_unknown_campaign_is_404_without_creating_a_shard(shard_router, tmp_path):
+    client = TestClient(app)
+    resp = client.get("/v1/campaigns/nope/events", params={"viewer": "dm"}, headers=HEADERS)
+    assert resp.status_code == 404
+    assert not os.path.exists(tmp_path / "shards" / "nope.db")
+
+
+def test_lru_closes_shards_beyond_capacity(shard_router):
+    client = TestClient(app)
+    first = _create(client, "First")
+    second = _create(client, "Second")
+    assert shard_router.open_shards == 1
+
+    # Reopening an evicted shard finds the campaign again through the catalog.
+    _post(client, first, "after eviction")
+    events = client.get(f"/v1/campaigns/{first}/events", params={"viewer": "dm"}, headers=HEADERS).json()
+    assert [e["content"] for e in events] == ["after eviction"]
+    assert shard_router.open_shards == 1
+    assert second
+
+
+def test_idle_shards_are_evicted(tmp_path):
+    router = ShardRouter(f"sqlite:///{tmp_path / 'catalog.db'}", str(tmp_path / "shards"), idle_seconds=0)
+
+    async def scenario():
+        async with router.create("c1"):
+            pass
+        async with router.create("c2"):
+            pass
+        open_after = router.open_shards
+        with pytest.raises(UnknownCampaignError):
+            await router.acquire("missing")
+        await router.close()
+        return open_after
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_idle_shards_are_swept_without_new_requests(tmp_path):
+    router = ShardRouter(f"sqlite:///{tmp_path / 'catalog.db'}", str(tmp_path / "shards"), idle_seconds=0.1)
+
+    async def scenario():
+        router.start()
+        async with router.create("c1"):
+            pass
+        assert router.open_shards == 1
+        await asyncio.sleep(0.4)
+        open_after = router.open_shards
+        await router.close()
+        return open_after
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_opening_one_shard_does_not_block_others(tmp_path):
+    catalog_url = f"sqlite:///{tmp_path / 'catalog.db'}"
+    shard_dir = str(tmp_path / "shards")
+
+    async def seed():
+        router = ShardRouter(catalog_url, shard_dir)
+        for campaign_id in ("slow", "fast"):
+            async with router.create(campaign_id):
+                pass
+        await router.close()
+
+    asyncio.run(seed())
+    router = ShardRouter(catalog_url, shard_dir)
+    open_shard = router._open_shard
+    gate = asyncio.Event()
+
+    async def gated_open(url):
+        if url.endswith("slow.db"):
+            await gate.wait()
+        return await open_shard(url)
+
+    router._open_shard = gated_open
+
+    async def scenario():
+        slow = [asyncio.create_task(router.acquire("slow")) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        # The slow shard is still opening; another campaign goes straight through.
+        fast = await asyncio.wait_for(router.acquire("fast"), 2)
+        router.release(fast)
+        assert not any(task.done() for task in slow)
+        gate.set()
+        first, second = await asyncio.gather(*slow)
+        assert first is second and first.active == 2
+        router.release(first)
+        router.release(second)
+        await router.close()
+
+    asyncio.run(scenario())
+
+
+def test_failed_create_leaves_no_catalog_entry_or_shard(shard_router, tmp_path):
+    client = TestClient(app, raise_server_exceptions=False)
+    actors = ACTORS + [ACTORS[0]]
+    resp = client.post("/v1/campaigns", json={"name": "Broken", "actors": actors}, headers=HEADERS)
+    assert resp.status_code == 500
+
+    assert client.get("/v1/campaigns", headers=HEADERS).json() == []
+    assert os.listdir(tmp_path / "shards") == []
+    assert shard_router.open_shards == 0
+
+
+def test_list_campaigns_reads_the_catalog(shard_router):
+    client = TestClient(app)
+    first = _create(client, "First")
+    second = _create(client, "Second")
+    resp = client.get("/v1/campaigns", headers=HEADERS)
+    assert resp.status_code == 200
+    assert [c["id"] for c in resp.json()] == [first, second]
+
+
+def test_list_campaigns_without_shards(client, campaign):
+    ids = [c["id"] for c in client.get("/v1/campaigns", headers=HEADERS).json()]
+    assert campaign["id"] in ids
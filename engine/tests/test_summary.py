@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+from summarizer import ExtractiveSummarizer, set_summarizer
+from tests.test_director import create_campaign, director_next, post_event
+
+
+def event(actor_id, content, event_type="utterance"):
+    return SimpleNamespace(actor_id=actor_id, content=content, event_type=event_type)
+
+
+def test_extractive_summarizer_keeps_salient_and_recent_lines():
+    summarize = ExtractiveSummarizer(max_lines=3)
+    events = [
+        event("dm", "The dragon Vex guards the keep. It sleeps on gold."),
+        event("p1", "I check my boots."),
+        event("dm", "Vex stirs as the dragon smells smoke."),
+        event("dm", "Refocus.", event_type="system_refocus"),
+        event("p1", "I light a torch."),
+    ]
+    summary = summarize(None, events)
+    assert summary.splitlines() == [
+        "dm: The dragon Vex guards the keep.",
+        "dm: Vex stirs as the dragon smells smoke.",
+        "p1: I light a torch.",
+    ]
+    assert summarize(None, events) == summary
+    assert summarize(summary, []) == summary
+
+
+def test_director_returns_summary_of_delivered_events(client, campaign):
+    cid = campaign["id"]
+    post_event(client, cid, "dm", "public", "The gate creaks open.")
+    post_event(client, cid, "dm", "public", "A bat flutters past.")
+
+    first = director_next(client, cid)
+    assert first["summary"] is None
+    assert len(first["visible_events"]) == 2
+
+    post_event(client, cid, "dm", "public", "Torches gutter in the hall.")
+    second = director_next(client, cid)
+    assert [e["content"] for e in second["visible_events"]] == ["Torches gutter in the hall."]
+    assert second["summary"]["text"] == "dm: The gate creaks open.\ndm: A bat flutters past."
+    assert second["summary"]["event_count"] == 2
+    assert second["summary"]["first_event_id"] == first["visible_events"][0]["id"]
+    assert second["summary"]["last_event_id"] == first["visible_events"][-1]["id"]
+
+    third = director_next(client, cid)
+    assert third["summary"]["event_count"] == 3
+    assert third["summary"]["first_event_id"] == first["visible_events"][0]["id"]
+
+
+def test_summary_only_covers_events_visible_to_actor(client):
+    cid = create_campaign(client, [
+        {"id": "dm3", "name": "DM", "actor_type": "dm", "is_ai": True},
+        {"id": "p3", "name": "Ari", "actor_type": "player", "is_ai": False},
+        {"id": "p4", "name": "Bo", "actor_type": "player", "is_ai": False},
+    ])
+    client.post(f"/v1/campaigns/{cid}/turn/advance", headers={"X-ENGINE-KEY": "test-key"})
+    post_event(client, cid, "dm3", "private:p4", "Bo alone sees the rune.")
+    post_event(client, cid, "dm3", "party", "The party reaches the bridge.")
+    director_next(client, cid)
+    post_event(client, cid, "dm3", "party", "Wind howls.")
+
+    package = director_next(client, cid)
+    assert package["actor_id"] == "p3"
+    assert package["summary"]["text"] == "dm3: The party reaches the bridge."
+
+
+def test_custom_summarizer(client, campaign):
+    cid = campaign["id"]
+    set_summarizer(lambda previous, events: f"{len(events)} events")
+    try:
+        post_event(client, cid, "dm", "public", "one")
+        director_next(client, cid)
+        post_event(client, cid, "dm", "public", "two")
+        assert director_next(client, cid)["summary"]["text"] == "1 events"
+    finally:
+        set_summarizer(None)
@@ -1,4 +1,5 @@
 import pytest
+from config import settings
 
 
 def post_event(client, campaign_id, actor_id, content="event"):
@@ -96,3 +97,94 @@ def test_human_event_resets_streak(client, campaign):
     resp = advance_turn(client, cid)
 
     assert resp.json()["ai_only_streak"] == 0
+
+
+def claim(client, campaign_id, worker_id, action="claim"):
+    return client.post(
+        f"/v1/campaigns/{campaign_id}/director/{action}",
+        json={"worker_id": worker_id},
+        headers={"X-ENGINE-KEY": "test-key"},
+    )
+
+
+def version(client, campaign_id):
+    return client.get(f"/v1/campaigns/{campaign_id}/version", headers={"X-ENGINE-KEY": "test-key"}).json()["version"]
+
+
+def test_floor_claim_is_exclusive_until_released(client, campaign):
+    cid = campaign["id"]
+    before = version(client, cid)
+
+    resp = claim(client, cid, "worker-a")
+    assert resp.status_code == 200
+    assert resp.json()["worker_id"] == "worker-a"
+    assert resp.json()["lease_seconds"] == settings.FLOOR_LEASE_SECONDS
+
+    held = claim(client, cid, "worker-b")
+    assert held.status_code == 409
+    assert 1 <= int(held.headers["Retry-After"]) <= settings.FLOOR_LEASE_SECONDS
+
+    # Claiming again is the holder's heartbeat.
+    assert claim(client, cid, "worker-a").status_code == 200
+    # Leases are not game state: they leave the version (and the director cache) alone.
+    assert version(client, cid) == before
+
+    assert claim(client, cid, "worker-b", "release").json()["released"] is False
+    assert claim(client, cid, "worker-a", "release").json()["released"] is True
+    assert claim(client, cid, "worker-b").status_code == 200
+    assert claim(client, "missing", "worker-b").status_code == 404
+
+
+def test_expired_floor_lease_is_reclaimed(client, campaign, monkeypatch):
+    cid = campaign["id"]
+    assert claim(client, cid, "worker-a").status_code == 200
+    monkeypatch.setattr(settings, "FLOOR_LEASE_SECONDS", 0)
+    assert claim(client, cid, "worker-b").status_code == 200
+
+
+def test_act_is_fenced_by_the_floor(client, campaign):
+    cid = campaign["id"]
+    assert claim(client, cid, "worker-a").status_code == 200
+
+    def act(worker_id):
+        return client.post(
+            f"/v1/campaigns/{cid}/act",
+            json={"actor_id": "dm", "say": "The gate creaks.", "worker_id": worker_id},
+            headers={"X-ENGINE-KEY": "test-key"},
+        )
+
+    stale = act("worker-b")
+    assert stale.status_code == 409
+    assert "Retry-After" in stale.headers
+    assert act("worker-a").status_code == 200
+    # Without a worker id the act is not fenced, as before leases existed.
+    assert act(None).status_code == 200
+    events = client.get(f"/v1/campaigns/{cid}/events", params={"viewer": "dm"}, headers={"X-ENGINE-KEY": "test-key"}).json()
+    assert [e["content"] for e in events].count("The gate creaks.") == 2
+
+
+def test_director_and_advance_are_fenced_by_the_floor(client, campaign):
+    cid = campaign["id"]
+    headers = {"X-ENGINE-KEY": "test-key"}
+
+    def calls(worker_id):
+        fence = {"worker_id": worker_id} if worker_id else {}
+        return [
+            client.post(f"/v1/campaigns/{cid}/director/next", json=fence, headers=headers),
+            client.post(f"/v1/campaigns/{cid}/director/batch", json={"actor_ids": ["dm"], **fence}, headers=headers),
+            client.post(f"/v1/campaigns/{cid}/turn/advance", params=fence, headers=headers),
+        ]
+
+    # Nobody holds the floor yet: a worker id alone is not enough.
+    assert [r.status_code for r in calls("worker-a")] == [409, 409, 409]
+    assert claim(client, cid, "worker-a").status_code == 200
+    before = version(client, cid)
+    refused = calls("worker-b")
+    assert [r.status_code for r in refused] == [409, 409, 409]
+    assert all(1 <= int(r.headers["Retry-After"]) <= settings.FLOOR_LEASE_SECONDS for r in refused)
+    assert version(client, cid) == before
+
+    assert [r.status_code for r in calls("worker-a")] == [200, 200, 200]
+    # Without a worker id nothing is fenced, as before leases existed.
+    assert [r.status_code for r in calls(None)] == [200, 200, 200]
+    assert client.post("/v1/campaigns/missing/turn/advance", params={"worker_id": "worker-a"}, headers=headers).status_code == 404
@@ -0,0 +1,98 @@
+import asyncio
+import httpx
+from app import app
+from services.utterance_service import partial_utterances
+
+HEADERS = {"X-ENGINE-KEY": "test-key"}
+
+
+def partial(client, cid, utterance_id, text, actor_id="dm", visibility="party"):
+    return client.post(
+        f"/v1/campaigns/{cid}/utterances/partial",
+        json={"utterance_id": utterance_id, "actor_id": actor_id, "text": text, "visibility": visibility},
+        headers=HEADERS,
+    )
+
+
+def utterances(client, cid, viewer, after=0):
+    resp = client.get(f"/v1/campaigns/{cid}/utterances", params={"viewer": viewer, "after": after}, headers=HEADERS)
+    assert resp.status_code == 200
+    return resp.json()
+
+
+def test_partials_stream_then_act_finalizes(client, campaign):
+    cid = campaign["id"]
+    assert partial(client, cid, "u1", "The door creaks.").json()["seq"] == 1
+    partial(client, cid, "u1", "Something moves inside.")
+
+    chunks = utterances(client, cid, "human1")
+    assert [(c["seq"], c["text"], c["final"]) for c in chunks] == [
+        (1, "The door creaks.", False),
+        (2, "Something moves inside.", False),
+    ]
+
+    out = client.post(
+        f"/v1/campaigns/{cid}/act",
+        json={
+            "actor_id": "dm",
+            "say": "The door creaks. Something moves inside.",
+            "ask": "What do you do?",
+            "utterance_id": "u1",
+        },
+        headers=HEADERS,
+    ).json()
+    (final,) = utterances(client, cid, "human1", after=2)
+    assert final["final"] and final["event_id"] == out["event_id"]
+    assert final["text"] == "The door creaks. Something moves inside."
+
+    assert partial(client, cid, "u1", "Too late.").status_code == 409
+    assert partial(client, cid, "u2", "Who?", actor_id="ghost").status_code == 404
+
+
+def test_partials_follow_visibility(client, campaign):
+    cid = campaign["id"]
+    partial(client, cid, "secret", "Only the DM hears this.", visibility="dm_only")
+    partial(client, cid, "aside", "Psst.", actor_id="player1", visibility="private:human1")
+
+    assert utterances(client, cid, "player1") == []
+    assert [c["text"] for c in utterances(client, cid, "human1")] == ["Psst."]
+    assert [c["text"] for c in utterances(client, cid, "dm")] == ["Only the DM hears this.", "Psst."]
+
+
+def test_long_poll_wakes_on_new_chunk(campaign):
+    cid = campaign["id"]
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://engine") as client:
+            waiting = asyncio.create_task(client.get(
+                f"/v1/campaigns/{cid}/utterances",
+                params={"viewer": "human1", "wait": 5},
+                headers=HEADERS,
+            ))
+            await asyncio.sleep(0.05)
+            # Hidden from the waiter: it must keep waiting rather than return empty.
+            await client.post(
+                f"/v1/campaigns/{cid}/utterances/partial",
+                json={"utterance_id": "u", "actor_id": "dm", "text": "Hidden.", "visibility": "dm_only"},
+                headers=HEADERS,
+            )
+            await asyncio.sleep(0.05)
+            assert not waiting.done()
+            await client.post(
+                f"/v1/campaigns/{cid}/utterances/partial",
+                json={"utterance_id": "v", "actor_id": "dm", "text": "Listen.", "visibility": "party"},
+                headers=HEADERS,
+            )
+            return await asyncio.wait_for(waiting, 2)
+
+    resp = asyncio.run(scenario())
+    assert [c["text"] for c in resp.json()] == ["Listen."]
+
+
+def test_unknown_campaign_is_404_without_opening_a_channel(client):
+    before = len(partial_utterances._channels)
+    resp = client.get("/v1/campaigns/nope/utterances", params={"viewer": "dm", "wait": 1}, headers=HEADERS)
+    assert resp.status_code == 404
+    assert partial(client, "nope", "u1", "Hello?").status_code == 404
+    assert len(partial_utterances._channels) == before
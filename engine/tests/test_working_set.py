@@ -0,0 +1,167 @@
+import pytest
+from datetime import datetime, timedelta
+from schemas import DirectorNextRequest
+from services.director_service import build_director_batch, build_director_context
+from tests.conftest import run_in_session
+from working_set import CachedEvent, CampaignEntry, WorkingSet, load_entry, set_working_set
+
+HEADERS = {"X-ENGINE-KEY": "test-key"}
+
+
+@pytest.fixture
+def working_set():
+    working_set = WorkingSet(max_campaigns=8, max_events=4)
+    set_working_set(working_set)
+    yield working_set
+    set_working_set(None)
+
+
+def post_event(client, cid, actor_id, visibility, content):
+    resp = client.post(
+        f"/v1/campaigns/{cid}/events",
+        json={"actor_id": actor_id, "event_type": "utterance", "content": content, "visibility": visibility},
+        headers=HEADERS,
+    )
+    assert resp.status_code == 200
+    return resp.json()
+
+
+def snapshot(client, cid):
+    return {
+        viewer: (
+            client.get(f"/v1/campaigns/{cid}/events", params={"viewer": viewer}, headers=HEADERS).json(),
+            client.get(f"/v1/campaigns/{cid}/state", params={"viewer": viewer}, headers=HEADERS).json(),
+        )
+        for viewer in ("dm", "player1", "human1")
+    }
+
+
+def test_entry_keeps_ring_sorted_and_trimmed():
+    entry = CampaignEntry("c", "dm", 0, max_events=3)
+    start = datetime(2024, 1, 1)
+
+    def add(name, seconds):
+        entry.add_event(CachedEvent(name, "c", "dm", "utterance", name, "public", start + timedelta(seconds=seconds)))
+
+    add("a", 1)
+    add("c", 3)
+    add("b", 2)  # committed out of order
+    assert [e.id for e in entry.events] == ["a", "b", "c"]
+    assert entry.complete
+
+    add("d", 4)
+    add("old", 0)  # older than everything left in the ring
+    assert [e.id for e in entry.events] == ["b", "c", "d"]
+    assert set(entry.events_by_id) == {"b", "c", "d"}
+    assert not entry.complete
+    assert [e.id for e in entry.recent_events(2)] == ["d", "c"]
+
+
+def test_cached_reads_match_database(client, campaign, working_set):
+    cid = campaign["id"]
+    for visibility in ("public", "party", "dm_only", "private:player1"):
+        post_event(client, cid, "dm", visibility, f"{visibility} note")
+
+    cached = snapshot(client, cid)
+    assert working_set.stats()["hits"] > 0
+    set_working_set(None)
+    assert snapshot(client, cid) == cached
+
+
+def test_writes_update_loaded_entry(client, campaign, working_set):
+    cid = campaign["id"]
+    client.get(f"/v1/campaigns/{cid}/state", params={"viewer": "dm"}, headers=HEADERS)
+    assert working_set.loads == 1
+
+    post_event(client, cid, "human1", "public", "hello")
+    client.post(
+        f"/v1/campaigns/{cid}/mutate",
+        json={"actor_id": "dm", "mutations": [{"type": "hp_set", "payload": {"actor_id": "human1", "hp": 7}}]},
+        headers=HEADERS,
+    )
+    client.post(f"/v1/campaigns/{cid}/turn/advance", headers=HEADERS)
+
+    state = client.get(f"/v1/campaigns/{cid}/state", params={"viewer": "dm"}, headers=HEADERS).json()
+    assert working_set.loads == 1
+    assert state["visible_events_count"] == 1
+    assert state["state_kv"]["hp:human1"] == "7"
+    assert state["turn_owner"] != "dm"
+
+
+def test_failed_write_leaves_entry_untouched(client, campaign, working_set):
+    cid = campaign["id"]
+    client.get(f"/v1/campaigns/{cid}/state", params={"viewer": "dm"}, headers=HEADERS)
+    resp = client.post(
+        f"/v1/campaigns/{cid}/mutate",
+        json={"actor_id": "dm", "mutations": [
+            {"type": "hp_set", "payload": {"actor_id": "human1", "hp": 7}},
+            {"type": "bogus", "payload": {}},
+        ]},
+        headers=HEADERS,
+    )
+    assert resp.status_code == 400
+
+    state = client.get(f"/v1/campaigns/{cid}/state", params={"viewer": "dm"}, headers=HEADERS).json()
+    assert "hp:human1" not in state["state_kv"]
+
+
+def test_events_beyond_ring_fall_back_to_database(client, campaign, working_set):
+    cid = campaign["id"]
+    posted = [post_event(client, cid, "dm", "public", f"line {i}") for i in range(6)]
+
+    events = client.get(f"/v1/campaigns/{cid}/events", params={"viewer": "dm"}, headers=HEADERS).json()
+    assert [e["id"] for e in events] == [e["id"] for e in posted]
+
+    after = client.get(
+        f"/v1/campaigns/{cid}/events",
+        params={"viewer": "dm", "after": posted[3]["id"]},
+        headers=HEADERS,
+    ).json()
+    assert [e["id"] for e in after] == [e["id"] for e in posted[4:]]
+
+
+def test_director_context_matches_database(client, campaign, working_set):
+    cid = campaign["id"]
+    post_event(client, cid, "human1", "public", "I open the door")
+    post_event(client, cid, "dm", "private:dm", "A trap clicks")
+    body = DirectorNextRequest()
+
+    def both(db):
+        cached, _ = build_director_context(db, cid, body, load_entry(db, cid, working_set.max_events))
+        uncached, _ = build_director_context(db, cid, body)
+        return cached, uncached
+
+    cached, uncached = run_in_session(both)
+    assert cached["should_act"]
+    assert cached == uncached
+
+
+def test_director_batch_matches_database(client, campaign, working_set):
+    cid = campaign["id"]
+    post_event(client, cid, "human1", "public", "I open the door")
+    post_event(client, cid, "dm", "private:human1", "You hear a click")
+    body = DirectorNextRequest()
+    actor_ids = ["dm", "player1", "human1"]
+
+    def both(db):
+        cached = build_director_batch(db, cid, actor_ids, body, load_entry(db, cid, working_set.max_events))
+        return cached, build_director_batch(db, cid, actor_ids, body)
+
+    cached, uncached = run_in_session(both)
+    assert cached == uncached
+
+
+def test_lru_evicts_past_capacity(client, campaign, working_set):
+    working_set.max_campaigns = 1
+    other = client.post(
+        "/v1/campaigns",
+        json={"name": "Other", "actors": [{"id": "dm2", "name": "DM", "actor_type": "dm", "is_ai": True}]},
+        headers=HEADERS,
+    ).json()
+    for cid in (campaign["id"], other["id"]):
+        client.get(f"/v1/campaigns/{cid}/state", params={"viewer": "dm"}, headers=HEADERS)
+
+    metrics = client.get("/v1/metrics/working-set", headers=HEADERS).json()
+    assert metrics["enabled"] is True
+    assert metrics["campaigns"] == 1
+    assert metrics["evictions"] == 1
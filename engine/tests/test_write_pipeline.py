@@ -0,0 +1,90 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from sqlalchemy.orm import sessionmaker
+from db import init_db, make_async_engine, make_engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import Actor, Campaign, Event
+from schemas import EventCreate
+from services.event_service import append_event, append_event_async
+from write_pipeline import WritePipeline, register_write_pipeline, unregister_write_pipeline
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'pipeline.db'}")
+    init_db(engine)
+    db = sessionmaker(bind=engine)()
+    db.add(Campaign(id="c1", name="Pipeline", turn_owner="dm"))
+    db.add(Actor(id="dm", campaign_id="c1", name="DM", actor_type="dm", is_ai=True))
+    db.commit()
+    db.close()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def pipeline(file_engine):
+    pipeline = WritePipeline(file_engine, window_ms=20, max_batch=64)
+    pipeline.start()
+    yield pipeline
+    pipeline.stop()
+
+
+def _event(i):
+    return EventCreate(actor_id="dm", event_type="utterance", content=f"line {i}", visibility="public")
+
+
+def _count_events(engine):
+    db = sessionmaker(bind=engine)()
+    try:
+        return db.query(Event).count()
+    finally:
+        db.close()
+
+
+def test_concurrent_writes_are_group_committed(file_engine, pipeline):
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        futures = list(pool.map(lambda i: pipeline.submit(append_event, "c1", _event(i)), range(64)))
+    events = [f.result(timeout=5) for f in futures]
+
+    assert sorted(e.content for e in events) == sorted(f"line {i}" for i in range(64))
+    assert all(e.id and e.created_at for e in events)
+    assert _count_events(file_engine) == 64
+    assert pipeline.batches < 64
+    assert pipeline.mean_batch_size > 1
+
+
+def test_failing_write_only_fails_its_caller(file_engine, pipeline):
+    def boom(db):
+        db.add(Event(id="bad", campaign_id="c1", actor_id="dm", event_type="x", content="x", visibility="public"))
+        raise ValueError("boom")
+
+    ok_before = pipeline.submit(append_event, "c1", _event(1))
+    bad = pipeline.submit(boom)
+    ok_after = pipeline.submit(append_event, "c1", _event(2))
+
+    assert ok_before.result(timeout=5).content == "line 1"
+    assert ok_after.result(timeout=5).content == "line 2"
+    with pytest.raises(ValueError):
+        bad.result(timeout=5)
+    assert _count_events(file_engine) == 2
+
+
+def test_async_services_route_writes_through_pipeline(file_engine, pipeline):
+    async_engine = make_async_engine(file_engine.url.render_as_string(hide_password=False))
+
+    async def write():
+        async with AsyncSession(async_engine, expire_on_commit=False) as db:
+            return await append_event_async(db, "c1", _event(7))
+
+    register_write_pipeline(async_engine.sync_engine, pipeline)
+    try:
+        event = asyncio.run(write())
+    finally:
+        unregister_write_pipeline(async_engine.sync_engine)
+        asyncio.run(async_engine.dispose())
+
+    assert event.content == "line 7"
+    assert pipeline.writes == 1
+    assert _count_events(file_engine) == 1
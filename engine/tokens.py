@@ -0,0 +1,25 @@
+import re
+from functools import lru_cache
+from typing import Any
+import orjson
+
+# Words, numbers and single punctuation marks: roughly where BPE tokenizers
+# split. Long pieces cost an extra token per six characters.
+_PIECE = re.compile(r"\w+|[^\w\s]")
+_CHARS_PER_EXTRA_TOKEN = 6
+
+
+@lru_cache(maxsize=65536)
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of ``text``, erring on the high side.
+
+    Local models do not expose their tokenizer to the engine, so this is a
+    heuristic; results are cached because packages re-send the same events and
+    memories on every tick.
+    """
+    return sum(1 + (len(piece) - 1) // _CHARS_PER_EXTRA_TOKEN for piece in _PIECE.findall(text))
+
+
+def json_tokens(value: Any) -> int:
+    """Approximate tokens of ``value`` as it appears serialized in a prompt."""
+    return estimate_tokens(orjson.dumps(value).decode())
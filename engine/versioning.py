@@ -0,0 +1,130 @@
+import asyncio
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, Optional, Set, Tuple
+from sqlalchemy import event as sa_event, insert, select, update
+from sqlalchemy.orm import Session
+from db import upsert_statement
+from models import Actor, ActorCursor, Campaign, CampaignVersion, Event, Memory, Roll, StateKV
+from working_set import note_change
+
+# Rows whose creation, change or deletion moves their campaign's version.
+_VERSIONED = (Event, Memory, Actor, StateKV, Roll, ActorCursor)
+_CHANGED_KEY = "versioning_changed"
+
+
+class VersionWaiters:
+    """Wakes long-polls parked on a campaign once a commit moves its version.
+
+    Only commits made by this process are seen; a waiter still re-reads the
+    version from the database now and then for writes made elsewhere. Commits
+    can land on the write pipeline's thread, so waiters are woken through their
+    own event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters: Dict[str, Set[asyncio.Future]] = {}
+
+    @contextmanager
+    def watch(self, campaign_id: str) -> Iterator[asyncio.Future]:
+        """A future resolved by the next commit that moves ``campaign_id``.
+
+        Enter it before reading the version, so a commit landing between the
+        read and the wait is not missed.
+        """
+        future = asyncio.get_running_loop().create_future()
+        with self._lock:
+            self._waiters.setdefault(campaign_id, set()).add(future)
+        try:
+            yield future
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(campaign_id)
+                if waiters is not None:
+                    waiters.discard(future)
+                    if not waiters:
+                        del self._waiters[campaign_id]
+
+    def notify(self, campaign_ids: Iterable[str]) -> None:
+        with self._lock:
+            futures = [f for cid in campaign_ids for f in self._waiters.pop(cid, ())]
+        for future in futures:
+            future.get_loop().call_soon_threadsafe(_wake, future)
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+version_waiters = VersionWaiters()
+
+
+def campaign_head(db: Session, campaign_id: str) -> Optional[Tuple[int, str]]:
+    """``(version, turn_owner)`` in one query, or None if the campaign does not exist."""
+    row = db.execute(
+        select(CampaignVersion.version, Campaign.turn_owner)
+        .select_from(Campaign)
+        .outerjoin(CampaignVersion, CampaignVersion.campaign_id == Campaign.id)
+        .where(Campaign.id == campaign_id)
+    ).first()
+    if row is None:
+        return None
+    return row.version or 0, row.turn_owner
+
+
+def touch(db: Session, campaign_id: str) -> None:
+    """Bump the campaign's version for a write made outside the ORM unit of work (e.g. an upsert)."""
+    _bump(db, [campaign_id])
+
+
+def _bump(db: Session, campaign_ids: Iterable[str]) -> None:
+    dialect = db.get_bind().dialect.name
+    campaign_ids = list(campaign_ids)
+    for campaign_id in campaign_ids:
+        stmt = upsert_statement(
+            dialect,
+            CampaignVersion,
+            {"campaign_id": campaign_id, "version": 1},
+            conflict_cols=["campaign_id"],
+            update_values={"version": CampaignVersion.version + 1},
+        )
+        if stmt is not None:
+            db.execute(stmt)
+        elif db.execute(
+            update(CampaignVersion)
+            .where(CampaignVersion.campaign_id == campaign_id)
+            .values(version=CampaignVersion.version + 1)
+        ).rowcount == 0:
+            db.execute(insert(CampaignVersion).values(campaign_id=campaign_id, version=1))
+        note_change(db, "version", campaign_id, None)
+    db.info.setdefault(_CHANGED_KEY, set()).update(campaign_ids)
+
+
+@sa_event.listens_for(Session, "before_flush")
+def _bump_changed_campaigns(session: Session, flush_context, instances) -> None:
+    # A campaign inserted in this flush starts at version 0 (and has no row to
+    # reference yet), so only existing campaigns are bumped.
+    created = {obj.id for obj in session.new if isinstance(obj, Campaign)}
+    campaign_ids = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, _VERSIONED):
+            campaign_ids.add(obj.campaign_id)
+        elif isinstance(obj, Campaign):
+            campaign_ids.add(obj.id)
+    campaign_ids -= created
+    if campaign_ids:
+        _bump(session, sorted(campaign_ids))
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _notify_waiters(session: Session) -> None:
+    changed = session.info.pop(_CHANGED_KEY, None)
+    if changed:
+        version_waiters.notify(changed)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _drop_changes(session: Session) -> None:
+    session.info.pop(_CHANGED_KEY, None)
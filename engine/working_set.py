@@ -0,0 +1,365 @@
+import bisect
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from itertools import islice
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from sqlalchemy import event as sa_event, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from models import Actor, ActorCursor, Campaign, CampaignVersion, Event, StateKV
+
+_PENDING_KEY = "working_set_pending"
+_ROW_OVERHEAD = 200  # rough per-row cost of a cached record, in bytes
+
+
+class CachedEvent:
+    __slots__ = ("id", "campaign_id", "actor_id", "event_type", "content", "visibility", "created_at")
+
+    def __init__(self, id, campaign_id, actor_id, event_type, content, visibility, created_at):
+        self.id = id
+        self.campaign_id = campaign_id
+        self.actor_id = actor_id
+        self.event_type = event_type
+        self.content = content
+        self.visibility = visibility
+        self.created_at = created_at
+
+    @classmethod
+    def from_row(cls, row) -> "CachedEvent":
+        return cls(row.id, row.campaign_id, row.actor_id, row.event_type, row.content, row.visibility, row.created_at)
+
+    def size(self) -> int:
+        return _ROW_OVERHEAD + len(self.content or "")
+
+
+class CachedActor:
+    __slots__ = ("id", "campaign_id", "name", "actor_type", "is_ai")
+
+    def __init__(self, id, campaign_id, name, actor_type, is_ai):
+        self.id = id
+        self.campaign_id = campaign_id
+        self.name = name
+        self.actor_type = actor_type
+        self.is_ai = is_ai
+
+    @classmethod
+    def from_row(cls, row) -> "CachedActor":
+        return cls(row.id, row.campaign_id, row.name, row.actor_type, bool(row.is_ai))
+
+
+class CampaignEntry:
+    """Hot state of one campaign: turn state, roster, state KV, cursors and recent events.
+
+    ``events`` is sorted by ``created_at`` and holds at most ``max_events``;
+    ``complete`` stays true while it still holds the campaign's entire history.
+    Writes are applied from whichever thread commits, so readers take ``lock``
+    (the accessors below already do).
+    """
+
+    def __init__(self, campaign_id: str, turn_owner: str, ai_only_streak: int, max_events: int, version: int = 0):
+        self.campaign_id = campaign_id
+        self.version = version
+        self.turn_owner = turn_owner
+        self.ai_only_streak = ai_only_streak
+        self.max_events = max_events
+        self.actors: Dict[str, CachedActor] = {}
+        self.state_kv: Dict[str, str] = {}
+        self.cursors: Dict[str, Optional[str]] = {}
+        self.events: Deque[CachedEvent] = deque(maxlen=max_events)
+        self.events_by_id: Dict[str, CachedEvent] = {}
+        self.complete = True
+        self.visibility_counts: Counter = Counter()
+        self.last_event_by_actor: Dict[str, CachedEvent] = {}
+        self.last_used = time.monotonic()
+        self.nbytes = _ROW_OVERHEAD
+        self.lock = threading.RLock()
+
+    def set_kv(self, key: str, value: str) -> None:
+        previous = self.state_kv.get(key)
+        self.nbytes += len(value) - (len(previous) if previous is not None else -len(key) - _ROW_OVERHEAD)
+        self.state_kv[key] = value
+
+    def add_event(self, event: CachedEvent, count: bool = True) -> None:
+        if event.id in self.events_by_id:
+            return
+        if count:
+            self.visibility_counts[event.visibility] += 1
+        latest = self.last_event_by_actor.get(event.actor_id)
+        if latest is None or latest.created_at <= event.created_at:
+            self.last_event_by_actor[event.actor_id] = event
+        if len(self.events) >= self.max_events:
+            self.complete = False
+            if not self.events or event.created_at < self.events[0].created_at:
+                return  # older than the whole ring: it would be trimmed straight away
+            dropped = self.events.popleft()
+            del self.events_by_id[dropped.id]
+            self.nbytes -= dropped.size()
+        # Events almost always arrive newest; only out-of-order commits pay for the insort.
+        if not self.events or self.events[-1].created_at <= event.created_at:
+            self.events.append(event)
+        else:
+            bisect.insort(self.events, event, key=lambda e: e.created_at)
+        self.events_by_id[event.id] = event
+        self.nbytes += event.size()
+
+    def recent_events(self, limit: int) -> Optional[List[CachedEvent]]:
+        """Newest-first, or None if the ring cannot prove it holds the last ``limit`` events."""
+        with self.lock:
+            if len(self.events) < limit and not self.complete:
+                return None
+            return list(islice(reversed(self.events), limit))
+
+    def events_after(self, after_event_id: Optional[str]) -> Optional[List[CachedEvent]]:
+        """Events ordered by ``created_at``, as ``list_events`` would see them, or None on a miss."""
+        with self.lock:
+            if after_event_id is None:
+                return list(self.events) if self.complete else None
+            after = self.events_by_id.get(after_event_id)
+            if after is None:
+                return None
+            return [e for e in self.events if e.created_at > after.created_at]
+
+    def latest_event_by(self, actor_ids) -> Optional[CachedEvent]:
+        with self.lock:
+            candidates = [self.last_event_by_actor[a] for a in actor_ids if a in self.last_event_by_actor]
+        return max(candidates, key=lambda e: e.created_at, default=None)
+
+    def snapshot(self) -> Tuple[str, int, List[CachedActor], Dict[str, str], Dict[str, int]]:
+        """``(turn_owner, ai_only_streak, actors, state_kv, visibility_counts)`` as of now."""
+        with self.lock:
+            return (
+                self.turn_owner,
+                self.ai_only_streak,
+                list(self.actors.values()),
+                dict(self.state_kv),
+                dict(self.visibility_counts),
+            )
+
+
+class WorkingSet:
+    """In-memory cache of hot campaigns, kept current by write-through session hooks.
+
+    Entries are evicted least-recently-used first when there are more than
+    ``max_campaigns`` or their estimated size exceeds ``max_bytes``, and after
+    ``ttl_seconds`` without a read. Writes only reach the cache from this process,
+    so it must not be enabled when several engine replicas share a database.
+    """
+
+    def __init__(self, max_campaigns: int = 128, max_events: int = 500, max_bytes: int = 64 * 1024 * 1024,
+                 ttl_seconds: float = 600):
+        self.max_campaigns = max_campaigns
+        self.max_events = max_events
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, CampaignEntry]" = OrderedDict()
+        self._write_seq: Counter = Counter()
+        self._lock = threading.RLock()
+        # A miss is a read that had to load the campaign from the database.
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, campaign_id: str) -> Optional[CampaignEntry]:
+        with self._lock:
+            self._expire()
+            entry = self._entries.get(campaign_id)
+            if entry is None:
+                return None
+            entry.last_used = time.monotonic()
+            self._entries.move_to_end(campaign_id)
+            return entry
+
+    def write_seq(self, campaign_id: str) -> int:
+        with self._lock:
+            return self._write_seq[campaign_id]
+
+    def install(self, entry: CampaignEntry, seq: int) -> bool:
+        """Cache a freshly loaded entry unless a write landed while it was loading."""
+        with self._lock:
+            if self._write_seq[entry.campaign_id] != seq:
+                return False
+            self.loads += 1
+            self._entries[entry.campaign_id] = entry
+            self._entries.move_to_end(entry.campaign_id)
+            self._shrink()
+            return True
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._write_seq.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "campaigns": len(self._entries),
+                "approx_bytes": self._total_bytes(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }
+
+    def apply(self, changes: List[tuple]) -> None:
+        """Apply committed changes captured by the session hooks."""
+        with self._lock:
+            for kind, campaign_id, data in changes:
+                self._write_seq[campaign_id] += 1
+                entry = self._entries.get(campaign_id)
+                if entry is None:
+                    continue
+                with entry.lock:
+                    if kind == "event":
+                        entry.add_event(data)
+                    elif kind == "campaign":
+                        entry.turn_owner, entry.ai_only_streak = data
+                    elif kind == "actor":
+                        entry.actors[data.id] = data
+                    elif kind == "kv":
+                        entry.set_kv(*data)
+                    elif kind == "cursor":
+                        actor_id, last_seen_event_id = data
+                        entry.cursors[actor_id] = last_seen_event_id
+                    elif kind == "version":
+                        entry.version += 1
+            self._shrink()
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl_seconds
+        for campaign_id in [cid for cid, e in self._entries.items() if e.last_used < cutoff]:
+            del self._entries[campaign_id]
+            self.evictions += 1
+
+    def _shrink(self) -> None:
+        while len(self._entries) > self.max_campaigns:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        while len(self._entries) > 1 and self._total_bytes() > self.max_bytes:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _total_bytes(self) -> int:
+        return sum(e.nbytes for e in self._entries.values())
+
+
+_working_set: Optional[WorkingSet] = None
+
+
+def get_working_set() -> Optional[WorkingSet]:
+    return _working_set
+
+
+def set_working_set(working_set: Optional[WorkingSet]) -> None:
+    global _working_set
+    _working_set = working_set
+
+
+def load_entry(db: Session, campaign_id: str, max_events: int) -> Optional[CampaignEntry]:
+    campaign = db.query(Campaign).filter(Campaign.id == campaign_id).first()
+    if campaign is None:
+        return None
+    version = db.query(CampaignVersion.version).filter(CampaignVersion.campaign_id == campaign_id).scalar()
+    entry = CampaignEntry(campaign_id, campaign.turn_owner, campaign.ai_only_streak, max_events, version or 0)
+    for actor in db.query(Actor).filter(Actor.campaign_id == campaign_id).all():
+        entry.actors[actor.id] = CachedActor.from_row(actor)
+    for row in db.query(StateKV).filter(StateKV.campaign_id == campaign_id).all():
+        entry.set_kv(row.key, row.value)
+    for row in db.query(ActorCursor).filter(ActorCursor.campaign_id == campaign_id).all():
+        entry.cursors[row.actor_id] = row.last_seen_event_id
+    entry.visibility_counts.update(dict(
+        db.query(Event.visibility, func.count(Event.id))
+        .filter(Event.campaign_id == campaign_id)
+        .group_by(Event.visibility)
+        .all()
+    ))
+
+    recent = (
+        db.query(Event)
+        .filter(Event.campaign_id == campaign_id)
+        .order_by(Event.created_at.desc())
+        .limit(max_events + 1)
+        .all()
+    )
+    # Each actor's latest event, which may be older than the ring.
+    latest = (
+        db.query(Event.actor_id, func.max(Event.created_at).label("created_at"))
+        .filter(Event.campaign_id == campaign_id)
+        .group_by(Event.actor_id)
+        .subquery()
+    )
+    for row in db.query(Event).join(
+        latest,
+        (Event.actor_id == latest.c.actor_id) & (Event.created_at == latest.c.created_at),
+    ).filter(Event.campaign_id == campaign_id):
+        entry.last_event_by_actor[row.actor_id] = CachedEvent.from_row(row)
+
+    for row in reversed(recent[:max_events]):
+        entry.add_event(CachedEvent.from_row(row), count=False)
+    entry.complete = len(recent) <= max_events
+    return entry
+
+
+async def get_entry(db: AsyncSession, campaign_id: str) -> Optional[CampaignEntry]:
+    """The campaign's cached entry, loading it on a miss; None if caching is off or it does not exist."""
+    working_set = get_working_set()
+    if working_set is None:
+        return None
+    if db.sync_session.info.get(_PENDING_KEY):
+        # This request has uncommitted writes: it must read them back from the
+        # database, and must not install them in the shared cache before commit.
+        return None
+    entry = working_set.get(campaign_id)
+    working_set.record(hit=entry is not None)
+    if entry is not None:
+        return entry
+    seq = working_set.write_seq(campaign_id)
+    entry = await db.run_sync(load_entry, campaign_id, working_set.max_events)
+    if entry is not None:
+        working_set.install(entry, seq)
+    return entry
+
+
+def note_change(db: Session, kind: str, campaign_id: str, data) -> None:
+    """Record a write made outside the ORM unit of work (e.g. an upsert) for the cache."""
+    if _working_set is not None:
+        db.info.setdefault(_PENDING_KEY, []).append((kind, campaign_id, data))
+
+
+@sa_event.listens_for(Session, "after_flush")
+def _collect_changes(session: Session, flush_context) -> None:
+    if _working_set is None:
+        return
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    for obj in session.new:
+        if isinstance(obj, Event):
+            pending.append(("event", obj.campaign_id, CachedEvent.from_row(obj)))
+        elif isinstance(obj, Actor):
+            pending.append(("actor", obj.campaign_id, CachedActor.from_row(obj)))
+        elif isinstance(obj, Campaign):
+            pending.append(("campaign", obj.id, (obj.turn_owner, obj.ai_only_streak)))
+    for obj in session.dirty:
+        if isinstance(obj, Campaign):
+            pending.append(("campaign", obj.id, (obj.turn_owner, obj.ai_only_streak)))
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _apply_changes(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending and _working_set is not None:
+        _working_set.apply(pending)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
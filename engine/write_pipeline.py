@@ -0,0 +1,189 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+
+_STOP = object()
+
+
+class _BatchSession(Session):
+    """Session handed to queued writes: their commit() only flushes, the pipeline commits the batch."""
+
+    def commit(self) -> None:
+        self.flush()
+
+
+@dataclass
+class _Job:
+    fn: Callable[..., Any]
+    args: Tuple[Any, ...]
+    future: Future = field(default_factory=Future)
+
+
+class WritePipeline:
+    """Single writer thread that group-commits queued writes.
+
+    Each job is a service function ``fn(session, *args)``. The writer takes the
+    first queued job, keeps collecting for up to ``window_ms`` (or ``max_batch``
+    jobs), runs them all in one transaction and commits once, then resolves each
+    caller's future with its function's return value. If any job raises, the
+    batch is rolled back and its jobs are replayed one transaction each, so a
+    failing write only fails its own caller.
+    """
+
+    def __init__(self, bind, window_ms: float = 2.0, max_batch: int = 256):
+        self._session_factory = sessionmaker(
+            bind=bind,
+            class_=_BatchSession,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+        self._window = window_ms / 1000
+        self._max_batch = max_batch
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self.batches = 0
+        self.writes = 0
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="write-pipeline", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, fn: Callable[..., Any], *args) -> Future:
+        job = _Job(fn, args)
+        self._queue.put(job)
+        return job.future
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.writes / self.batches if self.batches else 0.0
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            stopping = False
+            deadline = time.monotonic() + self._window
+            while len(batch) < self._max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    job = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is _STOP:
+                    stopping = True
+                    break
+                batch.append(job)
+
+            self._commit_batch(batch)
+            if stopping:
+                return
+
+    def _commit_batch(self, batch: List[_Job]) -> None:
+        # Callers that were cancelled while queued are dropped here.
+        batch = [job for job in batch if job.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        self.batches += 1
+        self.writes += len(batch)
+
+        db = self._session_factory()
+        try:
+            results = [job.fn(db, *job.args) for job in batch]
+            Session.commit(db)
+        except Exception as exc:
+            db.rollback()
+            if len(batch) == 1:
+                batch[0].future.set_exception(exc)
+            else:
+                for job in batch:
+                    self._run_alone(job)
+            return
+        finally:
+            db.close()
+        for job, result in zip(batch, results):
+            job.future.set_result(result)
+
+    def _run_alone(self, job: _Job) -> None:
+        db = self._session_factory()
+        try:
+            result = job.fn(db, *job.args)
+            Session.commit(db)
+        except Exception as exc:
+            db.rollback()
+            job.future.set_exception(exc)
+        else:
+            job.future.set_result(result)
+        finally:
+            db.close()
+
+
+# Pipelines keyed by the engine that request sessions are bound to (an
+# AsyncEngine's ``sync_engine``), so each database has its own writer.
+_pipelines: Dict[Engine, WritePipeline] = {}
+
+
+def get_write_pipeline(bind: Engine) -> Optional[WritePipeline]:
+    return _pipelines.get(bind)
+
+
+def register_write_pipeline(bind: Engine, pipeline: WritePipeline) -> None:
+    _pipelines[bind] = pipeline
+
+
+def unregister_write_pipeline(bind: Engine) -> Optional[WritePipeline]:
+    return _pipelines.pop(bind, None)
+
+
+async def run_write(db: AsyncSession, fn: Callable[..., Any], *args) -> Any:
+    """Run the write ``fn(session, *args)`` through the database's pipeline if it has one, else on ``db``."""
+    pipeline = get_write_pipeline(db.bind.sync_engine) if _pipelines else None
+    if pipeline is None:
+        return await db.run_sync(fn, *args)
+    return await pipeline.run(fn, *args)
+
+
+_ON_COMMIT_KEY = "on_commit"
+
+
+def on_commit(db: AsyncSession, fn: Callable[[], Any]) -> None:
+    """Call ``fn`` once the request's writes are durable.
+
+    Writes that went through the pipeline are already committed, so ``fn`` runs
+    now; otherwise it runs when ``db`` commits at the end of the request (see
+    ``db.get_db``), and never if the request rolls back.
+    """
+    if _pipelines and get_write_pipeline(db.bind.sync_engine) is not None:
+        fn()
+    else:
+        db.sync_session.info.setdefault(_ON_COMMIT_KEY, []).append(fn)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_on_commit(session: Session) -> None:
+    for fn in session.info.pop(_ON_COMMIT_KEY, []):
+        fn()
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_on_commit(session: Session) -> None:
+    session.info.pop(_ON_COMMIT_KEY, None)
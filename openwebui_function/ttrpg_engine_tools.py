@@ -21,6 +21,16 @@ MODEL_TO_ACTOR: dict[str, str] = {
     "llama3": "player2",
 }
 
+# Fields requested from the engine: what the model reads, plus ids needed for paging.
+EVENT_FIELDS = "id,actor_id,event_type,content,visibility"
+MEMORY_FIELDS = "actor_id,scope,text,tags"
+DIRECTOR_FIELDS = (
+    "should_act,actor_id,actor_role,reason,constraints,"
+    "viewer_state.turn_owner,viewer_state.actors,viewer_state.state_kv,summary.text,"
+    "visible_events.actor_id,visible_events.event_type,visible_events.content,"
+    "memories.*.text,memories.*.tags"
+)
+
 
 # ── OpenWebUI Function Class ──────────────────────────────────────────────────
 
@@ -82,12 +92,13 @@ class Tools:
         except Exception as exc:
             return json.dumps({"error": str(exc)})
 
-    def _post(self, path: str, body: dict) -> str:
+    def _post(self, path: str, body: dict, params: dict | None = None) -> str:
         try:
             with httpx.Client(timeout=10) as client:
                 resp = client.post(
                     f"{self._base()}{path}",
                     headers=self._h(),
+                    params=params or {},
                     json=body,
                 )
                 resp.raise_for_status()
@@ -117,7 +128,7 @@ class Tools:
         :param after: Event ID to paginate from (optional).
         :return: JSON array of events.
         """
-        params: dict[str, str] = {"viewer": viewer or self._actor(__model__)}
+        params: dict[str, str] = {"viewer": viewer or self._actor(__model__), "fields": EVENT_FIELDS}
         if after:
             params["after"] = after
         return self._get("/events", params=params)
@@ -180,6 +191,7 @@ class Tools:
         return self._post(
             "/director/next",
             {"max_events": max_events, "max_memories": max_memories, "actor_id": self._actor(__model__)},
+            params={"fields": DIRECTOR_FIELDS},
         )
 
     def memory_write(self, scope: str, text: str, tags: list[str] | None = None, __model__: Any = None) -> str:
@@ -206,7 +218,7 @@ class Tools:
         :param scope: Optional scope filter — public, party, private, world, dm_only.
         :return: JSON array of memory entries.
         """
-        params: dict[str, str] = {"viewer": self._actor(__model__)}
+        params: dict[str, str] = {"viewer": self._actor(__model__), "fields": MEMORY_FIELDS}
         if scope:
             params["scope"] = scope
         return self._get("/memory/read", params=params)
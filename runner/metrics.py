@@ -0,0 +1,188 @@
+"""
+Per-phase latency histograms for the runner.
+
+Each (campaign, role, phase) gets an HDR-style histogram: values are kept in
+log-linear buckets with a fixed relative precision, so memory stays bounded
+however long the runner lives and percentiles stay within that precision
+from microseconds to minutes. Phases:
+
+    director    /director/next, and the director build inside /act
+    prefetch    /director/batch for the predicted next actor (pipeline mode)
+    model       a model call that produced valid output
+    json_retry  a model call whose output was not valid JSON
+    model_error a model call that failed outright
+    apply       /act, less the advance and director time the engine reports
+    advance     the turn advance inside /act (from its Server-Timing header)
+    tick        a whole tick that acted
+"""
+import asyncio
+import json
+import math
+import time
+
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+class Histogram:
+    """Latency histogram with ``significant_digits`` of relative precision (values in seconds)."""
+
+    def __init__(self, significant_digits: int = 2):
+        # Sub-buckets per power of two, enough to tell apart values 10**-digits apart.
+        self.sub_bucket_bits = math.ceil(math.log2(2 * 10 ** significant_digits))
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def _index(self, micros: int) -> int:
+        shift = max(0, micros.bit_length() - self.sub_bucket_bits)
+        return (shift << self.sub_bucket_bits) | (micros >> shift)
+
+    def _value(self, index: int) -> float:
+        # The middle of the bucket's range, in seconds.
+        shift, sub = index >> self.sub_bucket_bits, index & ((1 << self.sub_bucket_bits) - 1)
+        return ((sub << shift) + ((1 << shift) - 1) / 2) / 1e6
+
+    def record(self, seconds: float):
+        index = self._index(max(0, round(seconds * 1e6)))
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def merge(self, other: "Histogram"):
+        for index, n in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + n
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(max(self._value(index), self.min), self.max)
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "min_ms": round(self.min * 1000, 3) if self.count else 0.0,
+            **{f"p{round(q * 100)}_ms": round(self.quantile(q) * 1000, 3) for q in QUANTILES},
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class PhaseMetrics:
+    """Histograms keyed on ``(campaign, role, phase)``; only touched from the event loop."""
+
+    def __init__(self, significant_digits: int = 2):
+        self.significant_digits = significant_digits
+        self.histograms: dict[tuple[str, str, str], Histogram] = {}
+        self.started = time.time()
+
+    def record(self, campaign_id: str, role: str | None, phase: str, seconds: float):
+        key = (campaign_id, role or "none", phase)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(self.significant_digits)
+        histogram.record(seconds)
+
+    def by_role(self) -> dict[tuple[str, str], Histogram]:
+        """Every campaign's histograms merged per ``(role, phase)``."""
+        merged: dict[tuple[str, str], Histogram] = {}
+        for (_, role, phase), histogram in self.histograms.items():
+            merged.setdefault((role, phase), Histogram(self.significant_digits)).merge(histogram)
+        return merged
+
+    def summary_lines(self) -> list[str]:
+        lines = []
+        for (role, phase), histogram in sorted(self.by_role().items()):
+            snap = histogram.snapshot()
+            lines.append(
+                f"{phase:<11} {role:<7} n={snap['count']:<6} p50 {snap['p50_ms']:.1f} ms  "
+                f"p95 {snap['p95_ms']:.1f} ms  p99 {snap['p99_ms']:.1f} ms  max {snap['max_ms']:.1f} ms"
+            )
+        return lines
+
+    def report(self) -> dict:
+        """JSON timing report: every histogram per campaign, and merged per role."""
+        return {
+            "seconds": round(time.time() - self.started, 3),
+            "by_role": [
+                {"role": role, "phase": phase, **histogram.snapshot()}
+                for (role, phase), histogram in sorted(self.by_role().items())
+            ],
+            "by_campaign": [
+                {"campaign_id": campaign_id, "role": role, "phase": phase, **histogram.snapshot()}
+                for (campaign_id, role, phase), histogram in sorted(self.histograms.items())
+            ],
+        }
+
+    def prometheus_text(self) -> str:
+        """Prometheus text exposition: one summary per histogram, in seconds."""
+        lines = [
+            "# HELP runner_phase_seconds Time spent per turn phase.",
+            "# TYPE runner_phase_seconds summary",
+        ]
+        for (campaign_id, role, phase), histogram in sorted(self.histograms.items()):
+            labels = f'campaign="{_escape(campaign_id)}",role="{_escape(role)}",phase="{phase}"'
+            for q in QUANTILES:
+                lines.append(f'runner_phase_seconds{{{labels},quantile="{q}"}} {histogram.quantile(q):.6f}')
+            lines.append(f"runner_phase_seconds_sum{{{labels}}} {histogram.total:.6f}")
+            lines.append(f"runner_phase_seconds_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def parse_server_timing(header: str | None) -> dict[str, float]:
+    """Seconds per metric from a ``Server-Timing`` header (``name;dur=<ms>, ...``)."""
+    timings = {}
+    for entry in (header or "").split(","):
+        name, *params = [part.strip() for part in entry.split(";")]
+        for param in params:
+            key, _, value = param.partition("=")
+            if name and key == "dur":
+                try:
+                    timings[name] = float(value) / 1000
+                except ValueError:
+                    pass
+    return timings
+
+
+async def serve_metrics(metrics: PhaseMetrics, host: str, port: int) -> asyncio.AbstractServer:
+    """Serve ``GET /metrics`` (Prometheus text) and ``GET /report`` (JSON) from the event loop."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            path = request_line.split()[1].decode() if len(request_line.split()) > 1 else ""
+            if path == "/metrics":
+                status, content_type, body = "200 OK", "text/plain; version=0.0.4", metrics.prometheus_text()
+            elif path == "/report":
+                status, content_type, body = "200 OK", "application/json", json.dumps(metrics.report())
+            else:
+                status, content_type, body = "404 Not Found", "text/plain", "not found\n"
+            data = body.encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode("ascii") + data
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
@@ -0,0 +1,115 @@
+import json
+import os
+
+# Memories of these scopes change on most turns (players keep a private
+# thought every turn), so they are rendered with the volatile state.
+_VOLATILE_MEMORY_SCOPES = ("party", "private")
+
+
+def common_prefix(a: str, b: str) -> int:
+    """Length of the longest common prefix of ``a`` and ``b``."""
+    return len(os.path.commonprefix((a, b)))
+
+
+def _event_line(event: dict) -> str:
+    kind = event.get("event_type") or "utterance"
+    prefix = "" if kind == "utterance" else f"[{kind}] "
+    return f"{prefix}{event.get('actor_id')}: {event.get('content') or ''}"
+
+
+def _memory_lines(memories: list[dict]) -> list[str]:
+    # The director lists memories oldest first, so additions land at the end.
+    return [f"- {m.get('text')}" for m in memories or []]
+
+
+class _History:
+    def __init__(self, archived_summary: str | None):
+        self.archived_summary = archived_summary
+        self.lines: list[str] = []
+
+
+class PromptBuilder:
+    """Lays out model prompts so that consecutive turns share the longest prefix.
+
+    Local inference servers (llama.cpp, Ollama) keep the KV cache of a slot's
+    last prompt and only process the tokens after the first difference. The
+    prompt is therefore ordered from most to least stable:
+
+    1. system text and the output schema (fixed per role),
+    2. the cast, world memories and the archived summary,
+    3. the actor's event history, which only ever grows,
+    4. volatile state: party/private memories, state, constraints, reason.
+
+    The director only sends events the actor has not seen yet, so each actor's
+    history is kept here and appended to. When it outgrows ``max_history_events``
+    the older half is dropped and the director's current summary becomes the new
+    archived summary, which shifts the prefix once instead of on every turn.
+    """
+
+    def __init__(self, max_history_events: int = 200):
+        self.max_history_events = max_history_events
+        self._histories: dict[tuple[str, str], _History] = {}
+        self._pending: dict[tuple[str, str], _History] = {}
+        self._previous: dict[tuple[str, str], str] = {}
+
+    def build(self, campaign_id: str, actor_id: str, actor_role: str, director: dict, schema: dict,
+              speculative: bool = False) -> tuple[list[dict], float]:
+        """Chat messages for the actor's turn and the share of the prompt reused from its last one.
+
+        A ``speculative`` build leaves the actor's history as it was until
+        ``accept``; ``discard`` forgets it.
+        """
+        key = (campaign_id, actor_id)
+        summary = (director.get("summary") or {}).get("text")
+        current = self._histories.get(key)
+        history = _History(current.archived_summary if current else summary)
+        history.lines = (current.lines if current else []) + [_event_line(e) for e in director.get("visible_events") or []]
+        if len(history.lines) > self.max_history_events:
+            del history.lines[: len(history.lines) - self.max_history_events // 2]
+            history.archived_summary = summary
+        if speculative:
+            self._pending[key] = history
+        else:
+            self._histories[key] = history
+
+        system = (
+            f"You are actor '{actor_id}' with role '{actor_role}'. "
+            "Return only valid JSON matching this schema:\n"
+            + json.dumps(schema, sort_keys=True)
+        )
+        viewer_state = director.get("viewer_state") or {}
+        memories = director.get("memories") or {}
+        cast = [
+            f"- {a.get('id')} ({a.get('actor_type')}{', ai' if a.get('is_ai') else ''})"
+            for a in sorted(viewer_state.get("actors") or [], key=lambda a: str(a.get("id")))
+        ]
+        sections = [
+            ("Cast", cast),
+            ("World", _memory_lines(memories.get("world"))),
+            ("Story so far", [history.archived_summary] if history.archived_summary else []),
+            ("Events", history.lines),
+        ]
+        sections += [(scope.capitalize() + " memories", _memory_lines(memories.get(scope))) for scope in _VOLATILE_MEMORY_SCOPES]
+        situation = {
+            "turn_owner": viewer_state.get("turn_owner"),
+            "reason": director.get("reason"),
+            "constraints": director.get("constraints") or {},
+            "state": viewer_state.get("state_kv") or {},
+        }
+        sections.append(("Now", [json.dumps(situation, sort_keys=True)]))
+        user = "\n\n".join(f"{title}:\n" + "\n".join(lines) for title, lines in sections if lines)
+
+        prompt = system + "\n" + user
+        previous = self._previous.get(key)
+        self._previous[key] = prompt
+        reuse = common_prefix(previous, prompt) / len(prompt) if previous else 0.0
+        return [{"role": "system", "content": system}, {"role": "user", "content": user}], reuse
+
+    def accept(self, campaign_id: str, actor_id: str) -> None:
+        """Keep the actor's speculative build: its events join the history."""
+        history = self._pending.pop((campaign_id, actor_id), None)
+        if history is not None:
+            self._histories[(campaign_id, actor_id)] = history
+
+    def discard(self, campaign_id: str, actor_id: str) -> None:
+        self._pending.pop((campaign_id, actor_id), None)
@@ -1,44 +1,99 @@
 import argparse
+import asyncio
+import contextvars
 import json
 import os
+import random
 import re
+import socket
 import time
-from urllib import request
-from urllib.error import HTTPError, URLError
+import uuid
+import httpx
+from metrics import PhaseMetrics, parse_server_timing, serve_metrics
+from prompt import PromptBuilder
 
 
 ENGINE_URL = os.getenv("ENGINE_URL", "http://localhost:8088")
 ENGINE_KEY = os.getenv("ENGINE_KEY", "dev-secret-key")
 CAMPAIGN_ID = os.getenv("CAMPAIGN_ID", "")
+# Comma-separated campaigns for one process to drive (in addition to CAMPAIGN_ID).
+CAMPAIGN_IDS = os.getenv("CAMPAIGN_IDS", "")
 OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "http://localhost:11434/v1")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "ollama")
 DM_MODEL = os.getenv("DM_MODEL", "llama3")
 PLAYER_MODEL = os.getenv("PLAYER_MODEL", "llama3")
 POLL_SECONDS = float(os.getenv("POLL_SECONDS", "1.0"))
+# Between ticks the watch loop long-polls the campaign's version for up to
+# WAKE_WAIT_SECONDS (0 disables it). Without that channel, idle polls back off
+# exponentially, with jitter, from POLL_SECONDS up to IDLE_POLL_MAX_SECONDS.
+WAKE_WAIT_SECONDS = float(os.getenv("WAKE_WAIT_SECONDS", "25"))
+IDLE_POLL_MAX_SECONDS = float(os.getenv("IDLE_POLL_MAX_SECONDS", "30"))
+# How often --discover asks the engine for new campaigns.
+DISCOVER_SECONDS = float(os.getenv("DISCOVER_SECONDS", "30"))
+# Model calls in flight across all campaigns; match the model server's parallel
+# slots (e.g. OLLAMA_NUM_PARALLEL) so requests queue here, not there.
+MODEL_CONCURRENCY = int(os.getenv("MODEL_CONCURRENCY", "4"))
+# Pooled keep-alive connections. Keep HTTP_KEEPALIVE_SECONDS below the servers'
+# idle timeouts (uvicorn closes idle connections after 5s) so a reused
+# connection is rarely one the server has already dropped.
+ENGINE_POOL_SIZE = int(os.getenv("ENGINE_POOL_SIZE", "20"))
+# 0 sizes the model pool to the model concurrency.
+MODEL_POOL_SIZE = int(os.getenv("MODEL_POOL_SIZE", "0"))
+HTTP_KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "4"))
+HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+ENGINE_TIMEOUT_SECONDS = float(os.getenv("ENGINE_TIMEOUT_SECONDS", "30"))
+MODEL_TIMEOUT_SECONDS = float(os.getenv("MODEL_TIMEOUT_SECONDS", "30"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+# Stream completions and forward each finished sentence of "say" to the
+# engine's partial-utterance channel while the model is still generating.
+MODEL_STREAM = os.getenv("MODEL_STREAM", "1") == "1"
+UTTERANCE_VISIBILITY = "party"
+# "prefix" orders the prompt for the model server's prefix cache (see
+# prompt.PromptBuilder); "json" sends the raw director package as before.
+PROMPT_LAYOUT = os.getenv("PROMPT_LAYOUT", "prefix")
+# Events of each actor's history kept in its prompt.
+RUNNER_HISTORY_EVENTS = int(os.getenv("RUNNER_HISTORY_EVENTS", "200"))
 RUNNER_MAX_EVENTS = int(os.getenv("RUNNER_MAX_EVENTS", "50"))
 RUNNER_MAX_MEMORIES = int(os.getenv("RUNNER_MAX_MEMORIES", "30"))
+# Token budget for each director package; 0 leaves it to the count limits.
+RUNNER_MAX_TOKENS = int(os.getenv("RUNNER_MAX_TOKENS", "0")) or None
 MAX_AUTO_TURNS_PER_TICK = int(os.getenv("MAX_AUTO_TURNS_PER_TICK", "2"))
+# Start the next actor's model call while the previous /act is still being
+# posted, from a prefetched director package (see Runner.tick).
+RUNNER_PIPELINE = os.getenv("RUNNER_PIPELINE", "0") == "1"
+# Serve per-phase latency histograms on 127.0.0.1:RUNNER_METRICS_PORT/metrics
+# (0 disables it), and print a summary every METRICS_SUMMARY_SECONDS (0 never).
+RUNNER_METRICS_PORT = int(os.getenv("RUNNER_METRICS_PORT", "0"))
+METRICS_SUMMARY_SECONDS = float(os.getenv("METRICS_SUMMARY_SECONDS", "60"))
+# Claim each campaign's floor before driving it, so several runner processes can
+# share campaigns without two of them playing the same turn (see Runner.hold_floor).
+RUNNER_FLOOR_LEASE = os.getenv("RUNNER_FLOOR_LEASE", "1") == "1"
+RUNNER_WORKER_ID = os.getenv("RUNNER_WORKER_ID", "") or f"{socket.gethostname()}-{os.getpid()}"
+# A held floor is kept through this many idle seconds, so a table that pauses for
+# a human keeps its worker (and the prompt history that worker built).
+RUNNER_FLOOR_IDLE_SECONDS = float(os.getenv("RUNNER_FLOOR_IDLE_SECONDS", "60"))
 MAX_MODEL_JSON_RETRIES = 2
 DM_REFOCUS_ASK_FALLBACK = "What do you do next?"
-
-
-def _post_json(url: str, body: dict, headers: dict | None = None) -> dict:
-    req = request.Request(
-        url,
-        data=json.dumps(body).encode("utf-8"),
-        headers={"Content-Type": "application/json", **(headers or {})},
-        method="POST",
-    )
-    with request.urlopen(req, timeout=30) as resp:
-        return json.loads(resp.read().decode("utf-8"))
-
-
-def _engine_post(path: str, body: dict) -> dict:
-    return _post_json(
-        f"{ENGINE_URL}/v1/campaigns/{CAMPAIGN_ID}{path}",
-        body,
-        headers={"X-ENGINE-KEY": ENGINE_KEY},
-    )
+# Only what the runner reads or forwards into the model prompt.
+DIRECTOR_FIELDS = ",".join([
+    "should_act",
+    "actor_id",
+    "actor_role",
+    "reason",
+    "constraints",
+    "viewer_state.turn_owner",
+    "viewer_state.actors",
+    "viewer_state.state_kv",
+    "summary.text",
+    "visible_events.id",
+    "visible_events.actor_id",
+    "visible_events.event_type",
+    "visible_events.content",
+    "memories.*.text",
+])
+DIRECTOR_REQUEST = {"max_events": RUNNER_MAX_EVENTS, "max_memories": RUNNER_MAX_MEMORIES, "max_tokens": RUNNER_MAX_TOKENS}
+ACT_FIELDS = ",".join(["event_id", "turn"] + [f"director.{name}" for name in DIRECTOR_FIELDS.split(",")])
+BATCH_FIELDS = ",".join(f"packages.{name}" for name in DIRECTOR_FIELDS.split(","))
 
 
 def _schema_for_role(actor_role: str) -> dict:
@@ -71,31 +126,6 @@ def _schema_for_role(actor_role: str) -> dict:
     }
 
 
-def _call_model(actor_id: str, actor_role: str, director_payload: dict) -> dict:
-    model = DM_MODEL if actor_role == "dm" else PLAYER_MODEL
-    system_prompt = (
-        f"You are actor '{actor_id}' with role '{actor_role}'. "
-        "Return only valid JSON matching the provided schema."
-    )
-    completion = _post_json(
-        f"{OPENAI_BASE_URL}/chat/completions",
-        {
-            "model": model,
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": json.dumps(director_payload)},
-            ],
-            "response_format": {
-                "type": "json_schema",
-                "json_schema": _schema_for_role(actor_role),
-            },
-        },
-        headers={"Authorization": f"Bearer {OPENAI_API_KEY}"},
-    )
-    content = completion["choices"][0]["message"]["content"]
-    return json.loads(content)
-
-
 def _shorten_text(text: str, max_sentences: int = 2) -> str:
     if not text:
         return ""
@@ -115,18 +145,6 @@ def _enforce_dm_constraints(model_output: dict, director_payload: dict) -> dict:
     return output
 
 
-def _log_runner_error(message: str):
-    _engine_post(
-        "/events",
-        {
-            "actor_id": "system",
-            "event_type": "runner_error",
-            "content": message,
-            "visibility": "public",
-        },
-    )
-
-
 def _last_visible_event_actor_id(director_payload: dict) -> str:
     visible_events = director_payload.get("visible_events") or []
     if not visible_events:
@@ -139,89 +157,1029 @@ def _is_actor_ai(actor_id: str, director_payload: dict) -> bool:
     return any(a.get("id") == actor_id and a.get("is_ai") for a in actors)
 
 
-def _apply_actor_output(actor_id: str, actor_role: str, model_output: dict):
-    say = (model_output.get("say") or "").strip()
-    if say:
-        _engine_post(
-            "/events",
-            {
-                "actor_id": actor_id,
-                "event_type": "utterance",
-                "content": say,
-                "visibility": "party",
-            },
+def _stop_reason(director_payload: dict) -> str | None:
+    """Why the tick must not play the director's actor, or None if it may."""
+    if not director_payload.get("should_act"):
+        return f"should_act=false reason={director_payload.get('reason', 'unknown')}"
+    actor_id = director_payload.get("actor_id")
+    if not actor_id:
+        return "no actor_id in director response"
+    if (
+        _is_actor_ai(actor_id, director_payload)
+        and _is_actor_ai(_last_visible_event_actor_id(director_payload), director_payload)
+        and director_payload.get("reason") != "turn_owner"
+    ):
+        return f"ai-to-ai safety guard triggered for actor '{actor_id}'"
+    return None
+
+
+def _predicted_next_actor(director_payload: dict) -> str | None:
+    """The actor the engine's turn advance will pick after the director's actor.
+
+    Mirrors ``advance_turn``: DMs first, then everyone else, each by id.
+    """
+    actors = sorted((director_payload.get("viewer_state") or {}).get("actors") or [], key=lambda a: str(a.get("id")))
+    order = [a["id"] for a in actors if a.get("actor_type") == "dm"] + [a["id"] for a in actors if a.get("actor_type") != "dm"]
+    current = director_payload.get("actor_id")
+    if current not in order or len(order) < 2:
+        return None
+    return order[(order.index(current) + 1) % len(order)]
+
+
+def _package_after(package: dict, act_body: dict, actor_role: str) -> dict:
+    """``package``, prefetched before ``act_body`` landed, as it will read once the act lands and the turn passes.
+
+    The line being spoken has no event id yet; ``_Ahead.settle`` fills it in.
+    """
+    events = list(package.get("visible_events") or [])
+    spoken = act_body["say"]
+    if spoken:
+        events.append({"id": None, "actor_id": act_body["actor_id"], "event_type": "utterance", "content": spoken})
+    viewer_state = {**(package.get("viewer_state") or {}), "turn_owner": package.get("actor_id")}
+    memories = package.get("memories") or {}
+    if act_body["think"] and actor_role != "dm" and package.get("actor_role") == "dm":
+        # A player's thought is a private memory, which the DM reads (unless the
+        # engine sets DM_OMNISCIENT_PRIVATE=0; the turn is then discarded). Groups
+        # list the oldest first and keep the first max_memories.
+        private = [*memories.get("private", []), {"text": act_body["think"]}][:RUNNER_MAX_MEMORIES]
+        memories = {**memories, "private": private}
+    return {**package, "viewer_state": viewer_state, "visible_events": events, "memories": memories}
+
+
+def _prompt_inputs(package: dict, with_state: bool = True) -> tuple:
+    """The parts of a director package that decide the actor's turn (see ``PromptBuilder.build``).
+
+    Summaries are left out: the prompt only reads one when the history is trimmed.
+    """
+    viewer_state = package.get("viewer_state") or {}
+    memories = package.get("memories") or {}
+    return (
+        package.get("should_act"),
+        package.get("actor_id"),
+        package.get("actor_role"),
+        package.get("reason"),
+        [(e.get("id"), e.get("actor_id"), e.get("event_type"), e.get("content")) for e in package.get("visible_events") or []],
+        package.get("constraints") or {},
+        sorted((str(a.get("id")), a.get("actor_type"), bool(a.get("is_ai"))) for a in viewer_state.get("actors") or []),
+        viewer_state.get("turn_owner"),
+        (viewer_state.get("state_kv") or {}) if with_state else None,
+        {scope: [m.get("text") for m in group or []] for scope, group in memories.items()},
+    )
+
+
+# The request never reached the server, so any call can be retried.
+_UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+# The connection dropped mid-request (typically a stale keep-alive connection);
+# the server may already have acted, so only idempotent calls are retried.
+_RESET_ERRORS = (httpx.RemoteProtocolError, httpx.ReadError, httpx.WriteError)
+
+
+class _ModelFailed(Exception):
+    """The model gave no usable output for a turn, after retries."""
+
+
+class TickStats:
+    """Where one tick's time went: engine calls, model calls, connects and retries."""
+
+    def __init__(self):
+        self.engine_calls = 0
+        self.engine_seconds = 0.0
+        self.model_calls = 0
+        self.model_seconds = 0.0
+        self.connects = 0
+        self.retries = 0
+        # Turns started before the previous /act landed, and how many were thrown away.
+        self.ahead_kept = 0
+        self.ahead_discarded = 0
+        # From the start of the model call to the first sentence reaching the engine.
+        self.first_sentence_seconds: float | None = None
+        # Share of each prompt identical to the actor's previous one, and the
+        # prompt tokens the model server reported serving from its cache.
+        self.prefix_reuse: list[float] = []
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+
+    def record_usage(self, usage: dict | None):
+        cached = ((usage or {}).get("prompt_tokens_details") or {}).get("cached_tokens")
+        if cached is not None:
+            self.prompt_tokens += usage.get("prompt_tokens") or 0
+            self.cached_tokens += cached
+
+    def record(self, kind: str, seconds: float):
+        if kind == "model":
+            self.model_calls += 1
+            self.model_seconds += seconds
+        else:
+            self.engine_calls += 1
+            self.engine_seconds += seconds
+
+    async def trace(self, event_name: str, info: dict):
+        # httpcore's request trace: one connect_tcp per connection not taken from the pool.
+        if event_name == "connection.connect_tcp.complete":
+            self.connects += 1
+
+    def summary(self) -> str:
+        return (
+            f"engine {self.engine_calls} call(s) {self.engine_seconds * 1000:.1f} ms, "
+            f"model {self.model_calls} call(s) {self.model_seconds * 1000:.1f} ms, "
+            f"{self.connects} new connection(s), {self.retries} retries"
+            + (f", ahead {self.ahead_kept} kept {self.ahead_discarded} discarded" if self.ahead_kept or self.ahead_discarded else "")
+            + (f", first sentence {self.first_sentence_seconds * 1000:.1f} ms" if self.first_sentence_seconds is not None else "")
+            + (f", prefix reuse {sum(self.prefix_reuse) / len(self.prefix_reuse):.0%}" if self.prefix_reuse else "")
+            + (f", server cache {self.cached_tokens / self.prompt_tokens:.0%}" if self.prompt_tokens else "")
         )
 
-    if actor_role != "dm":
-        think = (model_output.get("think") or "").strip()
-        if think:
-            _engine_post(
-                "/memory/write",
-                {
-                    "actor_id": actor_id,
-                    "scope": "private",
-                    "text": think,
-                    "tags": [],
-                },
-            )
+
+class _Backoff:
+    """Exponential backoff with jitter: each delay doubles, up to ``maximum``."""
+
+    def __init__(self, initial: float, maximum: float):
+        self.initial = initial
+        self.maximum = max(initial, maximum)
+        self.delay = initial
+
+    def reset(self):
+        self.delay = self.initial
+
+    def next(self) -> float:
+        # Half fixed, half random, so idle campaigns drift apart instead of polling in lockstep.
+        delay = random.uniform(self.delay / 2, self.delay)
+        self.delay = min(self.delay * 2, self.maximum)
+        return delay
+
+
+# Stats of the tick running in the current task, if any.
+_tick_stats: contextvars.ContextVar[TickStats | None] = contextvars.ContextVar("tick_stats", default=None)
+
+
+class _SayStream:
+    """Pulls the top-level ``"say"`` string out of a JSON object as it streams in.
+
+    ``feed`` takes raw completion text and returns the newly decoded characters
+    of the ``say`` value, so speech can start before the object is complete.
+    """
+
+    _ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+    def __init__(self, key: str = "say"):
+        self.key = key
+        self.done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape: str | None = None
+        # The high half of a \uXXXX surrogate pair, until its low half is decoded.
+        self._high: str | None = None
+        self._token: list[str] = []
+        self._last_key: str | None = None
+        self._in_value = False
+        self._capturing = False
+
+    def feed(self, chunk: str) -> str:
+        out = []
+        for ch in chunk:
+            if self._in_string:
+                if self._escape is not None:
+                    if self._escape == "" and ch != "u":
+                        decoded = self._ESCAPES.get(ch, ch)
+                    else:
+                        self._escape += ch
+                        if len(self._escape) < 5:  # "u" plus four hex digits
+                            continue
+                        decoded = chr(int(self._escape[1:], 16))
+                    self._escape = None
+                elif ch == "\\":
+                    self._escape = ""
+                    continue
+                elif ch == '"':
+                    if self._high is not None:
+                        self._token.append(self._high)
+                        if self._capturing:
+                            out.append(self._high)
+                        self._high = None
+                    self._in_string = False
+                    self._end_string()
+                    continue
+                else:
+                    decoded = ch
+                if self._high is not None:
+                    high, self._high = self._high, None
+                    if "\udc00" <= decoded <= "\udfff":
+                        decoded = chr(0x10000 + ((ord(high) - 0xD800) << 10) + ord(decoded) - 0xDC00)
+                    else:
+                        decoded = high + decoded  # unpaired, kept as json.loads keeps it
+                elif "\ud800" <= decoded <= "\udbff":
+                    self._high = decoded
+                    continue
+                self._token.append(decoded)
+                if self._capturing:
+                    out.append(decoded)
+            elif ch == '"':
+                self._in_string = True
+                self._token = []
+                self._capturing = self._depth == 1 and self._in_value and self._last_key == self.key
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+            elif self._depth == 1 and ch == ":":
+                self._in_value = True
+            elif self._depth == 1 and ch == ",":
+                self._in_value = False
+                self._last_key = None
+        return "".join(out)
+
+    def _end_string(self):
+        if self._capturing:
+            self._capturing = False
+            self.done = True
+        elif self._depth == 1 and not self._in_value:
+            self._last_key = "".join(self._token)
+
+
+class _Sentences:
+    """Buffers streamed text and hands back each sentence once it is complete."""
+
+    _END = re.compile(r"[.!?]+[\"')\]]*\s+")
+
+    def __init__(self):
+        self._buffer = ""
+
+    def feed(self, text: str) -> list[str]:
+        self._buffer += text
+        sentences = []
+        while True:
+            match = self._END.search(self._buffer)
+            if match is None:
+                return sentences
+            sentence = self._buffer[:match.end()].strip()
+            self._buffer = self._buffer[match.end():]
+            if sentence:
+                sentences.append(sentence)
+
+    def flush(self) -> list[str]:
+        rest, self._buffer = self._buffer.strip(), ""
+        return [rest] if rest else []
+
+
+class _PartialForwarder:
+    """Posts streamed sentences to the engine's partial-utterance channel, in order.
+
+    Posting runs in its own task so the token loop never waits on the engine.
+    ``max_sentences`` mirrors the shortening ``_enforce_dm_constraints`` applies
+    to the final line, so nothing is spoken that the turn will not keep. With
+    ``confirmed``, sentences are held until it resolves, and dropped if it
+    resolves to False.
+    """
+
+    def __init__(self, runner: "Runner", campaign_id: str, actor_id: str, utterance_id: str,
+                 max_sentences: int | None, started: float, confirmed: asyncio.Future | None = None):
+        self.runner = runner
+        self.campaign_id = campaign_id
+        self.actor_id = actor_id
+        self.utterance_id = utterance_id
+        self.max_sentences = max_sentences
+        self.started = started
+        self.confirmed = confirmed
+        self.queued = 0
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.task = asyncio.create_task(self._run())
+
+    def put(self, sentences: list[str]):
+        for sentence in sentences:
+            if self.max_sentences is not None and self.queued >= self.max_sentences:
+                return
+            self.queue.put_nowait(sentence)
+            self.queued += 1
+
+    async def close(self):
+        self.queue.put_nowait(None)
+        await self.task
+
+    async def _run(self):
+        stats = _tick_stats.get()
+        if self.confirmed is not None and not await self.confirmed:
+            return
+        while (sentence := await self.queue.get()) is not None:
+            try:
+                await self.runner.engine_post(self.campaign_id, "/utterances/partial", {
+                    "utterance_id": self.utterance_id,
+                    "actor_id": self.actor_id,
+                    "text": sentence,
+                    "visibility": UTTERANCE_VISIBILITY,
+                })
+            except httpx.HTTPError as exc:
+                # A preview only: the final line still lands through /act.
+                self.runner.log(self.campaign_id, f"partial utterance dropped: {exc}")
+                continue
+            if stats and stats.first_sentence_seconds is None:
+                stats.first_sentence_seconds = time.perf_counter() - self.started
+
+
+def _spoken_sentence_limit(actor_role: str, director_payload: dict) -> int | None:
+    constraints = director_payload.get("constraints") or {}
+    return 2 if actor_role == "dm" and constraints.get("must_ask_question") else None
+
+
+def _actor_output_body(actor_id: str, model_output: dict, next_director: bool, utterance_id: str | None = None) -> dict:
+    """The ``/act`` body applying the whole model output and advancing the turn.
+
+    The engine applies the role rules itself (only players keep ``think``, only
+    the DM mutates state). With ``next_director`` the response also carries the
+    next director package, saving the following ``/director/next`` round trip.
+    """
+    # The engine always advances the turn, so empty model output cannot stall an actor.
+    body = {
+        "actor_id": actor_id,
+        "say": (model_output.get("say") or "").strip(),
+        "think": (model_output.get("think") or "").strip(),
+        "ask": (model_output.get("ask") or "").strip(),
+        "state_updates": model_output.get("state_updates") or [],
+        "visibility": UTTERANCE_VISIBILITY,
+    }
+    if utterance_id:
+        body["utterance_id"] = utterance_id
+    if next_director:
+        body["director"] = DIRECTOR_REQUEST
     else:
-        state_updates = model_output.get("state_updates") or []
-        if state_updates:
-            _engine_post("/mutate", {"actor_id": actor_id, "mutations": state_updates})
+        # The next tick's director call will follow; have the engine start on it.
+        body["precompute"] = True
+    return body
+
+
+class _Ahead:
+    """A turn started before the previous actor's ``/act`` landed (see ``Runner.tick``)."""
+
+    def __init__(self, runner: "Runner", campaign_id: str, director: dict, generation: asyncio.Task,
+                 confirmed: asyncio.Future, state_updated: bool = False):
+        self.runner = runner
+        self.campaign_id = campaign_id
+        self.director = director
+        self.generation = generation
+        self.confirmed = confirmed
+        # The act being applied writes state the early turn could not see; its
+        # spoken line, which the turn did see, is what tells of it.
+        self.state_updated = state_updated
+
+    def settle(self, director: dict | None, event_id: str | None = None,
+               why: str = "the next package changed") -> bool:
+        """Keep the turn if ``director``, the real package, prompts the actor as the one it started from.
+
+        ``event_id`` is the id the act's spoken line was stored under.
+        """
+        keep = False
+        if director is not None:
+            predicted = dict(self.director, visible_events=[
+                {**e, "id": event_id} if e.get("id") is None else e for e in self.director.get("visible_events") or []
+            ])
+            with_state = not self.state_updated
+            keep = _prompt_inputs(director, with_state) == _prompt_inputs(predicted, with_state)
+        actor_id = self.director["actor_id"]
+        stats = _tick_stats.get()
+        self.confirmed.set_result(keep)
+        if keep:
+            self.runner.prompts.accept(self.campaign_id, actor_id)
+        else:
+            self.runner.prompts.discard(self.campaign_id, actor_id)
+            self.generation.cancel()
+            self.runner.log(self.campaign_id, f"discarded early turn for actor '{actor_id}': {why}")
+        if stats:
+            if keep:
+                stats.ahead_kept += 1
+            else:
+                stats.ahead_discarded += 1
+        return keep
+
+
+class Runner:
+    """Drives the tick loops of any number of campaigns from one event loop.
+
+    Each campaign's loop is an asyncio task. Engine calls share one pooled HTTP
+    client and model calls another, and at most ``model_concurrency`` model calls
+    are in flight across all campaigns, so one process can host hundreds of
+    mostly idle tables.
+    """
+
+    def __init__(self, model_concurrency: int = MODEL_CONCURRENCY, tag_campaigns: bool = False,
+                 pipeline: bool = RUNNER_PIPELINE, worker_id: str = RUNNER_WORKER_ID,
+                 floor_lease: bool = RUNNER_FLOOR_LEASE, floor_idle: float = RUNNER_FLOOR_IDLE_SECONDS):
+        self.engine = httpx.AsyncClient(
+            base_url=ENGINE_URL,
+            headers={"X-ENGINE-KEY": ENGINE_KEY},
+            timeout=httpx.Timeout(ENGINE_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS),
+            limits=_pool_limits(ENGINE_POOL_SIZE),
+        )
+        self.model = httpx.AsyncClient(
+            headers={"Authorization": f"Bearer {OPENAI_API_KEY}"},
+            timeout=httpx.Timeout(MODEL_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS),
+            limits=_pool_limits(MODEL_POOL_SIZE or model_concurrency),
+        )
+        # One parked long-poll per idle campaign, so this pool is unbounded.
+        self.wakeups = httpx.AsyncClient(
+            base_url=ENGINE_URL,
+            headers={"X-ENGINE-KEY": ENGINE_KEY},
+            timeout=httpx.Timeout(WAKE_WAIT_SECONDS + ENGINE_TIMEOUT_SECONDS, connect=HTTP_CONNECT_TIMEOUT_SECONDS),
+            limits=_pool_limits(None),
+        )
+        # Cleared if the engine has no version long-poll; idle campaigns then back off.
+        self.wake_on_change = WAKE_WAIT_SECONDS > 0
+        self.model_slots = asyncio.Semaphore(model_concurrency)
+        self.prompts = PromptBuilder(RUNNER_HISTORY_EVENTS)
+        self.metrics = PhaseMetrics()
+        self.tag_campaigns = tag_campaigns
+        self.pipeline = pipeline
+        self.worker_id = worker_id
+        # Cleared if the engine cannot lease floors; every campaign is then driven unclaimed.
+        self.floor_lease = floor_lease
+        self.floor_idle = floor_idle
+        # Heartbeat task per campaign whose floor this worker holds.
+        self._floors: dict[str, asyncio.Task] = {}
 
-    # Always advance to prevent actor stalls when model returns empty fields.
-    _engine_post("/turn/advance", {})
+    async def close(self):
+        await asyncio.gather(*(self.release_floor(cid) for cid in list(self._floors)))
+        await self.engine.aclose()
+        await self.wakeups.aclose()
+        await self.model.aclose()
 
+    def log(self, campaign_id: str, message: str):
+        prefix = f"[runner {campaign_id}]" if self.tag_campaigns else "[runner]"
+        print(f"{prefix} {message}")
 
-def tick() -> int:
-    """Run one bounded automation tick and return how many actors acted."""
-    acted = 0
-    for _ in range(MAX_AUTO_TURNS_PER_TICK):
-        director = _engine_post(
-            "/director/next",
-            {"max_events": RUNNER_MAX_EVENTS, "max_memories": RUNNER_MAX_MEMORIES},
+    async def send(self, kind: str, method: str, url: str, idempotent: bool = False, stream: bool = False,
+                   **kwargs) -> httpx.Response:
+        """Send on the ``kind`` ("engine", "wakeup" or "model") pool, retrying dropped connections.
+
+        Calls that never reached the server are always retried; calls cut off
+        mid-flight only when ``idempotent``. With ``stream`` the response body is
+        left unread (and untimed) for the caller.
+        """
+        client = {"model": self.model, "wakeup": self.wakeups}.get(kind, self.engine)
+        stats = _tick_stats.get()
+        extensions = {"trace": stats.trace} if stats else None
+        for attempt in range(HTTP_RETRIES + 1):
+            started = time.perf_counter()
+            try:
+                request = client.build_request(method, url, extensions=extensions, **kwargs)
+                return await client.send(request, stream=stream)
+            except _UNSENT_ERRORS:
+                if attempt == HTTP_RETRIES:
+                    raise
+            except _RESET_ERRORS:
+                if not idempotent or attempt == HTTP_RETRIES:
+                    raise
+            finally:
+                if stats:
+                    stats.record(kind, time.perf_counter() - started)
+            if stats:
+                stats.retries += 1
+
+    async def engine_post(self, campaign_id: str, path: str, body: dict, params: dict | None = None) -> dict:
+        resp = await self.send("engine", "POST", f"/v1/campaigns/{campaign_id}{path}", json=body, params=params)
+        if resp.status_code == 409 and body.get("worker_id"):
+            # Another worker took the floor after this lease lapsed.
+            self.drop_floor(campaign_id)
+        resp.raise_for_status()
+        return resp.json()
+
+    async def act(self, campaign_id: str, actor_role: str, body: dict) -> dict:
+        """Post ``/act`` and record its phases from the engine's ``Server-Timing`` header."""
+        started = time.perf_counter()
+        resp = await self.send("engine", "POST", f"/v1/campaigns/{campaign_id}/act", json=body, params={"fields": ACT_FIELDS})
+        if resp.status_code == 409 and body.get("worker_id"):
+            # Another worker took the floor after this lease lapsed; the tick fails below.
+            self.drop_floor(campaign_id)
+        resp.raise_for_status()
+        result = resp.json()
+        elapsed = time.perf_counter() - started
+        timings = parse_server_timing(resp.headers.get("server-timing"))
+        for phase in ("advance", "director"):
+            if phase in timings:
+                role = (result.get("director") or {}).get("actor_role") if phase == "director" else actor_role
+                self.metrics.record(campaign_id, role, phase, timings[phase])
+        # The rest of the round trip, network included, is applying the output.
+        self.metrics.record(campaign_id, actor_role, "apply", elapsed - timings.get("advance", 0.0) - timings.get("director", 0.0))
+        return result
+
+    def fenced(self, body: dict) -> dict:
+        """``body`` with this worker's id when leasing, so the engine refuses it once the floor is lost."""
+        return {**body, "worker_id": self.worker_id} if self.floor_lease else body
+
+    async def director_next(self, campaign_id: str) -> dict:
+        started = time.perf_counter()
+        director = await self.engine_post(
+            campaign_id, "/director/next", self.fenced(DIRECTOR_REQUEST), params={"fields": DIRECTOR_FIELDS}
+        )
+        self.metrics.record(campaign_id, director.get("actor_role"), "director", time.perf_counter() - started)
+        return director
+
+    async def prefetch(self, campaign_id: str, actor_id: str) -> dict:
+        """The director package ``actor_id`` would get now, without moving its cursor."""
+        started = time.perf_counter()
+        batch = await self.engine_post(
+            campaign_id, "/director/batch", self.fenced({**DIRECTOR_REQUEST, "actor_ids": [actor_id]}),
+            params={"fields": BATCH_FIELDS},
+        )
+        (package,) = batch["packages"]
+        self.metrics.record(campaign_id, package.get("actor_role"), "prefetch", time.perf_counter() - started)
+        return package
+
+    async def list_campaigns(self) -> list[str]:
+        resp = await self.send("engine", "GET", "/v1/campaigns", idempotent=True)
+        resp.raise_for_status()
+        return [campaign["id"] for campaign in resp.json()]
+
+    async def hold_floor(self, campaign_id: str) -> float:
+        """Claim the campaign's floor for this worker; 0 once held, else seconds until it may be free.
+
+        A held floor is renewed in the background every third of its lease
+        until ``drop_floor`` or ``release_floor``; each ``/act`` renews it too.
+        Always 0 when leasing is off or the engine has no claim endpoint.
+        """
+        heartbeat = self._floors.get(campaign_id)
+        if not self.floor_lease or (heartbeat is not None and not heartbeat.done()):
+            return 0.0
+        lease, retry_after = await self._claim(campaign_id)
+        if lease is None:
+            return retry_after
+        self._floors[campaign_id] = asyncio.create_task(self._heartbeat(campaign_id, lease))
+        return 0.0
+
+    async def _claim(self, campaign_id: str) -> tuple[float | None, float]:
+        """``(lease seconds, 0)`` if claimed, else ``(None, seconds until the holder's lease lapses)``."""
+        resp = await self.send(
+            "engine", "POST", f"/v1/campaigns/{campaign_id}/director/claim", json={"worker_id": self.worker_id}
         )
-        if not director.get("should_act"):
-            reason = director.get("reason", "unknown")
-            print(f"[runner] stopped: should_act=false reason={reason}")
-            break
-        actor_id = director.get("actor_id")
-        role = director.get("actor_role")
-        if not actor_id:
-            print("[runner] stopped: no actor_id in director response")
-            break
-
-        if (
-            _is_actor_ai(actor_id, director)
-            and _is_actor_ai(_last_visible_event_actor_id(director), director)
-            and director.get("reason") != "turn_owner"
-        ):
-            print(f"[runner] stopped: ai-to-ai safety guard triggered for actor '{actor_id}'")
-            break
-
-        output = None
+        if resp.status_code == 409:
+            return None, float(resp.headers.get("retry-after") or POLL_SECONDS)
+        if resp.status_code in (404, 405) and _error_detail(resp) in ("Not Found", "Method Not Allowed"):
+            self.log(campaign_id, "engine has no floor leases; driving campaigns unclaimed")
+            self.floor_lease = False
+            return None, 0.0
+        resp.raise_for_status()
+        return resp.json()["lease_seconds"], 0.0
+
+    async def _heartbeat(self, campaign_id: str, lease: float):
+        _tick_stats.set(None)
+        while True:
+            await asyncio.sleep(lease / 3)
+            try:
+                renewed, _ = await self._claim(campaign_id)
+            except httpx.HTTPError as exc:
+                # Two more tries before the lease lapses.
+                self.log(campaign_id, f"floor heartbeat failed: {exc}")
+                continue
+            if renewed is None:
+                if self.floor_lease:
+                    self.log(campaign_id, "lost the floor to another worker")
+                return
+
+    def drop_floor(self, campaign_id: str):
+        """Stop renewing the floor. The lease runs out on its own, and until it
+        does this worker can take the campaign back at once."""
+        heartbeat = self._floors.pop(campaign_id, None)
+        if heartbeat is not None:
+            heartbeat.cancel()
+
+    async def release_floor(self, campaign_id: str):
+        """Hand the floor back now, so another worker can take the campaign at once."""
+        if campaign_id not in self._floors:
+            return
+        self.drop_floor(campaign_id)
+        try:
+            await self.engine_post(campaign_id, "/director/release", {"worker_id": self.worker_id})
+        except httpx.HTTPError as exc:
+            self.log(campaign_id, f"floor release failed: {exc}")
+
+    async def wait_for_change(self, campaign_id: str, version: int) -> int | None:
+        """Block until the campaign's version moves past ``version``; the new version.
+
+        Returns None when the engine offers no long-poll (or cannot be reached),
+        so the caller falls back to polling.
+        """
+        while True:
+            try:
+                resp = await self.send(
+                    "wakeup", "GET", f"/v1/campaigns/{campaign_id}/version",
+                    idempotent=True, params={"after": version, "wait": WAKE_WAIT_SECONDS},
+                )
+            except httpx.HTTPError as exc:
+                self.log(campaign_id, f"wait for change failed: {exc}")
+                return None
+            if resp.status_code in (404, 405) and _error_detail(resp) in ("Not Found", "Method Not Allowed"):
+                self.log(campaign_id, "engine has no version long-poll; polling with backoff")
+                self.wake_on_change = False
+                return None
+            if resp.is_error:
+                self.log(campaign_id, f"wait for change failed: HTTP {resp.status_code}")
+                return None
+            current = resp.json()["version"]
+            if current != version:
+                return current
+
+    def build_messages(self, campaign_id: str, actor_id: str, actor_role: str, director_payload: dict,
+                       speculative: bool = False) -> list[dict]:
+        """The turn's chat messages; built once per turn, since it extends the actor's history.
+
+        A ``speculative`` build extends it only once ``PromptBuilder.accept`` is called.
+        """
+        schema = _schema_for_role(actor_role)
+        if PROMPT_LAYOUT == "json":
+            system_prompt = (
+                f"You are actor '{actor_id}' with role '{actor_role}'. "
+                "Return only valid JSON matching the provided schema."
+            )
+            return [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": json.dumps(director_payload)},
+            ]
+        messages, reuse = self.prompts.build(
+            campaign_id, actor_id, actor_role, director_payload, schema["schema"], speculative
+        )
+        stats = _tick_stats.get()
+        if stats:
+            stats.prefix_reuse.append(reuse)
+        return messages
+
+    async def call_model(self, campaign_id: str, actor_id: str, actor_role: str, messages: list[dict],
+                         utterance_id: str | None = None, spoken_limit: int | None = None,
+                         confirmed: asyncio.Future | None = None) -> dict:
+        """Generate the actor's JSON output; with ``utterance_id``, stream it as partial utterances.
+
+        With ``confirmed``, partial utterances wait for it (see ``_PartialForwarder``).
+        """
+        body = {
+            "model": DM_MODEL if actor_role == "dm" else PLAYER_MODEL,
+            "messages": messages,
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": _schema_for_role(actor_role),
+            },
+        }
+        async with self.model_slots:
+            if utterance_id is None:
+                # Completions have no server-side effects, so a dropped call is safe to resend.
+                resp = await self.send("model", "POST", f"{OPENAI_BASE_URL}/chat/completions", idempotent=True, json=body)
+                resp.raise_for_status()
+                completion = resp.json()
+                content = completion["choices"][0]["message"]["content"]
+                stats = _tick_stats.get()
+                if stats:
+                    stats.record_usage(completion.get("usage"))
+            else:
+                content = await self._stream_completion(
+                    campaign_id, actor_id, body, utterance_id, spoken_limit, confirmed
+                )
+        return json.loads(content)
+
+    async def _stream_completion(self, campaign_id: str, actor_id: str, body: dict, utterance_id: str,
+                                 max_sentences: int | None, confirmed: asyncio.Future | None = None) -> str:
+        """Stream a completion, forwarding each finished sentence of ``say`` as it arrives."""
+        started = time.perf_counter()
+        stats = _tick_stats.get()
+        say, sentences = _SayStream(), _Sentences()
+        forwarder = _PartialForwarder(self, campaign_id, actor_id, utterance_id, max_sentences, started, confirmed)
+        parts = []
+        try:
+            resp = await self.send(
+                "model", "POST", f"{OPENAI_BASE_URL}/chat/completions",
+                idempotent=True, stream=True,
+                json={**body, "stream": True, "stream_options": {"include_usage": True}},
+            )
+            body_started = time.perf_counter()
+            try:
+                resp.raise_for_status()
+                async for line in resp.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        # Keep reading to the end of the body, so the connection returns to the pool.
+                        continue
+                    chunk = json.loads(data)
+                    if chunk.get("usage") and stats:
+                        stats.record_usage(chunk["usage"])
+                    if not chunk["choices"]:
+                        continue  # the usage-only chunk that ends the stream
+                    delta = chunk["choices"][0]["delta"].get("content") or ""
+                    parts.append(delta)
+                    if not say.done:
+                        forwarder.put(sentences.feed(say.feed(delta)))
+                        if say.done:
+                            forwarder.put(sentences.flush())
+            finally:
+                await resp.aclose()
+                if stats:
+                    stats.model_seconds += time.perf_counter() - body_started
+        finally:
+            await forwarder.close()
+        return "".join(parts)
+
+    async def log_runner_error(self, campaign_id: str, message: str):
+        await self.engine_post(
+            campaign_id,
+            "/events",
+            {
+                "actor_id": "system",
+                "event_type": "runner_error",
+                "content": message,
+                "visibility": "public",
+            },
+        )
+
+    async def generate(self, campaign_id: str, actor_id: str, actor_role: str, director_payload: dict,
+                       messages: list[dict], confirmed: asyncio.Future | None = None) -> tuple[dict, str | None]:
+        """The actor's output and the utterance id it streamed under; raises ``_ModelFailed`` after retries."""
+        spoken_limit = _spoken_sentence_limit(actor_role, director_payload)
         for attempt in range(MAX_MODEL_JSON_RETRIES):
+            # A fresh id per attempt: a failed attempt's partials are never finalized.
+            utterance_id = uuid.uuid4().hex if MODEL_STREAM else None
+            started = time.perf_counter()
             try:
-                output = _call_model(actor_id, role, director)
+                output = await self.call_model(
+                    campaign_id, actor_id, actor_role, messages, utterance_id, spoken_limit, confirmed
+                )
+                self.metrics.record(campaign_id, actor_role, "model", time.perf_counter() - started)
                 break
             except json.JSONDecodeError:
+                self.metrics.record(campaign_id, actor_role, "json_retry", time.perf_counter() - started)
                 if attempt == MAX_MODEL_JSON_RETRIES - 1:
-                    _log_runner_error(f"[runner] invalid JSON from model for actor '{actor_id}'")
-                    return acted
-            except (KeyError, HTTPError, URLError):
+                    raise _ModelFailed(f"[runner] invalid JSON from model for actor '{actor_id}'")
+            except (KeyError, httpx.HTTPError):
+                self.metrics.record(campaign_id, actor_role, "model_error", time.perf_counter() - started)
                 if attempt == MAX_MODEL_JSON_RETRIES - 1:
-                    _log_runner_error(f"[runner] model call failed for actor '{actor_id}'")
+                    raise _ModelFailed(f"[runner] model call failed for actor '{actor_id}'")
+        if actor_role == "dm":
+            output = _enforce_dm_constraints(output, director_payload)
+        return output, utterance_id
+
+    async def tick(self, campaign_id: str) -> int:
+        """Run one bounded automation tick and return how many actors acted.
+
+        In pipeline mode, while an actor's model call runs, the package of the
+        actor predicted to speak next is prefetched (``/director/batch``, which
+        moves no cursor). Once the output is ready its ``/act`` is posted in the
+        background and the next model call starts at once, from the prefetched
+        package plus the line just spoken. The ``/act`` response carries the
+        real next package; the early turn is kept only if the two prompt the
+        actor alike, and is otherwise discarded (its partial utterances are
+        never published).
+        """
+        started = time.perf_counter()
+        acted = 0
+        director = None
+        ahead: _Ahead | None = None
+        prefetch: asyncio.Task | None = None
+        try:
+            for turn in range(MAX_AUTO_TURNS_PER_TICK):
+                if ahead is not None:
+                    # Kept: ``director``, the real package, prompts the actor as the predicted one did.
+                    generation, ahead = ahead.generation, None
+                else:
+                    if director is None:
+                        director = await self.director_next(campaign_id)
+                    stop = _stop_reason(director)
+                    if stop:
+                        self.log(campaign_id, f"stopped: {stop}")
+                        break
+                    messages = self.build_messages(campaign_id, director["actor_id"], director["actor_role"], director)
+                    generation = asyncio.create_task(self.generate(
+                        campaign_id, director["actor_id"], director["actor_role"], director, messages
+                    ))
+                actor_id, role = director["actor_id"], director["actor_role"]
+                last_turn = turn + 1 == MAX_AUTO_TURNS_PER_TICK
+                if self.pipeline and not last_turn and (next_actor := _predicted_next_actor(director)):
+                    prefetch = asyncio.create_task(self.prefetch(campaign_id, next_actor))
+
+                try:
+                    output, utterance_id = await generation
+                except _ModelFailed as exc:
+                    await self.log_runner_error(campaign_id, str(exc))
                     return acted
 
-        if output is None:
+                body = self.fenced(_actor_output_body(actor_id, output, next_director=not last_turn, utterance_id=utterance_id))
+                writing = asyncio.create_task(self.act(campaign_id, role, body))
+                try:
+                    if prefetch is not None:
+                        ahead = await self._start_ahead(campaign_id, prefetch, body, role)
+                        prefetch = None
+                finally:
+                    # The act is in flight whatever became of the early turn; see it land.
+                    result = await writing
+                self.log(campaign_id, f"actor '{actor_id}' acted (role={role})")
+                acted += 1
+                director = result.get("director")
+                if ahead is not None and not ahead.settle(director, result.get("event_id")):
+                    ahead = None
+        finally:
+            if prefetch is not None:
+                prefetch.cancel()
+            if ahead is not None:
+                ahead.settle(None, why="the tick ended first")
+            if acted:
+                self.metrics.record(campaign_id, "all", "tick", time.perf_counter() - started)
+        return acted
+
+    async def _start_ahead(self, campaign_id: str, prefetch: asyncio.Task, act_body: dict,
+                           actor_role: str) -> "_Ahead | None":
+        """Start the next turn from the prefetched package while ``act_body`` is still being applied."""
+        try:
+            package = await prefetch
+        except (httpx.HTTPError, KeyError, ValueError) as exc:
+            self.log(campaign_id, f"prefetch failed: {exc}")
+            return None
+        try:
+            director = _package_after(package, act_body, actor_role)
+            if _stop_reason(director):
+                # Most often an AI player that only the line being applied will address.
+                return None
+            actor_id, role = director["actor_id"], director["actor_role"]
+            messages = self.build_messages(campaign_id, actor_id, role, director, speculative=True)
+        except Exception as exc:
+            # Only an optimization: the next turn then starts from the real package.
+            self.log(campaign_id, f"could not start the next turn early: {exc}")
+            return None
+        confirmed = asyncio.get_running_loop().create_future()
+        generation = asyncio.create_task(self.generate(campaign_id, actor_id, role, director, messages, confirmed))
+        return _Ahead(self, campaign_id, director, generation, confirmed, bool(act_body["state_updates"]))
+
+    async def tick_once(self, campaign_id: str) -> int:
+        stats = TickStats()
+        _tick_stats.set(stats)
+        try:
+            if await self.hold_floor(campaign_id):
+                self.log(campaign_id, "skipped: another worker holds the floor")
+                return 0
+            acted = await self.tick(campaign_id)
+            self.log(campaign_id, f"tick complete: {acted} actor(s) acted ({stats.summary()})")
             return acted
-        if role == "dm":
-            output = _enforce_dm_constraints(output, director)
+        except Exception as exc:
+            self.log(campaign_id, f"error: {exc}")
+            return 0
+
+    async def watch(self, campaign_id: str):
+        """Tick whenever the campaign changes.
+
+        Between ticks the loop parks on the engine's version long-poll, so an
+        idle table costs one open request and a human's line wakes it at once.
+        Ticks move the version themselves (acting, or the director moving a
+        cursor past new events), which costs one more, cached, idle tick before
+        the loop settles. Without the long-poll, idle polls back off.
+
+        Each tick first claims the campaign's floor. The lease is kept while
+        the table is busy and through ``floor_idle`` seconds without a turn to
+        play; after that the floor is released. A campaign held by another
+        worker is claimed again when its lease may have lapsed; the holder
+        wakes on the campaign's changes meanwhile.
+        """
+        # Spread the first ticks so many campaigns do not poll in lockstep.
+        await asyncio.sleep(random.uniform(0, POLL_SECONDS))
+        backoff = _Backoff(POLL_SECONDS, IDLE_POLL_MAX_SECONDS)
+        version = -1
+        floor_wait = 0.0
+        idle_since: float | None = None
+        while True:
+            _tick_stats.set(None)
+            woken = None
+            if floor_wait:
+                # The holder watches the campaign itself; look again once its lease may have lapsed.
+                await asyncio.sleep(floor_wait)
+            elif self.wake_on_change:
+                waiting = self.wait_for_change(campaign_id, version)
+                if idle_since is not None and campaign_id in self._floors:
+                    # Keep heartbeating through the grace period, then hand the table back.
+                    grace = max(0.0, idle_since + self.floor_idle - time.monotonic())
+                    try:
+                        woken = await asyncio.wait_for(waiting, grace)
+                    except asyncio.TimeoutError:
+                        await self.release_floor(campaign_id)
+                        continue
+                else:
+                    woken = await waiting
+                if woken is not None:
+                    version = woken
+            stats = TickStats()
+            _tick_stats.set(stats)
+            try:
+                floor_wait = await self.hold_floor(campaign_id)
+                acted = 0 if floor_wait else await self.tick(campaign_id)
+            except Exception as exc:
+                self.log(campaign_id, f"error: {exc}")
+                # Tick again after the backoff even if nothing changes meanwhile.
+                version = -1
+                floor_wait = 0.0
+                await asyncio.sleep(backoff.next())
+                continue
+            if acted:
+                idle_since = None
+                self.log(campaign_id, f"tick stats: {stats.summary()}")
+            elif floor_wait:
+                idle_since = None
+            else:
+                idle_since = idle_since or time.monotonic()
+                if time.monotonic() - idle_since >= self.floor_idle:
+                    await self.release_floor(campaign_id)
+            if acted or woken is not None:
+                backoff.reset()
+            if woken is None and not floor_wait:
+                await asyncio.sleep(backoff.next())
+
+    async def campaigns(self, campaign_ids: list[str], discover: bool) -> list[str]:
+        found = list(campaign_ids)
+        if discover:
+            try:
+                found += [cid for cid in await self.list_campaigns() if cid not in found]
+            except httpx.HTTPError as exc:
+                print(f"[runner] campaign discovery failed: {exc}")
+        return found
+
+    async def run_once(self, campaign_ids: list[str], discover: bool) -> int:
+        campaign_ids = await self.campaigns(campaign_ids, discover)
+        return sum(await asyncio.gather(*(self.tick_once(cid) for cid in campaign_ids)))
+
+    def print_summary(self):
+        lines = self.metrics.summary_lines()
+        if lines:
+            print("[runner] latency by phase and role, all campaigns:")
+            for line in lines:
+                print(f"[runner]   {line}")
+
+    async def print_summaries(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            self.print_summary()
+
+    async def run_forever(self, campaign_ids: list[str], discover: bool):
+        """Watch every campaign; with ``discover`` pick up new ones every ``DISCOVER_SECONDS``."""
+        tasks: dict[str, asyncio.Task] = {}
+        if METRICS_SUMMARY_SECONDS > 0:
+            tasks[""] = asyncio.create_task(self.print_summaries(METRICS_SUMMARY_SECONDS))
+        try:
+            while True:
+                for campaign_id in await self.campaigns(campaign_ids, discover):
+                    if campaign_id not in tasks:
+                        tasks[campaign_id] = asyncio.create_task(self.watch(campaign_id))
+                if not discover:
+                    await asyncio.gather(*(task for cid, task in tasks.items() if cid))
+                await asyncio.sleep(DISCOVER_SECONDS)
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+
+def _error_detail(resp: httpx.Response) -> str | None:
+    try:
+        return resp.json().get("detail")
+    except ValueError:
+        return None
+
 
-        _apply_actor_output(actor_id, role, output)
-        print(f"[runner] actor '{actor_id}' acted (role={role})")
-        acted += 1
-    return acted
+def _pool_limits(size: int | None) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=size,
+        max_keepalive_connections=size,
+        keepalive_expiry=HTTP_KEEPALIVE_SECONDS,
+    )
+
+
+def _configured_campaigns(arg: str | None) -> list[str]:
+    ids = [CAMPAIGN_ID] if CAMPAIGN_ID else []
+    for raw in (CAMPAIGN_IDS, arg or ""):
+        ids += [cid.strip() for cid in raw.split(",") if cid.strip() and cid.strip() not in ids]
+    return ids
+
+
+async def _main(args) -> None:
+    campaign_ids = _configured_campaigns(args.campaigns)
+    if not campaign_ids and not args.discover:
+        raise ValueError("CAMPAIGN_ID, CAMPAIGN_IDS, --campaigns or --discover is required")
+
+    runner = Runner(
+        model_concurrency=args.model_concurrency,
+        tag_campaigns=args.discover or len(campaign_ids) > 1,
+        pipeline=args.pipeline,
+        worker_id=args.worker_id,
+    )
+    metrics_server = None
+    if args.metrics_port:
+        metrics_server = await serve_metrics(runner.metrics, "127.0.0.1", args.metrics_port)
+        print(f"[runner] metrics on http://127.0.0.1:{args.metrics_port}/metrics")
+    try:
+        if args.once:
+            await runner.run_once(campaign_ids, args.discover)
+        else:
+            # --watch or default: continuous polling loop per campaign
+            await runner.run_forever(campaign_ids, args.discover)
+    finally:
+        if metrics_server is not None:
+            metrics_server.close()
+        await runner.close()
+        if args.report:
+            report = json.dumps(runner.metrics.report(), indent=2)
+            if args.report == "-":
+                print(report)
+            else:
+                with open(args.report, "w") as f:
+                    f.write(report + "\n")
 
 
 def main():
@@ -230,33 +1188,54 @@ def main():
     mode_group.add_argument(
         "--once",
         action="store_true",
-        help="Run exactly one bounded tick and exit.",
+        help="Run exactly one bounded tick per campaign and exit.",
     )
     mode_group.add_argument(
         "--watch",
         action="store_true",
         help="Poll continuously and tick when needed (default behaviour).",
     )
+    parser.add_argument(
+        "--campaigns",
+        help="Comma-separated campaign ids to drive, in addition to CAMPAIGN_ID/CAMPAIGN_IDS.",
+    )
+    parser.add_argument(
+        "--discover",
+        action="store_true",
+        help="Also drive every campaign the engine lists, checking for new ones periodically.",
+    )
+    parser.add_argument(
+        "--model-concurrency",
+        type=int,
+        default=MODEL_CONCURRENCY,
+        help="Maximum model calls in flight across all campaigns.",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        default=RUNNER_PIPELINE,
+        help="Overlap each /act with the next actor's model call (RUNNER_PIPELINE=1).",
+    )
+    parser.add_argument(
+        "--worker-id",
+        default=RUNNER_WORKER_ID,
+        help="Name this process claims campaign floors under (RUNNER_WORKER_ID; default host-pid).",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=RUNNER_METRICS_PORT,
+        help="Serve per-phase latency histograms on 127.0.0.1:<port>/metrics (Prometheus) and /report (JSON).",
+    )
+    parser.add_argument(
+        "--report",
+        help="On exit, write the per-phase timing report as JSON to this file ('-' for stdout).",
+    )
     args = parser.parse_args()
-
-    if not CAMPAIGN_ID:
-        raise ValueError("CAMPAIGN_ID is required")
-
-    if args.once:
-        try:
-            acted = tick()
-            print(f"[runner] tick complete: {acted} actor(s) acted")
-        except Exception as exc:
-            print(f"[runner] error: {exc}")
-        return
-
-    # --watch or default: continuous polling loop
-    while True:
-        try:
-            tick()
-        except Exception as exc:
-            print(f"[runner] error: {exc}")
-        time.sleep(POLL_SECONDS)
+    try:
+        asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        pass
 
 
 if __name__ == "__main__":
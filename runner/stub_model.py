@@ -0,0 +1,228 @@
+"""
+OpenAI-compatible stub model server for running the runner without a real model.
+
+Answers ``POST /v1/chat/completions`` (streamed or not) with schema-valid DM or
+player JSON, chosen by the request's ``json_schema`` name. Latency follows a
+simple cost model of a local inference server with a prefix KV cache, like
+llama.cpp or Ollama:
+
+    latency = base + uncached prompt tokens * prompt cost + output tokens / rate
+
+Each of ``--slots`` slots remembers its last prompt. A request takes the slot
+sharing the longest prefix with it (if that covers half the slot's prompt, else
+the least recently used slot), and only the tokens after the shared prefix are
+charged. ``usage.prompt_tokens_details.cached_tokens`` reports the reused part,
+so prompt layouts can be compared offline:
+
+    python runner/stub_model.py --port 11435
+    OPENAI_BASE_URL=http://localhost:11435/v1 python runner/runner.py --once
+
+Tokens are estimated as four characters each.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHARS_PER_TOKEN = 4
+
+_LINES = [
+    "The torches gutter as a cold wind sweeps the hall.",
+    "Somewhere below, chains rattle against stone.",
+    "A raven lands on the broken statue and watches you.",
+    "The floor is slick with old rain.",
+    "Far off, a bell tolls three times.",
+]
+
+
+class StubModel:
+    """The cost model and canned outputs; thread-safe."""
+
+    def __init__(self, base_ms: float = 20.0, prompt_ms_per_token: float = 0.5, tokens_per_second: float = 50.0,
+                 slots: int = 4):
+        self.base_ms = base_ms
+        self.prompt_ms_per_token = prompt_ms_per_token
+        self.tokens_per_second = tokens_per_second
+        self._slots: list[str] = [""] * slots
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+
+    def _take_slot(self, prompt: str) -> int:
+        """Cached prompt characters; the chosen slot now holds ``prompt``.
+
+        Like llama.cpp's ``--slot-prompt-similarity``, a slot is reused only if
+        the shared prefix covers at least half of its cached prompt; otherwise
+        the least recently used slot is overwritten.
+        """
+        with self._lock:
+            best, cached = 0, 0
+            for i, previous in enumerate(self._slots):
+                shared = len(os.path.commonprefix((previous, prompt)))
+                if shared > cached and shared * 2 >= len(previous):
+                    best, cached = i, shared
+            if cached == 0:
+                cached = len(os.path.commonprefix((self._slots[0], prompt)))
+            # Slots are kept least recently used first.
+            self._slots.pop(best)
+            self._slots.append(prompt)
+            return cached
+
+    def output(self, schema_name: str) -> dict:
+        n = next(self._counter)
+        line = _LINES[n % len(_LINES)]
+        if schema_name == "dm_response":
+            return {"say": f"{line} Turn {n} begins.", "state_updates": [], "ask": "What do you do?", "notes": ""}
+        return {"say": f"I steady myself. {line}", "think": f"Stay alert, turn {n}.", "intent": {"action": "wait"}, "ask": ""}
+
+    def complete(self, body: dict) -> tuple[str, dict, float]:
+        """Content, usage and prompt-processing seconds for a chat completion request."""
+        prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages") or [])
+        cached_chars = self._take_slot(prompt)
+        prompt_tokens = max(1, len(prompt) // CHARS_PER_TOKEN)
+        cached_tokens = min(prompt_tokens, cached_chars // CHARS_PER_TOKEN)
+        schema_name = ((body.get("response_format") or {}).get("json_schema") or {}).get("name", "")
+        content = json.dumps(self.output(schema_name))
+        completion_tokens = max(1, len(content) // CHARS_PER_TOKEN)
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += prompt_tokens
+            self.cached_tokens += cached_tokens
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens},
+        }
+        prompt_seconds = (self.base_ms + (prompt_tokens - cached_tokens) * self.prompt_ms_per_token) / 1000
+        return content, usage, prompt_seconds
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "prompt_tokens": self.prompt_tokens,
+                "cached_tokens": self.cached_tokens,
+                "cache_ratio": self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0,
+            }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "StubModelServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: dict):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/stats"):
+            self._send_json(200, self.server.model.stats())
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": "not found"})
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        model = self.server.model
+        content, usage, prompt_seconds = model.complete(body)
+        time.sleep(prompt_seconds)
+        token_seconds = 1 / model.tokens_per_second
+        if not body.get("stream"):
+            time.sleep(usage["completion_tokens"] * token_seconds)
+            self._send_json(200, {
+                "object": "chat.completion",
+                "model": body.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i in range(0, len(content), CHARS_PER_TOKEN):
+            time.sleep(token_seconds)
+            self._event({"choices": [{"index": 0, "delta": {"content": content[i:i + CHARS_PER_TOKEN]}}]})
+        if (body.get("stream_options") or {}).get("include_usage"):
+            self._event({"choices": [], "usage": usage})
+        self._chunk(b"data: [DONE]\n\n")
+        self._chunk(b"")
+
+    def _event(self, payload: dict):
+        self._chunk(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+
+    def _chunk(self, data: bytes):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+
+class StubModelServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, model: StubModel, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.model = model
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StubModelServer":
+        """Serve from a background thread (port 0 picks a free port; see ``base_url``)."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def handle_error(self, request, client_address):
+        # A runner stopped mid-stream drops its connection; that is not a server error.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--base-ms", type=float, default=20.0, help="Fixed latency per request.")
+    parser.add_argument("--prompt-ms-per-token", type=float, default=0.5, help="Cost of each uncached prompt token.")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0, help="Output token rate.")
+    parser.add_argument("--slots", type=int, default=4, help="Prompt cache slots.")
+    args = parser.parse_args()
+
+    model = StubModel(args.base_ms, args.prompt_ms_per_token, args.tokens_per_second, args.slots)
+    server = StubModelServer(model, args.host, args.port)
+    print(f"stub model listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(model.stats()))
+
+
+if __name__ == "__main__":
+    main()